@@ -1,26 +1,140 @@
 import os
+import sys
 import json
+import queue
+import atexit
+import gzip
+import hashlib
 import logging
+import mimetypes
+from logging.handlers import QueueHandler, QueueListener
 import asyncio
 import aiohttp
 import requests
+import time
+import random
+import re
+import socket
+import uuid
 import unicodedata
+import click
 from bs4 import BeautifulSoup
-from flask import Flask, jsonify, request, send_from_directory, has_request_context
+from flask import Flask, jsonify, request, send_file, has_request_context, g
 from flask_cors import CORS
 from flask_wtf.csrf import CSRFProtect, generate_csrf
-from threading import Thread, Lock
+from bisect import bisect_left
+from collections import OrderedDict, Counter, defaultdict, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread, Lock, Event, Condition, BoundedSemaphore, get_ident
 from urllib.parse import urljoin
+from werkzeug.security import safe_join
+
+try:
+    import brotli  # Opcional: habilita Content-Encoding: br
+except ImportError:
+    brotli = None
+
+try:
+    import redis  # Opcional: cache e locks compartilhados entre workers e nós
+except ImportError:
+    redis = None
+
+try:
+    import numpy as np  # Opcional: habilita /similares
+except ImportError:
+    np = None
+
+try:
+    import fcntl  # Só em Unix: lock entre os workers do mesmo nó
+except ImportError:
+    fcntl = None
 
 # Configuração de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('superflix_api.log'),
-        logging.StreamHandler()
-    ]
-)
+# Os handlers de arquivo/console rodam em uma thread própria (QueueListener): a
+# requisição só enfileira o registro, sem formatar nem esperar pelo disco.
+LOG_FORMATO = os.environ.get('LOG_FORMAT', 'texto')  # 'texto' ou 'json' (JSON lines)
+LOG_LIMITE_POR_SEGUNDO = int(os.environ.get('LOG_LIMITE_POR_SEGUNDO', 20))  # Por tipo de mensagem
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro."""
+    def format(self, record):
+        registro = {
+            'ts': self.formatTime(record),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        if getattr(record, 'suprimidas', 0):
+            registro['suprimidas'] = record.suprimidas
+        if record.exc_info:
+            registro['exc'] = self.formatException(record.exc_info)
+        return json.dumps(registro, ensure_ascii=False)
+
+class FormatadorTexto(logging.Formatter):
+    def format(self, record):
+        texto = super().format(record)
+        if getattr(record, 'suprimidas', 0):
+            texto += f" (+{record.suprimidas} mensagens iguais suprimidas)"
+        return texto
+
+class FiltroLimiteTaxa(logging.Filter):
+    """Deixa passar no máximo N registros por segundo de cada tipo de mensagem.
+
+    O tipo é o template (record.msg) antes da formatação, por isso as mensagens
+    do caminho quente usam formatação preguiçosa ("... %s", valor). ERROR e
+    acima nunca são descartados. O primeiro registro aceito depois de um
+    descarte informa quantos foram suprimidos.
+    """
+    def __init__(self, limite_por_segundo):
+        super().__init__()
+        self.limite = limite_por_segundo
+        self.janelas = {}  # (logger, template) -> [início da janela, aceitos, suprimidos]
+        self.lock = Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR or self.limite <= 0:
+            return True
+        agora = time.monotonic()
+        chave = (record.name, record.msg)
+        with self.lock:
+            if len(self.janelas) > 4096:
+                # Mensagens com texto variável (f-strings) geram um tipo por registro
+                self.janelas = {k: v for k, v in self.janelas.items() if agora - v[0] < 1.0}
+            janela = self.janelas.get(chave)
+            if janela is None or agora - janela[0] >= 1.0:
+                suprimidos = janela[2] if janela else 0
+                self.janelas[chave] = [agora, 1, 0]
+                if suprimidos:
+                    record.suprimidas = suprimidos
+                return True
+            if janela[1] < self.limite:
+                janela[1] += 1
+                return True
+            janela[2] += 1
+            return False
+
+class FilaHandler(QueueHandler):
+    """QueueHandler que não formata no thread da requisição; o listener formata."""
+    def prepare(self, record):
+        return record
+
+def iniciar_log_em_fila(nome_logger, *handlers):
+    """Liga o logger a uma fila consumida por um QueueListener com os handlers dados."""
+    formatador = FormatadorJSON() if LOG_FORMATO == 'json' else FormatadorTexto('%(asctime)s - %(levelname)s - %(message)s')
+    for handler in handlers:
+        handler.setFormatter(formatador)
+    fila = queue.SimpleQueue()
+    handler_fila = FilaHandler(fila)
+    handler_fila.addFilter(FiltroLimiteTaxa(LOG_LIMITE_POR_SEGUNDO))
+    logging.getLogger(nome_logger).addHandler(handler_fila)
+    listener = QueueListener(fila, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+logging.getLogger().setLevel(logging.INFO)
+iniciar_log_em_fila(None, logging.FileHandler('superflix_api.log'), logging.StreamHandler())
 logger = logging.getLogger(__name__)
 
 # Inicializar o Flask uma única vez
@@ -31,6 +145,9 @@ app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'default-secret-key-for-
 
 # Configurar chave de API
 API_KEY = os.environ.get('API_KEY', 'x9k3m7p2q8w4z6t1')  # Valor padrão para testes locais
+# Chave das rotas de diagnóstico (/metrics, /debug/profile); a API_KEY vai no frontend,
+# então não serve de padrão: sem ADMIN_API_KEY essas rotas respondem 404
+ADMIN_API_KEY = os.environ.get('ADMIN_API_KEY')
 
 # Inicializar CSRF protection
 csrf = CSRFProtect(app)
@@ -39,7 +156,8 @@ csrf = CSRFProtect(app)
 CORS(app, resources={r"/*": {
     "origins": ["https://mystarmovies.online", "https://www.mystarmovies.online"],
     "methods": ["GET", "POST", "OPTIONS"],
-    "allow_headers": ["Content-Type", "Authorization", "X-CSRF-Token", "X-API-Key"]
+    "allow_headers": ["Content-Type", "Authorization", "X-CSRF-Token", "X-API-Key"],
+    "expose_headers": ["X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "Retry-After"]
 }})
 
 # Lock para sincronizar acesso a arquivos JSON
@@ -47,7 +165,7 @@ json_lock = Lock()
 
 # Configurações centralizadas
 CONFIG = {
-    'BASE_URL': 'https://superflixapi.pw',
+    'BASE_URL': os.environ.get('SUPERFLIX_BASE_URL', 'https://superflixapi.pw'),
     'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
     'ITEMS_PER_PAGE': 50,
     'JSON_INDENT': 4,
@@ -55,13 +173,97 @@ CONFIG = {
     'TEMP_DIR': 'temp',
     'FILMES_ENCONTRADOS_DIR': 'Filmes_Encontrados',
     'RATE_LIMIT_REQUESTS': 5,  # Máximo de 5 requisições por segundo
-    'RATE_LIMIT_PERIOD': 1.0  # Período de 1 segundo
+    'RATE_LIMIT_PERIOD': 1.0,  # Período de 1 segundo
+    'HTML_PARSER': os.environ.get('HTML_PARSER', 'html.parser'),  # 'lxml' se estiver instalado
+    'COMPRESS_MIN_BYTES': 1024,  # Respostas menores saem sem compressão
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+    'CACHE_CORPOS_MAX_BYTES': 64 * 1024 * 1024,  # Limite do cache de respostas codificadas
+    'CACHE_CONTROL': 'public, max-age=60, stale-while-revalidate=300',
+    'CACHE_CONTROL_ATUALIZACAO': 'no-cache',  # Rotas que disparam scraping revalidam sempre
+    'JOBS_MAX_WORKERS': 2,  # Atualizações executando ao mesmo tempo
+    'JOBS_LONG_POLL_MAX': 20.0,  # Espera máxima (s) de /jobs/<id>?timeout=
+    'JOBS_RETENCAO': 600,  # Segundos que um job concluído continua consultável
+    'REDIS_URL': os.environ.get('REDIS_URL'),  # Sem URL, tudo fica em memória no processo
+    'REDIS_PREFIXO': 'filmes',
+    'CACHE_COMPARTILHADO_TTL': 300,  # TTL das respostas de busca/gênero/página no Redis
+    'LOCK_ATUALIZACAO_TTL': 600,  # Validade do lock de atualização entre os workers do nó
+    'LOCK_ATUALIZACAO_ESPERA': 1.0,  # Intervalo (s) entre as checagens do lock de outro worker
+    'SLOW_REQUEST_MS': float(os.environ.get('SLOW_REQUEST_MS', 500)),  # Acima disso vai para o log de lentas
+    'METRICAS_AMOSTRAS': 2048,  # Latências recentes guardadas por rota para p50/p95/p99
+    'PROFILE_MAX_SEGUNDOS': 30,
+    'PROFILE_INTERVALO_MS': 5,
+    'PROFILE_MAX_SIMULTANEOS': 1,  # Amostragens ao mesmo tempo por processo; as demais recebem 503
+    'BUSCA_FUZZY_LIMITE': 20,  # Top-k padrão da busca aproximada
+    'BUSCA_FUZZY_SCORE_MINIMO': 0.3,  # Similaridade mínima (Dice de trigramas) para entrar no ranking
+    'BUSCA_FUZZY_CANDIDATOS': 200,  # Candidatos re-pontuados depois da contagem de trigramas
+    'BUSCA_FUZZY_ORCAMENTO_MS': 50,  # Tempo máximo por consulta; estourou, devolve o parcial
+    'AUTOCOMPLETAR_LIMITE': 10,  # Sugestões padrão (e máximo = ITEMS_PER_PAGE) do autocompletar
+    'FEED_MAX_ENTRADAS': 512,  # Entradas guardadas no log de mudanças; mais antigas pedem ressincronização
+    'FEED_MAX_IDS_POR_ENTRADA': 1000,  # Acima disso a entrada vira "ressincronize o tipo"
+    'FEED_RETENCAO': 7 * 24 * 3600,  # Quanto o último arquivo visto por tipo fica registrado
+    'CODIGOS_TIMEOUT': 5,  # Timeout (s) de cada busca das listas de códigos no upstream
+    'CODIGOS_ESPERA_MAX': 5.0,  # Quanto uma requisição sem lista nenhuma espera a busca em andamento
+    'CODIGOS_BACKOFF_INICIAL': 1.0,  # Espera (s) antes da 2ª tentativa; dobra a cada falha
+    'CODIGOS_BACKOFF_MAX': 60.0,
+    'DISJUNTOR_FALHAS': 3,  # Falhas seguidas que abrem o disjuntor
+    'DISJUNTOR_ABERTO_S': 30.0,  # Tempo em que o disjuntor aberto falha rápido antes de testar de novo
+    # Controle de admissão por classe de rota cara: execuções simultâneas por
+    # processo e tamanho da fila; o que não couber na fila recebe 503 na hora
+    'ADMISSAO_CLASSES': {
+        'busca_curta': {'concorrencia': 2, 'fila': 4},  # /buscar com termo curto (varre quase tudo)
+        'genero_todos': {'concorrencia': 2, 'fila': 4},  # /buscar_por_genero com tipo=all
+        'espera_job': {'concorrencia': 16, 'fila': 0},  # Long-poll de /jobs/<id>?timeout= (wait=true)
+    },
+    'ADMISSAO_ESPERA_MAX': 0.5,  # Tempo máximo (s) na fila antes de desistir com 503
+    'ADMISSAO_RETRY_AFTER': 1,  # Retry-After (s) das respostas descartadas
+    'BUSCA_TERMO_CURTO': 3,  # Termos normalizados com até esse tamanho entram em 'busca_curta'
+    # Limite de taxa por cliente (chave de API + IP), em janela deslizante de LIMITE_TAXA_JANELA
+    # segundos: um orçamento para o total e outro para a classe da rota. Desligado por padrão:
+    # atrás de um proxy (o router do Procfile) só funciona com PROXIES_CONFIAVEIS configurado,
+    # senão todos os usuários viram um único IP e dividem o mesmo orçamento
+    'LIMITE_TAXA_ATIVO': os.environ.get('LIMITE_TAXA_ATIVO', 'false').lower() == 'true',
+    'LIMITE_TAXA_JANELA': 60,
+    'LIMITE_TAXA_TOTAL': int(os.environ.get('LIMITE_TAXA_TOTAL', 600)),
+    'LIMITE_TAXA_CLASSES': {'busca': 120, 'atualizacao': 20},
+    'LIMITE_TAXA_ROTAS': {'/buscar': 'busca', '/buscar_por_genero': 'busca', '/navegar': 'busca',
+                          '/similares': 'busca'},  # wait=true em qualquer rota conta como 'atualizacao'
+    # Proxies que acrescentam ao X-Forwarded-For (1 no Heroku); sem a variável, o limite de taxa não liga
+    'PROXIES_CONFIAVEIS': int(os.environ['PROXIES_CONFIAVEIS']) if 'PROXIES_CONFIAVEIS' in os.environ else None,
+    # Estáticos: `flask construir-estaticos` grava cópias com hash no nome (e .gz/.br) em
+    # static/<ESTATICOS_BUILD_DIR> mais um manifest.json; essas cópias nunca mudam
+    'ESTATICOS_BUILD_DIR': 'build',
+    'ESTATICOS_EXTENSOES_COMPRIMIVEIS': ('.js', '.mjs', '.css', '.html', '.json', '.svg', '.txt', '.xml',
+                                         '.map', '.ico', '.wasm'),
+    'CACHE_CONTROL_IMUTAVEL': 'public, max-age=31536000, immutable',
+    'CACHE_CONTROL_ESTATICOS': 'no-cache',  # Nomes sem hash: sempre revalida (ETag/Last-Modified)
+    # Com nginx/Apache na frente, o arquivo sai por X-Sendfile sem passar pelo worker
+    'ESTATICOS_X_SENDFILE': os.environ.get('ESTATICOS_X_SENDFILE', 'false').lower() == 'true',
+    'SIMILARES_LIMITE': 10,  # Títulos parecidos devolvidos por padrão (máximo = ITEMS_PER_PAGE)
+    'EVENTOS_MAX_ITENS': 20,  # Cartões de prévia em cada evento de novidades
+    # Cada conexão SSE prende uma thread do worker gthread (WEB_THREADS, a mesma variável do
+    # Procfile) pela duração do stream. None = no máximo metade das threads, descontadas as
+    # vagas de 'espera_job', que também seguram threads; o resto fica para as rotas comuns
+    'THREADS_POR_WORKER': int(os.environ.get('WEB_THREADS', 64)),
+    'EVENTOS_MAX_ASSINANTES': None,  # Conexões SSE simultâneas por processo
+    'EVENTOS_HEARTBEAT': 15.0,  # Comentário keep-alive quando nada acontece (s)
+    'EVENTOS_DURACAO_MAX': 300.0,  # Depois disso o stream fecha e o navegador reconecta (rebalanceia)
+    'EVENTOS_RETRY_MS': 3000,
+    'EVENTOS_INTERVALO_VIGIA': 2.0,  # Verificação dos arquivos no disco enquanto há assinantes (s)
+    # Na inicialização, buscar códigos faltantes e enfileirar os scrapings iniciais em segundo plano.
+    # Desligado por padrão (acessa a rede na importação); ligado, roda em um só processo por nó
+    'ATUALIZAR_NA_INICIALIZACAO': os.environ.get('ATUALIZAR_NA_INICIALIZACAO', 'false').lower() == 'true'
 }
 
 # Caminhos para diretórios
 TEMP_DIR = os.path.join(CONFIG['BASE_DIR'], CONFIG['TEMP_DIR'])
 FILMES_ENCONTRADOS_DIR = os.path.join(CONFIG['BASE_DIR'], CONFIG['FILMES_ENCONTRADOS_DIR'])
 
+# Identifica o nó (máquina + diretório de dados): cada nó grava nos próprios
+# arquivos JSON, então o que é "por nó" no Redis leva este ID
+ID_DO_NO = os.environ.get('ID_DO_NO') or hashlib.sha1(
+    f"{socket.gethostname()}:{CONFIG['BASE_DIR']}".encode('utf-8')).hexdigest()[:12]
+
 # Garante que os diretórios existem
 os.makedirs(TEMP_DIR, exist_ok=True)
 os.makedirs(FILMES_ENCONTRADOS_DIR, exist_ok=True)
@@ -80,6 +282,13 @@ JSON_PATHS = {
     'animes_novos': os.path.join(TEMP_DIR, 'NovosAnimes.json')  # Novo caminho
 }
 
+# Catálogos completos por tipo de conteúdo, usados pelas buscas
+CATALOGOS = {
+    'filme': JSON_PATHS['filmes_pagina'],
+    'serie': JSON_PATHS['series_nomes'],
+    'anime': JSON_PATHS['animes_nomes']
+}
+
 # Função para verificar a chave de API
 def check_api_key():
     # Pular verificação se não houver contexto de requisição (ex.: inicialização)
@@ -87,33 +296,330 @@ def check_api_key():
         return None
     api_key = request.headers.get('X-API-Key')
     if not api_key or api_key != API_KEY:
-        logger.warning(f"Chave de API inválida ou ausente: {api_key}")
+        logger.warning("Chave de API inválida ou ausente: %s", api_key)
+        return jsonify({'erro': 'Chave de API inválida ou ausente'}), 401
+    return verificar_limite_taxa(api_key)
+
+def check_admin_key():
+    """Como check_api_key, mas para as rotas de diagnóstico; 404 se não houver ADMIN_API_KEY."""
+    if not ADMIN_API_KEY:
+        return jsonify({'erro': 'Recurso não encontrado'}), 404
+    if request.headers.get('X-API-Key') != ADMIN_API_KEY:
+        logger.warning("Chave de administração inválida ou ausente")
         return jsonify({'erro': 'Chave de API inválida ou ausente'}), 401
     return None
 
+# --------------- Métricas por rota ---------------
+# Os valores são por processo: com N workers do gunicorn, cada um expõe os seus.
+BUCKETS_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FASES = ('carga', 'filtro', 'serializacao', 'espera_lock', 'fila')
+
+metricas_lock = Lock()
+metricas = {
+    'buckets': defaultdict(lambda: [0] * (len(BUCKETS_LATENCIA) + 1)),  # rota -> contagem por bucket (+Inf)
+    'soma': defaultdict(float),  # rota -> soma das latências (s)
+    'amostras': defaultdict(lambda: deque(maxlen=CONFIG['METRICAS_AMOSTRAS'])),  # rota -> latências recentes
+    'status': Counter(),  # (rota, status) -> requisições
+    'fases': defaultdict(float)  # (rota, fase) -> tempo total (s)
+}
+
+# Log separado para requisições lentas (também aparece no log principal)
+logger_lento = logging.getLogger('superflix.lento')
+iniciar_log_em_fila('superflix.lento', logging.FileHandler('superflix_lento.log'))
+
+@contextmanager
+def medir_fase(nome):
+    """Soma o tempo do bloco na fase `nome` da requisição atual.
+
+    Fases aninhadas são exclusivas: o tempo de uma 'carga' dentro de um
+    'filtro' conta só como carga.
+    """
+    if not has_request_context() or 'fases' not in g:
+        yield
+        return
+    quadro = {'filhos': 0.0}
+    g.pilha_fases.append(quadro)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        decorrido = time.perf_counter() - inicio
+        g.pilha_fases.pop()
+        g.fases[nome] += decorrido - quadro['filhos']
+        if g.pilha_fases:
+            g.pilha_fases[-1]['filhos'] += decorrido
+
+@contextmanager
+def lock_medido(lock):
+    """Adquire o lock contabilizando a espera na fase 'espera_lock'."""
+    with medir_fase('espera_lock'):
+        lock.acquire()
+    try:
+        yield
+    finally:
+        lock.release()
+
+@app.before_request
+def iniciar_medicao():
+    g.inicio_requisicao = time.perf_counter()
+    g.fases = defaultdict(float)
+    g.pilha_fases = []
+
+@app.after_request
+def registrar_medicao(response):
+    if 'inicio_requisicao' not in g:
+        return response
+    duracao = time.perf_counter() - g.inicio_requisicao
+    rota = request.url_rule.rule if request.url_rule else '<nao_encontrada>'
+
+    with metricas_lock:
+        buckets = metricas['buckets'][rota]
+        for i, limite in enumerate(BUCKETS_LATENCIA):
+            if duracao <= limite:
+                buckets[i] += 1
+                break
+        else:
+            buckets[-1] += 1
+        metricas['soma'][rota] += duracao
+        metricas['amostras'][rota].append(duracao)
+        metricas['status'][(rota, response.status_code)] += 1
+        for fase, tempo in g.fases.items():
+            metricas['fases'][(rota, fase)] += tempo
+
+    if duracao * 1000 >= CONFIG['SLOW_REQUEST_MS']:
+        fases = ', '.join(f"{fase}={tempo * 1000:.1f}ms" for fase, tempo in g.fases.items())
+        logger_lento.warning("%s %s %s %.1fms [%s]", request.method, request.full_path,
+                             response.status_code, duracao * 1000, fases)
+    return response
+
+def quantis(amostras, qs=(0.5, 0.95, 0.99)):
+    ordenadas = sorted(amostras)
+    if not ordenadas:
+        return {q: 0.0 for q in qs}
+    return {q: ordenadas[min(len(ordenadas) - 1, int(q * len(ordenadas)))] for q in qs}
+
+def _rotulo(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def metricas_prometheus():
+    """Métricas do processo no formato texto do Prometheus."""
+    with metricas_lock:
+        buckets = {rota: list(contagens) for rota, contagens in metricas['buckets'].items()}
+        somas = dict(metricas['soma'])
+        amostras = {rota: list(valores) for rota, valores in metricas['amostras'].items()}
+        status = dict(metricas['status'])
+        fases = dict(metricas['fases'])
+
+    linhas = [
+        '# HELP filmes_request_duration_seconds Latência das requisições por rota.',
+        '# TYPE filmes_request_duration_seconds histogram'
+    ]
+    for rota, contagens in sorted(buckets.items()):
+        acumulado = 0
+        for limite, contagem in zip(BUCKETS_LATENCIA + ('+Inf',), contagens):
+            acumulado += contagem
+            linhas.append(f'filmes_request_duration_seconds_bucket{{rota="{_rotulo(rota)}",le="{limite}"}} {acumulado}')
+        linhas.append(f'filmes_request_duration_seconds_sum{{rota="{_rotulo(rota)}"}} {somas[rota]:.6f}')
+        linhas.append(f'filmes_request_duration_seconds_count{{rota="{_rotulo(rota)}"}} {acumulado}')
+
+    linhas += [
+        '# HELP filmes_request_latency_quantile_seconds p50/p95/p99 das requisições recentes por rota.',
+        '# TYPE filmes_request_latency_quantile_seconds gauge'
+    ]
+    for rota, valores in sorted(amostras.items()):
+        for q, valor in quantis(valores).items():
+            linhas.append(f'filmes_request_latency_quantile_seconds{{rota="{_rotulo(rota)}",quantile="{q}"}} {valor:.6f}')
+
+    linhas += [
+        '# HELP filmes_requests_total Requisições por rota e status HTTP.',
+        '# TYPE filmes_requests_total counter'
+    ]
+    for (rota, codigo), total in sorted(status.items()):
+        linhas.append(f'filmes_requests_total{{rota="{_rotulo(rota)}",status="{codigo}"}} {total}')
+
+    linhas += [
+        '# HELP filmes_request_phase_seconds_total Tempo por fase (carga, filtro, serializacao, espera_lock, fila).',
+        '# TYPE filmes_request_phase_seconds_total counter'
+    ]
+    for (rota, fase), total in sorted(fases.items()):
+        linhas.append(f'filmes_request_phase_seconds_total{{rota="{_rotulo(rota)}",fase="{fase}"}} {total:.6f}')
+    linhas += metricas_admissao()
+    return '\n'.join(linhas) + '\n'
+
+# --------------- Controle de admissão ---------------
+class Sobrecarga(Exception):
+    """A classe de rota está cheia (executando e fila): a requisição é descartada com 503."""
+
+    def __init__(self, classe):
+        super().__init__(classe)
+        self.classe = classe
+
+class ClasseAdmissao:
+    """Limita quantas requisições de uma classe cara executam ao mesmo tempo no processo.
+
+    Até `concorrencia` executam; até `fila` esperam uma vaga por no máximo
+    ADMISSAO_ESPERA_MAX; as demais são descartadas na hora. Assim uma rajada
+    de consultas pesadas não ocupa todas as threads e as rotas baratas
+    continuam respondendo.
+    """
+
+    def __init__(self, nome, concorrencia, fila):
+        self.nome = nome
+        self.concorrencia = concorrencia
+        self.fila = fila
+        self.executando = 0
+        self.na_fila = 0
+        self.contadores = Counter()  # admitidas, enfileiradas, descartadas
+        self.condicao = Condition()
+
+    def _descartar(self):
+        self.contadores['descartadas'] += 1
+        raise Sobrecarga(self.nome)
+
+    @contextmanager
+    def admitir(self):
+        with self.condicao:
+            if self.executando >= self.concorrencia:
+                if self.na_fila >= self.fila:
+                    self._descartar()
+                self.na_fila += 1
+                self.contadores['enfileiradas'] += 1
+                try:
+                    with medir_fase('fila'):
+                        vaga = self.condicao.wait_for(lambda: self.executando < self.concorrencia,
+                                                      CONFIG['ADMISSAO_ESPERA_MAX'])
+                finally:
+                    self.na_fila -= 1
+                if not vaga:
+                    self._descartar()
+            self.executando += 1
+            self.contadores['admitidas'] += 1
+        try:
+            yield
+        finally:
+            with self.condicao:
+                self.executando -= 1
+                self.condicao.notify()
+
+classes_admissao = {nome: ClasseAdmissao(nome, **limites) for nome, limites in CONFIG['ADMISSAO_CLASSES'].items()}
+
+def admitido(classe, gerar):
+    """Envolve `gerar` para só rodar com vaga na classe; uso: resposta_versionada(..., admitido(classe, gerar)).
+
+    Só o caminho frio passa pela admissão: respostas já em cache (e 304)
+    continuam saindo sem esperar vaga.
+    """
+    def gerar_admitido():
+        with classes_admissao[classe].admitir():
+            return gerar()
+    return gerar_admitido
+
+@app.errorhandler(Sobrecarga)
+def responder_sobrecarga(erro):
+    logger.warning("Requisição descartada por sobrecarga (%s): %s", erro.classe, request.full_path)
+    response = jsonify({'erro': 'Servidor sobrecarregado, tente novamente em instantes'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(CONFIG['ADMISSAO_RETRY_AFTER'])
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+def metricas_admissao():
+    linhas = [
+        '# HELP filmes_admission_total Requisições das classes caras por resultado (admitidas, enfileiradas, descartadas).',
+        '# TYPE filmes_admission_total counter'
+    ]
+    estados = []
+    for nome, classe in sorted(classes_admissao.items()):
+        with classe.condicao:
+            contadores = dict(classe.contadores)
+            estados.append((nome, classe.executando, classe.na_fila))
+        for resultado in ('admitidas', 'enfileiradas', 'descartadas'):
+            linhas.append(f'filmes_admission_total{{classe="{nome}",resultado="{resultado}"}} {contadores.get(resultado, 0)}')
+    linhas += [
+        '# HELP filmes_admission_in_flight Requisições das classes caras executando e na fila agora.',
+        '# TYPE filmes_admission_in_flight gauge'
+    ]
+    for nome, executando, na_fila in estados:
+        linhas.append(f'filmes_admission_in_flight{{classe="{nome}",estado="executando"}} {executando}')
+        linhas.append(f'filmes_admission_in_flight{{classe="{nome}",estado="fila"}} {na_fila}')
+    return linhas
+
+perfis_em_andamento = BoundedSemaphore(CONFIG['PROFILE_MAX_SIMULTANEOS'])
+
+def amostrar_pilhas(segundos, intervalo):
+    """Profiler por amostragem: conta as pilhas de todas as outras threads do processo.
+
+    Retorna linhas no formato 'collapsed' (func;func;func contagem), aceito
+    pelas ferramentas de flame graph.
+    """
+    ignoradas = {get_ident()}
+    contagens = Counter()
+    fim = time.monotonic() + segundos
+    while time.monotonic() < fim:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id in ignoradas:
+                continue
+            pilha = []
+            while frame is not None:
+                codigo = frame.f_code
+                pilha.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            contagens[';'.join(reversed(pilha))] += 1
+        time.sleep(intervalo)
+    return [f"{pilha} {contagem}" for pilha, contagem in contagens.most_common()]
+
+# Campos com poucos valores distintos repetidos em milhares de itens ("HD", gêneros, datas)
+CAMPOS_REPETIDOS = frozenset({'qualidade', 'generos', 'data_estreia', 'ano', 'original_language'})
+
+def compartilhar_repetidos():
+    """object_hook do json.load: valores iguais de CAMPOS_REPETIDOS viram o mesmo objeto str.
+
+    O memo vale só para uma carga, então nada fica preso entre recargas. Um
+    `titulo_original` igual ao `titulo` também passa a apontar para ele.
+    """
+    vistos = {}
+
+    def hook(obj):
+        for campo in CAMPOS_REPETIDOS.intersection(obj):
+            valor = obj[campo]
+            if isinstance(valor, str):
+                obj[campo] = vistos.setdefault(valor, valor)
+            elif isinstance(valor, list):
+                obj[campo] = [vistos.setdefault(v, v) if isinstance(v, str) else v for v in valor]
+        if 'titulo_original' in obj and obj['titulo_original'] == obj.get('titulo'):
+            obj['titulo_original'] = obj['titulo']
+        return obj
+    return hook
+
 def carregar_dados_json(caminho):
     """Carrega dados de um arquivo JSON com sincronização."""
-    with json_lock:
+    with lock_medido(json_lock), medir_fase('carga'):
         if os.path.exists(caminho):
             try:
                 with open(caminho, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    return json.load(f, object_hook=compartilhar_repetidos())
             except json.JSONDecodeError as e:
-                logger.error(f"Erro ao decodificar {caminho}: {e}")
+                logger.error("Erro ao decodificar %s: %s", caminho, e)
                 return []
-        logger.warning(f"Arquivo {caminho} não encontrado")
+        logger.warning("Arquivo %s não encontrado", caminho)
         return []
 
 def salvar_dados_json(caminho, dados):
-    """Salva dados em um arquivo JSON com sincronização."""
-    with json_lock:
+    """Salva dados em um arquivo JSON com sincronização.
+
+    Grava em um arquivo temporário e troca com os.replace, para que quem
+    recarrega o snapshot nunca leia um arquivo pela metade.
+    """
+    with lock_medido(json_lock):
         try:
-            logger.info(f"Tentando salvar dados em {caminho}")
-            with open(caminho, 'w', encoding='utf-8') as f:
+            logger.info("Tentando salvar dados em %s", caminho)
+            temporario = f"{caminho}.tmp"
+            with open(temporario, 'w', encoding='utf-8') as f:
                 json.dump(dados, f, ensure_ascii=False, indent=CONFIG['JSON_INDENT'])
-            logger.info(f"Arquivo {caminho} salvo com sucesso")
+            os.replace(temporario, caminho)
+            logger.info("Arquivo %s salvo com sucesso", caminho)
         except Exception as e:
-            logger.error(f"Erro ao salvar {caminho}: {e}")
+            logger.error("Erro ao salvar %s: %s", caminho, e)
 
 def item_existe(lista, item_id):
     """Verifica se um item com o ID existe na lista."""
@@ -128,7 +634,7 @@ async def extrair_detalhes_item(session, url_detalhes, semaphore):
                 response.raise_for_status()
                 content = await response.text()
 
-            soup = BeautifulSoup(content, 'html.parser')
+            soup = BeautifulSoup(content, CONFIG['HTML_PARSER'])
 
             # Extrair título original
             titulo_original_elem = soup.find('span', class_='original-title') or soup.find('h2', class_='original-title')
@@ -154,7 +660,7 @@ async def extrair_detalhes_item(session, url_detalhes, semaphore):
                 'generos': generos
             }
         except aiohttp.ClientError as e:
-            logger.error(f"Erro ao extrair detalhes de {url_detalhes}: {e}")
+            logger.error("Erro ao extrair detalhes de %s: %s", url_detalhes, e)
             return {
                 'titulo_original': None,
                 'descricao': "",
@@ -171,23 +677,23 @@ async def atualizar_dados(url, cache_path, tipo='filmes'):
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
                 'Accept-Language': 'en-US,en;q=0.5'
             }
-            logger.info(f"Tentando acessar URL: {url}")
+            logger.info("Tentando acessar URL: %s", url)
             async with session.get(url, headers=headers) as response:
-                logger.info(f"Status da resposta: {response.status}")
+                logger.info("Status da resposta: %s", response.status)
                 response.raise_for_status()
                 content = await response.text()
-                logger.info(f"Primeiros 500 caracteres do conteúdo: {content[:500]}")
+                logger.debug("Primeiros 500 caracteres do conteúdo: %s", content[:500])
 
-            soup = BeautifulSoup(content, 'html.parser')
+            soup = BeautifulSoup(content, CONFIG['HTML_PARSER'])
             novos_itens = []
             detalhes_tasks = []
 
             # Criar um semáforo para limitar requisições simultâneas
             semaphore = asyncio.Semaphore(CONFIG['RATE_LIMIT_REQUESTS'])
 
-            logger.info(f"Procurando pôsteres na página de {tipo}")
+            logger.info("Procurando pôsteres na página de %s", tipo)
             posters = soup.find_all('div', class_='poster')
-            logger.info(f"Encontrados {len(posters)} pôsteres")
+            logger.info("Encontrados %d pôsteres", len(posters))
 
             for poster in posters:
                 try:
@@ -197,7 +703,7 @@ async def atualizar_dados(url, cache_path, tipo='filmes'):
                     link = poster.find('a', class_='btn')
 
                     if not all([titulo, qualidade, imagem, link]):
-                        logger.warning(f"Pôster incompleto encontrado: {poster.get_text(strip=True)[:100]}")
+                        logger.warning("Pôster incompleto encontrado: %s", poster.get_text(strip=True)[:100])
                         continue
 
                     titulo = titulo.get_text(strip=True)
@@ -207,7 +713,7 @@ async def atualizar_dados(url, cache_path, tipo='filmes'):
                     url_detalhes = urljoin(CONFIG['BASE_URL'], link['href'])
 
                     if not item_existe(cache, item_id):
-                        logger.info(f"Novo {tipo} encontrado: {titulo} (ID: {item_id})")
+                        logger.info("Novo %s encontrado: %s (ID: %s)", tipo, titulo, item_id)
                         detalhes_tasks.append(extrair_detalhes_item(session, url_detalhes, semaphore))
                         novos_itens.append({
                             'titulo': titulo,
@@ -216,11 +722,11 @@ async def atualizar_dados(url, cache_path, tipo='filmes'):
                             'id': item_id
                         })
                 except (AttributeError, KeyError) as e:
-                    logger.warning(f"Erro ao processar item em {url}: {e}")
+                    logger.warning("Erro ao processar item em %s: %s", url, e)
                     continue
 
             if novos_itens:
-                logger.info(f"Extraindo detalhes de {len(novos_itens)} {tipo}")
+                logger.info("Extraindo detalhes de %d %s", len(novos_itens), tipo)
                 detalhes_results = await asyncio.gather(*detalhes_tasks, return_exceptions=True)
                 for i, detalhes in enumerate(detalhes_results):
                     if isinstance(detalhes, dict):
@@ -232,12 +738,12 @@ async def atualizar_dados(url, cache_path, tipo='filmes'):
 
                 cache.extend(novos_itens)
                 salvar_dados_json(cache_path, cache)
-                logger.info(f"{len(novos_itens)} novos {tipo} adicionados ao cache")
+                logger.info("%d novos %s adicionados ao cache", len(novos_itens), tipo)
             else:
-                logger.info(f"Nenhum novo {tipo} encontrado")
+                logger.info("Nenhum novo %s encontrado", tipo)
 
     except aiohttp.ClientError as e:
-        logger.error(f"Erro ao atualizar {tipo} de {url}: {e}")
+        logger.error("Erro ao atualizar %s de %s: %s", tipo, url, e)
 
 def run_async_in_thread(coro):
     """Executa uma corrotina assíncrona em uma thread."""
@@ -248,6 +754,112 @@ def run_async_in_thread(coro):
     finally:
         loop.close()
 
+# Jobs de atualização: as rotas com wait=true enfileiram (ou reaproveitam) um
+# job e respondem na hora; o resultado é consultado em /jobs/<id>. Os jobs
+# vivem no worker que os criou; entre workers e nós o status vai pelo Redis.
+jobs = {}
+jobs_em_andamento = {}  # (url, cache_path) -> id do job pendente ou executando
+jobs_lock = Lock()
+jobs_executor = ThreadPoolExecutor(max_workers=CONFIG['JOBS_MAX_WORKERS'], thread_name_prefix='atualizacao')
+
+def _executar_job(job):
+    job['status'] = 'executando'
+    job['iniciado_em'] = time.time()
+    _publicar_job(job)
+    # Single-flight entre os workers do nó: só quem obtiver o lock faz o
+    # scraping. O lock é por nó porque cada nó atualiza os próprios arquivos
+    chave = hashlib.sha1(f"{job['url']}|{job['cache_path']}".encode('utf-8')).hexdigest()
+    nome_lock = chave_redis('lock', 'atualizacao', ID_DO_NO, chave)
+    token = cache_compartilhado.adquirir_lock(nome_lock, CONFIG['LOCK_ATUALIZACAO_TTL'])
+    try:
+        if token is None:
+            logger.info("Atualização de %s já em andamento em outro worker; aguardando", job['url'])
+            job['status'] = 'em_andamento_externo'
+            job['observacao'] = 'Atualização já em andamento em outro worker deste nó'
+            _publicar_job(job)
+            esperar_lock_liberado(nome_lock)
+        else:
+            run_async_in_thread(atualizar_dados(job['url'], job['cache_path'], job['tipo']))
+        # Recarrega já, para as novidades irem para o log (e para o SSE) sem esperar uma leitura
+        if job['cache_path'] in JSON_PATHS.values():
+            carregar_snapshot(job['cache_path'])
+        job['status'] = 'concluido'
+    except Exception as e:
+        logger.error("Job %s falhou: %s", job['id'], e)
+        job['status'] = 'erro'
+        job['erro'] = str(e)
+    finally:
+        if token is not None:
+            cache_compartilhado.liberar_lock(nome_lock, token)
+        job['concluido_em'] = time.time()
+        with jobs_lock:
+            jobs_em_andamento.pop((job['url'], job['cache_path']), None)
+        _publicar_job(job)
+        job['evento'].set()
+
+def esperar_lock_liberado(nome_lock):
+    """Bloqueia até o worker que tem o lock de atualização terminar (ou o lock expirar)."""
+    limite = time.monotonic() + CONFIG['LOCK_ATUALIZACAO_TTL']
+    while time.monotonic() < limite:
+        time.sleep(CONFIG['LOCK_ATUALIZACAO_ESPERA'])
+        token = cache_compartilhado.adquirir_lock(nome_lock, CONFIG['LOCK_ATUALIZACAO_TTL'])
+        if token is not None:
+            cache_compartilhado.liberar_lock(nome_lock, token)
+            return
+    raise TimeoutError("atualização em outro worker não terminou dentro de LOCK_ATUALIZACAO_TTL")
+
+def _publicar_job(job):
+    """Guarda o status no cache compartilhado para /jobs/<id> funcionar em qualquer worker."""
+    estado = dict(resumo_job(job), cache_path=job['cache_path'], no=ID_DO_NO)
+    cache_compartilhado.set(chave_redis('job', job['id']), json.dumps(estado).encode('utf-8'), CONFIG['JOBS_RETENCAO'])
+
+def _descartar_jobs_antigos():
+    limite = time.time() - CONFIG['JOBS_RETENCAO']
+    for job_id in [j['id'] for j in jobs.values() if j.get('concluido_em') and j['concluido_em'] < limite]:
+        del jobs[job_id]
+
+def enfileirar_atualizacao(url, cache_path, tipo):
+    """Retorna o job de atualização em andamento para a URL, criando um se não houver."""
+    with jobs_lock:
+        job_id = jobs_em_andamento.get((url, cache_path))
+        if job_id:
+            return jobs[job_id]
+        _descartar_jobs_antigos()
+        job = {
+            'id': uuid.uuid4().hex,
+            'tipo': tipo,
+            'url': url,
+            'cache_path': cache_path,
+            'status': 'pendente',
+            'criado_em': time.time(),
+            'evento': Event()
+        }
+        jobs[job['id']] = job
+        jobs_em_andamento[(url, cache_path)] = job['id']
+    jobs_executor.submit(_executar_job, job)
+    return job
+
+def resumo_job(job):
+    """Campos públicos do job."""
+    return {
+        'job_id': job['id'],
+        'tipo': job['tipo'],
+        'status': job['status'],
+        'criado_em': job['criado_em'],
+        'concluido_em': job.get('concluido_em'),
+        'erro': job.get('erro'),
+        'observacao': job.get('observacao'),
+        'status_url': f"/jobs/{job['id']}"
+    }
+
+def resposta_job_aceito(job):
+    """202 com o job enfileirado, no lugar de segurar o worker até o scraping acabar."""
+    response = jsonify(resumo_job(job))
+    response.status_code = 202
+    response.headers['Location'] = f"/jobs/{job['id']}"
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 def validar_id(item_id):
     """Valida se o ID é alfanumérico e não vazio."""
     return item_id and item_id.isalnum()
@@ -267,6 +879,1337 @@ def normalize_text(text):
     text = unicodedata.normalize('NFD', text).encode('ascii', 'ignore').decode('ascii')
     return text.lower().strip()
 
+def versao_arquivos(*caminhos):
+    """Versão dos arquivos de catálogo, derivada de mtime e tamanho (só faz stat)."""
+    partes = []
+    for caminho in caminhos:
+        try:
+            st = os.stat(caminho)
+            partes.append(f"{st.st_mtime_ns:x}-{st.st_size:x}")
+        except OSError:
+            partes.append('0')
+    return '.'.join(partes)
+
+# Hash do conteúdo por versão de stat: mtime muda entre nós, o conteúdo não
+conteudo_cache = {}
+conteudo_lock = Lock()
+
+def versao_conteudo(*caminhos):
+    """Versão dos arquivos derivada do conteúdo, igual em todos os nós que têm os mesmos bytes.
+
+    Cada arquivo é lido e resumido uma vez por versão de stat; nas demais
+    chamadas custa só o stat de versao_arquivos.
+    """
+    partes = []
+    for caminho in caminhos:
+        versao = versao_arquivos(caminho)
+        with conteudo_lock:
+            resumo = conteudo_cache.get(caminho, (None, None))
+        if resumo[0] != versao:
+            try:
+                with open(caminho, 'rb') as f:
+                    resumo = (versao, hashlib.sha1(f.read()).hexdigest())
+            except OSError:
+                resumo = (versao, '0')
+            with conteudo_lock:
+                conteudo_cache[caminho] = resumo
+        partes.append(resumo[1])
+    return '.'.join(partes)
+
+class CacheLocal:
+    """Cache, locks e versão do catálogo em memória, válidos só para este processo.
+
+    É o modo usado quando não há Redis, e serve de substituto nos testes.
+    """
+    distribuido = False
+
+    def __init__(self):
+        self._valores = {}
+        self._locks = {}
+        self._contadores = {}
+        self._logs = {}
+        self._janelas = {}  # chave -> (índice da janela, contagem atual, contagem anterior)
+        self._indice_janela = 0
+        self._lock = Lock()
+        self._assinantes = []
+
+    def get(self, chave):
+        with self._lock:
+            valor, expira_em = self._valores.get(chave, (None, 0))
+            if expira_em and expira_em < time.time():
+                del self._valores[chave]
+                return None
+            return valor
+
+    def set(self, chave, valor, ttl):
+        with self._lock:
+            self._valores[chave] = (valor, time.time() + ttl)
+
+    def incr(self, chave):
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + 1
+            return self._contadores[chave]
+
+    def valor_contador(self, chave):
+        with self._lock:
+            return self._contadores.get(chave, 0)
+
+    def incr_janelas(self, chaves, janela):
+        """Conta um acesso em cada chave na janela fixa atual de `janela` segundos.
+
+        Retorna, por chave, (contagem da janela atual, contagem da anterior).
+        """
+        indice = int(time.time() // janela)
+        resultado = []
+        with self._lock:
+            if indice != self._indice_janela:
+                # Uma vez por janela: descarta quem não apareceu na anterior
+                self._janelas = {c: v for c, v in self._janelas.items() if v[0] >= indice - 1}
+                self._indice_janela = indice
+            for chave in chaves:
+                ultimo, atual, anterior = self._janelas.get(chave, (indice, 0, 0))
+                if ultimo != indice:
+                    atual, anterior = 0, (atual if ultimo == indice - 1 else 0)
+                self._janelas[chave] = (indice, atual + 1, anterior)
+                resultado.append((atual + 1, anterior))
+        return resultado
+
+    def adquirir_lock(self, nome, ttl):
+        """Retorna um token se o lock foi obtido, ou None se já está em uso."""
+        with self._lock:
+            token, expira_em = self._locks.get(nome, (None, 0))
+            if token and expira_em > time.time():
+                return None
+            token = uuid.uuid4().hex
+            self._locks[nome] = (token, time.time() + ttl)
+            return token
+
+    def liberar_lock(self, nome, token):
+        with self._lock:
+            if self._locks.get(nome, (None, 0))[0] == token:
+                del self._locks[nome]
+
+    def anexar_log(self, chave, valor, limite):
+        """Acrescenta `valor` à lista `chave`, mantendo só os `limite` mais recentes."""
+        with self._lock:
+            self._logs.setdefault(chave, deque(maxlen=limite)).append(valor)
+
+    def ler_log(self, chave):
+        with self._lock:
+            return list(self._logs.get(chave, ()))
+
+    def publicar(self, canal, mensagem):
+        for callback in list(self._assinantes):
+            callback(mensagem)
+
+    def assinar(self, canal, callback):
+        self._assinantes.append(callback)
+
+
+class CacheRedis:
+    """Mesma interface do CacheLocal sobre Redis; erros de conexão degradam para o CacheLocal."""
+    distribuido = True
+
+    def __init__(self, cliente, cliente_pubsub=None):
+        self.cliente = cliente
+        # A assinatura bloqueia lendo o socket, então não pode ter socket_timeout
+        self.cliente_pubsub = cliente_pubsub or cliente
+        self.local = CacheLocal()
+
+    def _executar(self, operacao, fallback, *args):
+        try:
+            return operacao(*args)
+        except redis.RedisError as e:
+            logger.warning("Redis indisponível (%s); usando cache local", e)
+            return fallback(*args)
+
+    def get(self, chave):
+        return self._executar(self.cliente.get, self.local.get, chave)
+
+    def set(self, chave, valor, ttl):
+        self._executar(lambda c, v, t: self.cliente.set(c, v, ex=int(t)), self.local.set, chave, valor, ttl)
+
+    def incr(self, chave):
+        return self._executar(self.cliente.incr, self.local.incr, chave)
+
+    def valor_contador(self, chave):
+        return self._executar(lambda c: int(self.cliente.get(c) or 0), self.local.valor_contador, chave)
+
+    def _incr_janelas(self, chaves, janela):
+        # Uma ida ao Redis para todas as chaves: INCR da janela atual e GET da anterior
+        indice = int(time.time() // janela)
+        with self.cliente.pipeline(transaction=False) as pipe:
+            for chave in chaves:
+                pipe.incr(f"{chave}:{indice}")
+                pipe.expire(f"{chave}:{indice}", int(janela * 2))
+                pipe.get(f"{chave}:{indice - 1}")
+            valores = pipe.execute()
+        return [(int(valores[i]), int(valores[i + 2] or 0)) for i in range(0, len(valores), 3)]
+
+    def incr_janelas(self, chaves, janela):
+        return self._executar(self._incr_janelas, self.local.incr_janelas, chaves, janela)
+
+    def adquirir_lock(self, nome, ttl):
+        token = uuid.uuid4().hex
+        return self._executar(
+            lambda n, t: token if self.cliente.set(n, token, nx=True, px=int(t * 1000)) else None,
+            self.local.adquirir_lock, nome, ttl
+        )
+
+    def _liberar_lock(self, nome, token):
+        # Só apaga se o token ainda for o nosso (o lock pode ter expirado e sido tomado)
+        with self.cliente.pipeline() as pipe:
+            pipe.watch(nome)
+            if pipe.get(nome) == token.encode('utf-8'):
+                pipe.multi()
+                pipe.delete(nome)
+                pipe.execute()
+            else:
+                pipe.unwatch()
+
+    def liberar_lock(self, nome, token):
+        self._executar(self._liberar_lock, self.local.liberar_lock, nome, token)
+
+    def _anexar_log(self, chave, valor, limite):
+        with self.cliente.pipeline() as pipe:
+            pipe.rpush(chave, valor)
+            pipe.ltrim(chave, -limite, -1)
+            pipe.execute()
+
+    def anexar_log(self, chave, valor, limite):
+        self._executar(self._anexar_log, self.local.anexar_log, chave, valor, limite)
+
+    def ler_log(self, chave):
+        return self._executar(lambda c: [v.decode('utf-8') for v in self.cliente.lrange(c, 0, -1)],
+                              self.local.ler_log, chave)
+
+    def publicar(self, canal, mensagem):
+        self._executar(self.cliente.publish, self.local.publicar, canal, mensagem)
+
+    def assinar(self, canal, callback):
+        """Escuta o canal em uma thread daemon, reconectando se o Redis cair."""
+        def escutar():
+            while True:
+                try:
+                    pubsub = self.cliente_pubsub.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(canal)
+                    for mensagem in pubsub.listen():
+                        dados = mensagem.get('data')
+                        callback(dados.decode('utf-8') if isinstance(dados, bytes) else dados)
+                except redis.RedisError as e:
+                    logger.warning("Assinatura de %s interrompida (%s); tentando de novo em 5s", canal, e)
+                    time.sleep(5)
+        Thread(target=escutar, daemon=True, name=f"assinatura-{canal}").start()
+
+
+def criar_cache_compartilhado(url=None):
+    """Usa Redis se houver URL e o pacote estiver instalado e acessível; senão, memória."""
+    if not url or redis is None:
+        return CacheLocal()
+    try:
+        cliente = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        cliente.ping()
+        logger.info("Cache compartilhado usando Redis")
+        return CacheRedis(cliente, redis.Redis.from_url(url, socket_connect_timeout=0.5))
+    except redis.RedisError as e:
+        logger.warning("Redis em %s indisponível (%s); usando cache em memória", url, e)
+        return CacheLocal()
+
+cache_compartilhado = criar_cache_compartilhado(CONFIG['REDIS_URL'])
+
+def chave_redis(*partes):
+    return ':'.join([CONFIG['REDIS_PREFIXO'], *map(str, partes)])
+
+CANAL_INVALIDACAO = chave_redis('invalidacao')
+
+def origem_invalidacao():
+    # Calculado na hora: com preload no gunicorn, os workers nascem de um fork
+    return f"{ID_DO_NO}:{os.getpid()}"
+
+def publicar_mudanca_catalogo(caminho):
+    """Descarta os corpos deste processo feitos com o arquivo e avisa os outros workers."""
+    descartar_corpos(caminho)
+    cache_compartilhado.publicar(CANAL_INVALIDACAO, json.dumps({'no': ID_DO_NO, 'origem': origem_invalidacao(),
+                                                                'caminho': caminho}))
+    logger.info("Catálogo %s recarregado", os.path.basename(caminho))
+
+def ao_receber_invalidacao(mensagem):
+    """Descarta os corpos feitos com um arquivo que outro worker deste nó recarregou.
+
+    Os corpos já são indexados pela versão dos arquivos, então isso só libera a
+    memória mais cedo. Avisos de outros nós (que servem os próprios arquivos) e
+    do próprio processo são ignorados.
+    """
+    try:
+        aviso = json.loads(mensagem)
+        no, origem, caminho = aviso['no'], aviso['origem'], aviso['caminho']
+    except (ValueError, KeyError, TypeError):
+        return
+    if no == ID_DO_NO and origem != origem_invalidacao():
+        descartar_corpos(caminho)
+
+cache_compartilhado.assinar(CANAL_INVALIDACAO, ao_receber_invalidacao)
+
+# --------------- Limite de taxa por cliente ---------------
+def limite_taxa_ligado():
+    """LIMITE_TAXA_ATIVO só vale com PROXIES_CONFIAVEIS definido (0 se não houver proxy)."""
+    return CONFIG['LIMITE_TAXA_ATIVO'] and CONFIG['PROXIES_CONFIAVEIS'] is not None
+
+if CONFIG['LIMITE_TAXA_ATIVO'] and CONFIG['PROXIES_CONFIAVEIS'] is None:
+    logger.error("LIMITE_TAXA_ATIVO ignorado: defina PROXIES_CONFIAVEIS (0 sem proxy) para identificar os clientes")
+
+def cliente_requisicao():
+    """IP do cliente: com N proxies confiáveis na frente, o N-ésimo endereço a partir do fim do X-Forwarded-For."""
+    proxies = CONFIG['PROXIES_CONFIAVEIS']
+    rota = request.access_route
+    if proxies and len(rota) >= proxies:
+        return rota[-proxies]
+    return request.remote_addr or '-'
+
+def classe_limite_taxa():
+    if request.args.get('wait', 'false').lower() == 'true':
+        return 'atualizacao'
+    regra = request.url_rule.rule if request.url_rule else None
+    return CONFIG['LIMITE_TAXA_ROTAS'].get(regra)
+
+def verificar_limite_taxa(api_key):
+    """Conta a requisição nos orçamentos do cliente; 429 com Retry-After se algum estourou.
+
+    Janela deslizante aproximada: a contagem da janela fixa anterior entra
+    proporcionalmente ao tempo que ainda se sobrepõe à janela deslizante. São
+    dois contadores por cliente e janela, atualizados com uma única operação
+    no cache compartilhado (memória ou uma ida ao Redis). Roda no
+    check_api_key, antes de qualquer carga de JSON ou busca; os cabeçalhos
+    X-RateLimit-* saem no after_request.
+    """
+    if not limite_taxa_ligado():
+        return None
+    janela = CONFIG['LIMITE_TAXA_JANELA']
+    cliente = hashlib.sha1(f"{api_key}|{cliente_requisicao()}".encode('utf-8')).hexdigest()[:16]
+    orcamentos = [('total', CONFIG['LIMITE_TAXA_TOTAL'])]
+    classe = classe_limite_taxa()
+    if classe in CONFIG['LIMITE_TAXA_CLASSES']:
+        orcamentos.append((classe, CONFIG['LIMITE_TAXA_CLASSES'][classe]))
+
+    contagens = cache_compartilhado.incr_janelas([chave_redis('taxa', cliente, nome) for nome, _ in orcamentos],
+                                                 janela)
+    decorrido = time.time() % janela
+    peso_anterior = 1 - decorrido / janela
+    # Cabeçalhos do orçamento mais apertado
+    restante, limite = min((lim - (atual + anterior * peso_anterior), lim)
+                           for (_, lim), (atual, anterior) in zip(orcamentos, contagens))
+    g.limite_taxa = (limite, max(int(restante), 0), max(int(janela - decorrido), 1))
+    if restante < 0:
+        nome = next(nome for (nome, lim), (atual, anterior) in zip(orcamentos, contagens)
+                    if atual + anterior * peso_anterior > lim)
+        logger.warning("Limite de taxa '%s' excedido para %s em %s", nome, cliente, request.path)
+        response = jsonify({'erro': 'Limite de requisições excedido, tente novamente mais tarde'})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(g.limite_taxa[2])
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    return None
+
+@app.after_request
+def cabecalhos_limite_taxa(response):
+    if 'limite_taxa' in g:
+        limite, restante, reinicio = g.limite_taxa
+        response.headers['X-RateLimit-Limit'] = str(limite)
+        response.headers['X-RateLimit-Remaining'] = str(restante)
+        response.headers['X-RateLimit-Reset'] = str(reinicio)
+    return response
+
+# Snapshots em memória dos arquivos de catálogo: caminho -> {'versao', 'dados'}.
+# Os dados são compartilhados entre requisições e não devem ser alterados.
+snapshots = {}
+snapshots_lock = Lock()
+
+def carregar_snapshot(caminho):
+    """Retorna o snapshot do arquivo, recarregando-o só quando a versão mudou."""
+    versao = versao_arquivos(caminho)
+    snapshot = snapshots.get(caminho)
+    recarregado = False
+    if snapshot is None or snapshot['versao'] != versao:
+        with lock_medido(snapshots_lock):
+            snapshot = snapshots.get(caminho)
+            if snapshot is None or snapshot['versao'] != versao:
+                anterior = snapshot
+                snapshot = {'versao': versao, 'dados': carregar_dados_json(caminho)}
+                snapshots[caminho] = snapshot
+                if anterior is not None:
+                    publicar_mudanca_catalogo(caminho)
+                recarregado = True
+        if recarregado and (caminho in TIPO_DO_CATALOGO or caminho in TIPO_DAS_NOVIDADES):
+            registrar_mudancas_catalogo(caminho, anterior, snapshot)
+    return snapshot
+
+# --------------- Log de mudanças dos catálogos ---------------
+# Versão monotônica (contador compartilhado) e log limitado das mudanças de
+# filme/serie/anime, para clientes sincronizarem só o que mudou (/mudancas).
+# Para o cliente, a versão é "<época>.<n>": a época identifica a instância do
+# contador e do log (um processo, sem Redis; o Redis, com ele) e muda quando
+# eles recomeçam, o que força a ressincronização em vez de perder mudanças.
+TIPO_DO_CATALOGO = {caminho: tipo for tipo, caminho in CATALOGOS.items()}
+# Arquivos gravados pelas atualizações de novidades, que também geram eventos
+TIPO_DAS_NOVIDADES = {
+    JSON_PATHS['filmes_novos']: 'filme',
+    JSON_PATHS['series']: 'serie',
+    JSON_PATHS['animes_novos']: 'anime',
+}
+CHAVE_VERSAO_FEED = chave_redis('feed', 'versao')
+CHAVE_LOG_FEED = chave_redis('feed', 'log')
+CHAVE_EPOCA_FEED = chave_redis('feed', 'epoca')
+CANAL_NOVIDADES = chave_redis('novidades')
+
+def diferenca_catalogo(anterior, atual):
+    """(adicionados, atualizados, removidos): ids que mudaram entre duas listas de catálogo."""
+    antigos, novos = {}, {}
+    for itens, por_id in ((anterior, antigos), (atual, novos)):
+        for item in itens:
+            if item.get('id') is not None:
+                por_id.setdefault(item.get('id'), item)  # O primeiro com o ID vence, como em ids_*
+    adicionados = [i for i in novos if i not in antigos]
+    atualizados = [i for i in novos if i in antigos and novos[i] != antigos[i]]
+    removidos = [i for i in antigos if i not in novos]
+    return adicionados, atualizados, removidos
+
+def previa_itens(dados, ids):
+    """Cartões pequenos (id, titulo, capa) dos primeiros itens de `ids`, para os eventos de novidades."""
+    ids = set(ids[:CONFIG['EVENTOS_MAX_ITENS']])
+    return [{campo: item.get(campo) for campo in ('id', 'titulo', 'capa')} for item in dados if item.get('id') in ids]
+
+def registrar_mudancas_catalogo(caminho, anterior, atual):
+    """Anexa ao log as mudanças de um catálogo ou arquivo de novidades recarregado.
+
+    Cada versão de arquivo entra uma vez só, mesmo com vários workers
+    recarregando o mesmo arquivo. No primeiro carregamento do processo não há
+    dados antigos para comparar: se um catálogo mudou desde o último visto (com
+    Redis, por outro processo), entra um pedido de ressincronização do tipo.
+    Dos arquivos de novidades só interessam os itens adicionados.
+    """
+    origem = 'catalogo' if caminho in TIPO_DO_CATALOGO else 'novidades'
+    tipo = TIPO_DO_CATALOGO.get(caminho) or TIPO_DAS_NOVIDADES[caminho]
+    arquivo = os.path.basename(caminho)
+    if cache_compartilhado.adquirir_lock(chave_redis('feed', 'visto', arquivo, atual['versao']),
+                                         CONFIG['FEED_RETENCAO']) is None:
+        return
+    chave_arquivo = chave_redis('feed', 'arquivo', arquivo)
+    ultima = cache_compartilhado.get(chave_arquivo)
+    cache_compartilhado.set(chave_arquivo, atual['versao'], CONFIG['FEED_RETENCAO'])
+
+    if anterior is None:
+        ultima = ultima.decode('utf-8') if isinstance(ultima, bytes) else ultima
+        if origem == 'catalogo' and ultima is not None and ultima != atual['versao']:
+            anexar_mudanca({'tipo': tipo, 'origem': origem, 'ressincronizar': True})
+        return
+
+    with medir_fase('filtro'):
+        adicionados, atualizados, removidos = diferenca_catalogo(anterior['dados'], atual['dados'])
+    if origem == 'novidades':
+        atualizados, removidos = [], []
+    if not (adicionados or atualizados or removidos):
+        return
+    entrada = {'tipo': tipo, 'origem': origem, 'adicionados': adicionados, 'atualizados': atualizados,
+               'removidos': removidos, 'itens': previa_itens(atual['dados'], adicionados)}
+    if len(adicionados) + len(atualizados) + len(removidos) > CONFIG['FEED_MAX_IDS_POR_ENTRADA']:
+        if origem == 'catalogo':
+            entrada = {'tipo': tipo, 'origem': origem, 'ressincronizar': True, 'itens': entrada['itens']}
+        else:
+            entrada['adicionados'] = adicionados[:CONFIG['FEED_MAX_IDS_POR_ENTRADA']]
+    anexar_mudanca(entrada)
+    logger.info("Mudanças em %s: %d adicionados, %d atualizados, %d removidos",
+                arquivo, len(adicionados), len(atualizados), len(removidos))
+
+def epoca_feed():
+    """Época do contador e do log de mudanças, criada na primeira leitura depois de eles recomeçarem."""
+    epoca = cache_compartilhado.get(CHAVE_EPOCA_FEED)
+    if epoca is None:
+        # Sem época, o contador também pode ter recomeçado: nenhuma versão antiga vale
+        cache_compartilhado.set(CHAVE_EPOCA_FEED, uuid.uuid4().hex[:12], CONFIG['FEED_RETENCAO'])
+        epoca = cache_compartilhado.get(CHAVE_EPOCA_FEED)
+    return epoca.decode('ascii') if isinstance(epoca, bytes) else epoca
+
+def token_feed(epoca, versao):
+    return f"{epoca}.{versao}"
+
+def ler_token_feed(token):
+    """(época, versão) de um token "<época>.<n>"; ValueError se estiver malformado."""
+    epoca, separador, versao = token.rpartition('.')
+    if not separador or not epoca:
+        raise ValueError(token)
+    return epoca, int(versao)
+
+def anexar_mudanca(entrada):
+    """Numera a entrada com a próxima versão e a anexa ao log, em ordem entre os nós."""
+    nome_lock = chave_redis('lock', 'feed')
+    prazo = time.monotonic() + 5
+    token = cache_compartilhado.adquirir_lock(nome_lock, 5)
+    while token is None and time.monotonic() < prazo:
+        time.sleep(0.01)
+        token = cache_compartilhado.adquirir_lock(nome_lock, 5)
+    try:
+        epoca = epoca_feed()
+        entrada = dict(entrada, versao=cache_compartilhado.incr(CHAVE_VERSAO_FEED), em=time.time())
+        cache_compartilhado.anexar_log(CHAVE_LOG_FEED, json.dumps(entrada), CONFIG['FEED_MAX_ENTRADAS'])
+        # Renova a validade da época enquanto o log está em uso
+        cache_compartilhado.set(CHAVE_EPOCA_FEED, epoca, CONFIG['FEED_RETENCAO'])
+    finally:
+        if token is not None:
+            cache_compartilhado.liberar_lock(nome_lock, token)
+    cache_compartilhado.publicar(CANAL_NOVIDADES, json.dumps({'versao': entrada['versao']}))
+
+def mudancas_desde(desde, tipo=None, origem='catalogo'):
+    """Mudanças depois do token `desde`, o token atual e se o cliente precisa ressincronizar tudo.
+
+    O log está completo para `desde` se ele é da época atual e todas as
+    versões seguintes até a atual ainda estão no log; se não (log truncado,
+    ou contador reiniciado, de outro processo ou de antes de um restart), só
+    uma sincronização completa resolve. `origem` None inclui também as
+    entradas dos arquivos de novidades.
+    """
+    epoca = epoca_feed()
+    entradas = sorted((json.loads(valor) for valor in cache_compartilhado.ler_log(CHAVE_LOG_FEED)),
+                      key=lambda entrada: entrada['versao'])
+    atual = entradas[-1]['versao'] if entradas else cache_compartilhado.valor_contador(CHAVE_VERSAO_FEED)
+    epoca_cliente, vista = ler_token_feed(desde) if desde is not None else (None, None)
+    novas = [entrada for entrada in entradas if entrada['versao'] > vista] if epoca_cliente == epoca else []
+    ressincronizar = epoca_cliente != epoca or vista > atual or \
+        [entrada['versao'] for entrada in novas] != list(range(vista + 1, atual + 1))
+    if ressincronizar:
+        novas = []
+    return {
+        'versao': token_feed(epoca, atual),
+        'desde': desde,
+        'ressincronizar': ressincronizar,
+        'mudancas': [dict(entrada, versao=token_feed(epoca, entrada['versao'])) for entrada in novas
+                     if (tipo is None or entrada['tipo'] == tipo)
+                     and (origem is None or entrada.get('origem', 'catalogo') == origem)],
+    }
+
+# Índices derivados dos snapshots, reconstruídos quando a versão dos arquivos muda:
+# nome -> {'caminhos', 'construir', 'estado'}, com estado = (versão, dados dos snapshots, valor)
+# trocado de uma vez, para que quem lê nunca veja um índice com os dados de outra versão
+indices = {}
+indices_lock = Lock()
+
+def registrar_indice(nome, caminhos, construir):
+    """Registra um índice; `construir` recebe os dados dos snapshots de `caminhos`, na ordem."""
+    indices[nome] = {'caminhos': caminhos, 'construir': construir, 'estado': None}
+
+def obter_indice_com_dados(nome):
+    """(dados dos snapshots de `caminhos`, índice) da versão atual, o índice construído sobre esses dados.
+
+    Quem cruza posições do índice com itens dos snapshots usa este par: ler
+    carregar_snapshot e obter_indice em separado pode pegar versões diferentes
+    se o arquivo for trocado entre as duas chamadas.
+    """
+    indice = indices[nome]
+    versao = versao_arquivos(*indice['caminhos'])
+    estado = indice['estado']
+    if estado is None or estado[0] != versao:
+        with lock_medido(indices_lock):
+            estado = indice['estado']
+            if estado is None or estado[0] != versao:
+                with medir_fase('carga'):
+                    usados = [carregar_snapshot(c) for c in indice['caminhos']]
+                    dados = tuple(snapshot['dados'] for snapshot in usados)
+                    estado = ('.'.join(snapshot['versao'] for snapshot in usados), dados, indice['construir'](*dados))
+                indice['estado'] = estado
+    return estado[1], estado[2]
+
+def obter_indice(nome):
+    """Retorna o índice para a versão atual dos arquivos, construindo-o se preciso."""
+    return obter_indice_com_dados(nome)[1]
+
+# Registro por ID de cada catálogo (o primeiro com o ID vence, como na busca linear)
+for _tipo, _caminho in CATALOGOS.items():
+    registrar_indice(f'ids_{_tipo}', [_caminho], lambda dados: {item.get('id'): item for item in reversed(dados)})
+
+def trigramas(texto):
+    """Trigramas de cada palavra do texto já normalizado, com bordas ('  na', 'na ')."""
+    grams = set()
+    for palavra in texto.split():
+        palavra = f"  {palavra} "
+        grams.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return grams
+
+def construir_indice_trigramas(*catalogos):
+    """Índice invertido de trigramas sobre titulo e titulo_original dos catálogos.
+
+    Cada título é um documento; `postings` leva o trigrama aos documentos que o
+    contêm e `documentos` guarda (posição do item em `itens`, texto normalizado,
+    nº de trigramas). Os trigramas são internados para não repetir strings.
+    """
+    itens, documentos, postings, internados = [], [], defaultdict(list), {}
+    for tipo, dados in zip(CATALOGOS, catalogos):
+        for item in dados:
+            posicao = len(itens)
+            itens.append((tipo, item))
+            vistos = set()
+            for campo in ('titulo', 'titulo_original'):
+                texto = normalize_text(item.get(campo, ''))
+                if not texto or texto in vistos:
+                    continue
+                vistos.add(texto)
+                grams = trigramas(texto)
+                doc = len(documentos)
+                documentos.append((posicao, texto, len(grams)))
+                for gram in grams:
+                    postings[internados.setdefault(gram, gram)].append(doc)
+    return {'itens': itens, 'documentos': documentos, 'postings': dict(postings)}
+
+registrar_indice('trigramas', list(CATALOGOS.values()), construir_indice_trigramas)
+
+def construir_indice_prefixos(*catalogos):
+    """Arrays ordenados de títulos normalizados para o autocompletar.
+
+    `titulos` tem os títulos inteiros (titulo e titulo_original); `palavras`,
+    o título a partir de cada palavra seguinte, para "vingadores" achar "Os
+    Vingadores". Cada entrada aponta para um cartão pronto (id, tipo, titulo,
+    capa) em `cartoes`.
+    """
+    cartoes, titulos, palavras = [], [], []
+    for tipo, dados in zip(CATALOGOS, catalogos):
+        for item in dados:
+            posicao = len(cartoes)
+            cartoes.append(projetar(item, ('id', 'titulo', 'capa'), {'tipo': tipo}))
+            for campo in ('titulo', 'titulo_original'):
+                texto = ' '.join(normalize_text(item.get(campo, '')).split())
+                if not texto:
+                    continue
+                titulos.append((texto, posicao))
+                palavras.extend((texto[i + 1:], posicao) for i, c in enumerate(texto) if c == ' ')
+    titulos.sort()
+    palavras.sort()
+    return {
+        'cartoes': cartoes,
+        'titulos': ([texto for texto, _ in titulos], [posicao for _, posicao in titulos]),
+        'palavras': ([texto for texto, _ in palavras], [posicao for _, posicao in palavras]),
+    }
+
+registrar_indice('prefixos', list(CATALOGOS.values()), construir_indice_prefixos)
+
+def autocompletar(prefixo, limite):
+    """Até `limite` cartões cujo título começa com `prefixo` (já normalizado), em O(log n + k).
+
+    Títulos que começam com o prefixo vêm antes dos que só têm uma palavra
+    começando com ele; cada item aparece uma vez.
+    """
+    indice = obter_indice('prefixos')
+    vistos, sugestoes = set(), []
+    for chaves, posicoes in (indice['titulos'], indice['palavras']):
+        i = bisect_left(chaves, prefixo)
+        while i < len(chaves) and len(sugestoes) < limite and chaves[i].startswith(prefixo):
+            if posicoes[i] not in vistos:
+                vistos.add(posicoes[i])
+                sugestoes.append(indice['cartoes'][posicoes[i]])
+            i += 1
+    return sugestoes
+
+def construir_campos_busca(dados):
+    """(titulo, titulo_original, gêneros) normalizados de cada item, alinhados com `dados`.
+
+    Gêneros que não são lista viram None: o item nunca casa na busca por gênero.
+    """
+    campos = []
+    for item in dados:
+        generos = item.get('generos', [])
+        if isinstance(generos, list):
+            generos = tuple(normalize_text(g) for g in generos)
+        else:
+            logger.warning("Item %s tem gêneros inválidos: %s", item.get('id', 'unknown'), generos)
+            generos = None
+        campos.append((normalize_text(item.get('titulo', '')), normalize_text(item.get('titulo_original', '')), generos))
+    return campos
+
+for _tipo, _caminho in CATALOGOS.items():
+    registrar_indice(f'busca_{_tipo}', [_caminho], construir_campos_busca)
+
+def correspondencias(tipos, casa):
+    """Gera (tipo, posição, item) dos catálogos de `tipos` cujos campos normalizados satisfazem `casa`."""
+    for tipo in tipos:
+        (dados,), indice = obter_indice_com_dados(f'busca_{tipo}')
+        for posicao, (item, campos) in enumerate(zip(dados, indice)):
+            if casa(campos):
+                yield tipo, posicao, item
+
+def paginar_correspondencias(encontrados, pagina, so_contagem=False, campos=None):
+    """Conta os resultados de `encontrados` e copia (com 'tipo') só os da página pedida.
+
+    Retorna (itens da página, total). Com `so_contagem`, nenhum item é copiado;
+    com `campos`, os itens saem projetados (veja `registro_de_busca`).
+    """
+    inicio = (pagina - 1) * CONFIG['ITEMS_PER_PAGE']
+    fim = inicio + CONFIG['ITEMS_PER_PAGE']
+    pagina_itens, total = [], 0
+    for tipo, posicao, item in encontrados:
+        if not so_contagem and inicio <= total < fim:
+            pagina_itens.append(registro_de_busca(tipo, posicao, item, campos))
+        total += 1
+    return pagina_itens, total
+
+# --------------- Projeção de campos (fields=) ---------------
+CAMPOS_CARTAO = ('id', 'titulo', 'capa', 'qualidade')  # O que as telas em grade usam
+
+def campos_pedidos():
+    """Lê `fields=` da requisição: None (registro completo), 'card' ou nomes separados por vírgula."""
+    valor = request.args.get('fields', '').strip()
+    if not valor:
+        return None
+    if valor == 'card':
+        return CAMPOS_CARTAO
+    campos = tuple(dict.fromkeys(c.strip() for c in valor.split(',') if c.strip()))
+    return CAMPOS_CARTAO if campos == CAMPOS_CARTAO else campos or None
+
+def projetar(item, campos, extras=None):
+    """Só os `campos` do item (+ `extras`)."""
+    return {**{campo: item[campo] for campo in campos if campo in item}, **(extras or {})}
+
+# Cartões pré-calculados por snapshot: as listas paginadas e as novidades (os catálogos
+# de busca usam os mesmos cartões, só acrescentando o tipo nos itens da página)
+for _nome in ('filmes_pagina', 'series_nomes', 'animes_nomes', 'filmes_novos', 'animes_novos', 'series'):
+    registrar_indice(f'cartoes_{_nome}', [JSON_PATHS[_nome]],
+                     lambda dados: [projetar(item, CAMPOS_CARTAO) for item in dados])
+
+NOME_DO_CATALOGO = {tipo: nome for tipo, caminho in CATALOGOS.items()
+                    for nome, caminho_nome in JSON_PATHS.items() if caminho_nome == caminho}
+
+def registros(nome, campos=None, inicio=0, fim=None):
+    """Fatia [inicio:fim] do snapshot de JSON_PATHS[nome], inteira ou projetada em `campos`.
+
+    Cartões vêm prontos do índice do snapshot; outras listas de campos são
+    projetadas só para os itens da fatia.
+    """
+    if campos == CAMPOS_CARTAO:
+        return obter_indice(f'cartoes_{nome}')[inicio:fim]
+    dados = carregar_snapshot(JSON_PATHS[nome])['dados'][inicio:fim]
+    return dados if campos is None else [projetar(item, campos) for item in dados]
+
+def registro_de_busca(tipo, posicao, item, campos=None):
+    """Item de um resultado de busca, com 'tipo', inteiro ou projetado em `campos`.
+
+    O cartão pronto só é usado se foi construído a partir deste mesmo `item`;
+    se o snapshot mudou no meio da requisição, o item é projetado na hora.
+    """
+    if campos is None:
+        return {**item, 'tipo': tipo}
+    if campos == CAMPOS_CARTAO:
+        (dados,), cartoes = obter_indice_com_dados(f'cartoes_{NOME_DO_CATALOGO[tipo]}')
+        if posicao < len(dados) and dados[posicao] is item:
+            return {**cartoes[posicao], 'tipo': tipo}
+    return projetar(item, campos, {'tipo': tipo})
+
+def construir_indice_generos(*catalogos):
+    """Facetas de gênero tiradas dos catálogos: contagem por tipo e busca por prefixo.
+
+    Grafias que normalizam igual ("Ação"/"Acao") viram um só gênero, exibido com
+    a grafia mais frequente. `chaves`/`posicoes` são ordenados para bisect, com
+    o nome inteiro e o nome a partir de cada palavra ("fantasy" acha "Sci-Fi &
+    Fantasy"); `generos` já vem do mais popular para o menos.
+    """
+    contagens = defaultdict(Counter)  # nome normalizado -> tipo -> itens
+    grafias = defaultdict(Counter)
+    for tipo, dados in zip(CATALOGOS, catalogos):
+        for item in dados:
+            generos = item.get('generos', [])
+            if not isinstance(generos, list):
+                continue
+            chaves = set()
+            for nome in set(g.strip() for g in generos if isinstance(g, str) and g.strip()):
+                chave = normalize_text(nome)
+                grafias[chave][nome] += 1
+                chaves.add(chave)
+            # O item conta uma vez por gênero, mesmo com duas grafias dele ("Ação", "Acao")
+            for chave in chaves:
+                contagens[chave][tipo] += 1
+
+    generos = sorted(
+        ({'genero': grafias[chave].most_common(1)[0][0], 'total': sum(por_tipo.values()),
+          'por_tipo': {tipo: por_tipo.get(tipo, 0) for tipo in CATALOGOS}, 'chave': chave}
+         for chave, por_tipo in contagens.items()),
+        key=lambda faceta: (-faceta['total'], faceta['chave'])
+    )
+    entradas = []
+    for posicao, faceta in enumerate(generos):
+        chave = faceta.pop('chave')
+        entradas.append((chave, posicao))
+        entradas.extend((chave[i + 1:], posicao) for i, c in enumerate(chave) if c in ' -&/')
+    entradas = sorted((chave.lstrip(' -&/'), posicao) for chave, posicao in entradas if chave.lstrip(' -&/'))
+    return {
+        'generos': generos,
+        'chaves': [chave for chave, _ in entradas],
+        'posicoes': [posicao for _, posicao in entradas],
+    }
+
+registrar_indice('generos', list(CATALOGOS.values()), construir_indice_generos)
+
+def sugerir_generos(prefixo, tipo='all'):
+    """Facetas cujo nome (ou uma palavra dele) começa com `prefixo`, da mais popular à menos.
+
+    Com `tipo`, só entram gêneros que têm itens desse tipo, ordenados pela contagem nele.
+    """
+    indice = obter_indice('generos')
+    if prefixo:
+        i = bisect_left(indice['chaves'], prefixo)
+        posicoes = set()
+        while i < len(indice['chaves']) and indice['chaves'][i].startswith(prefixo):
+            posicoes.add(indice['posicoes'][i])
+            i += 1
+        facetas = [indice['generos'][p] for p in sorted(posicoes)]
+    else:
+        facetas = indice['generos']
+    if tipo != 'all':
+        facetas = sorted((f for f in facetas if f['por_tipo'].get(tipo)), key=lambda f: -f['por_tipo'][tipo])
+    return facetas
+
+def chave_data(item):
+    """(ano, mês, dia) de data_estreia/data_lancamento ("2006-07-01", "2025"), ou None se não houver data.
+
+    Partes ausentes valem 0, então "2025" ordena antes de "2025-01-10".
+    """
+    texto = str(item.get('data_estreia') or item.get('data_lancamento') or '').strip()
+    partes = texto.split('-')
+    if not partes[0].isdigit() or len(partes[0]) != 4:
+        return None
+    numeros = [int(p) if p.isdigit() else 0 for p in partes[1:3]]
+    return (int(partes[0]), *numeros, *[0] * (2 - len(numeros)))
+
+ORDENS_NAVEGACAO = ('recentes', 'antigos', 'titulo')
+
+def construir_indice_navegacao(*catalogos):
+    """Índices da navegação facetada, sobre os itens dos catálogos concatenados.
+
+    Cada item ganha um número global (`itens[n] = (tipo, posição)`); `ordens`
+    guarda a permutação já ordenada de cada ordem e `posto` a posição do item
+    nela. Tipo, gênero (pela chave normalizada), qualidade e ano têm
+    conjuntos/listas ordenadas de números para filtrar sem varrer o catálogo.
+    Itens sem data ficam no fim das ordens por data.
+    """
+    itens, datas, titulos = [], [], []
+    por_tipo, por_genero, por_qualidade = defaultdict(set), defaultdict(set), defaultdict(set)
+    for tipo, dados in zip(CATALOGOS, catalogos):
+        for posicao, item in enumerate(dados):
+            n = len(itens)
+            itens.append((tipo, posicao))
+            datas.append(chave_data(item))
+            titulos.append(''.join(c for c in normalize_text(item.get('titulo', '')) if c.isalnum() or c == ' ').strip())
+            por_tipo[tipo].add(n)
+            generos = item.get('generos', [])
+            if isinstance(generos, list):
+                for genero in generos:
+                    if isinstance(genero, str) and genero.strip():
+                        por_genero[normalize_text(genero.strip())].add(n)
+            por_qualidade[normalize_text(str(item.get('qualidade') or ''))].add(n)
+
+    com_data = sorted((n for n, data in enumerate(datas) if data), key=datas.__getitem__)
+    sem_data = [n for n, data in enumerate(datas) if not data]
+    ordens = {
+        'recentes': com_data[::-1] + sem_data,
+        'antigos': com_data + sem_data,
+        # Títulos sem letras latinas nem dígitos (escrita não latina) vão para o fim
+        'titulo': sorted(range(len(itens)), key=lambda n: (not titulos[n], titulos[n], n)),
+    }
+    posto = {}
+    for ordem, permutacao in ordens.items():
+        posto[ordem] = [0] * len(itens)
+        for i, n in enumerate(permutacao):
+            posto[ordem][n] = i
+    anos = sorted((data[0], n) for n, data in enumerate(datas) if data)
+    return {
+        'itens': itens,
+        'ordens': ordens,
+        'posto': posto,
+        'por_tipo': dict(por_tipo),
+        'por_genero': dict(por_genero),
+        'por_qualidade': dict(por_qualidade),
+        'anos': ([ano for ano, _ in anos], [n for _, n in anos]),
+    }
+
+registrar_indice('navegacao', list(CATALOGOS.values()), construir_indice_navegacao)
+
+def navegar(tipos=None, generos=None, qualidades=None, ano_min=None, ano_max=None, ordem='recentes', indice=None):
+    """(números dos itens na `ordem`, total) que passam nos filtros; None em um filtro = sem filtro.
+
+    Sem filtros, devolve a própria permutação pré-calculada. Com filtros, cruza
+    os conjuntos do índice (menor primeiro) e ordena o resultado pelo posto,
+    ou percorre a permutação quando o resultado é grande demais para compensar.
+    `indice` é o de obter_indice_com_dados, quando quem chama também lê os itens.
+    """
+    indice = indice or obter_indice('navegacao')
+    filtros = []
+    if tipos is not None:
+        filtros.append(set().union(*(indice['por_tipo'].get(t, ()) for t in tipos)))
+    if generos is not None:
+        filtros.append(set().union(*(indice['por_genero'].get(g, ()) for g in generos)))
+    if qualidades is not None:
+        filtros.append(set().union(*(indice['por_qualidade'].get(q, ()) for q in qualidades)))
+    if ano_min is not None or ano_max is not None:
+        anos, numeros = indice['anos']
+        inicio = bisect_left(anos, ano_min) if ano_min is not None else 0
+        fim = bisect_left(anos, ano_max + 1) if ano_max is not None else len(anos)
+        filtros.append(set(numeros[inicio:fim]))
+
+    permutacao = indice['ordens'][ordem]
+    if not filtros:
+        return permutacao, len(permutacao)
+    filtros.sort(key=len)
+    candidatos = filtros[0].intersection(*filtros[1:])
+    if len(candidatos) * 8 < len(permutacao):
+        return sorted(candidatos, key=indice['posto'][ordem].__getitem__), len(candidatos)
+    return [n for n in permutacao if n in candidatos], len(candidatos)
+
+def construir_indice_similares(*catalogos):
+    """Matriz item x gênero com peso IDF, normalizada por linha, para similaridade de cosseno.
+
+    Fica em colunas esparsas (linhas e pesos de cada gênero), já que cada item
+    tem poucos gêneros: o score de todos os itens contra um é a soma de poucas
+    colunas, sem laço por item. As linhas seguem os catálogos concatenados,
+    então cada tipo ocupa a faixa `faixas[tipo]`.
+    """
+    linhas, ids, pares = {}, [], []  # (tipo, id) -> linha; id de cada linha; (linha, gênero)
+    faixas, total = {}, 0
+    for tipo, dados in zip(CATALOGOS, catalogos):
+        faixas[tipo] = (total, total + len(dados))
+        for item in dados:
+            linhas.setdefault((tipo, item.get('id')), total)
+            ids.append(item.get('id'))
+            generos = item.get('generos', [])
+            if isinstance(generos, list):
+                for genero in {normalize_text(g) for g in generos if isinstance(g, str) and g.strip()}:
+                    pares.append((total, genero))
+            total += 1
+
+    vocabulario = {genero: i for i, genero in enumerate(sorted({genero for _, genero in pares}))}
+    linha_de = np.fromiter((linha for linha, _ in pares), dtype=np.int32, count=len(pares))
+    genero_de = np.fromiter((vocabulario[genero] for _, genero in pares), dtype=np.int32, count=len(pares))
+    df = np.bincount(genero_de, minlength=len(vocabulario))
+    peso = (np.log((1 + total) / (1 + df)) + 1).astype(np.float32)[genero_de]
+    norma = np.sqrt(np.bincount(linha_de, weights=peso ** 2, minlength=total))
+    peso /= norma[linha_de]
+
+    ordem = np.argsort(genero_de, kind='stable')
+    inicio_coluna = np.searchsorted(genero_de[ordem], np.arange(len(vocabulario) + 1))
+    return {
+        'linhas': linhas,
+        'ids': ids,
+        'faixas': faixas,
+        'total': total,
+        'genero_linha': genero_de,
+        'peso_linha': peso,
+        'coluna_linhas': linha_de[ordem],
+        'coluna_pesos': peso[ordem],
+        'inicio_coluna': inicio_coluna,
+        'entradas_por_linha': np.searchsorted(linha_de, np.arange(total + 1)),
+    }
+
+if np is not None:
+    registrar_indice('similares', list(CATALOGOS.values()), construir_indice_similares)
+
+def similares(tipo, item_id, tipos, limite, indice=None):
+    """[(tipo, posição, score)] dos `limite` itens de `tipos` mais parecidos com o item, ou None se não existe.
+
+    Cosseno entre os vetores IDF de gêneros: uma passada vetorizada sobre as
+    colunas dos gêneros do item e argpartition para o top-k. `indice` é o de
+    obter_indice_com_dados, quando quem chama também lê os itens.
+    """
+    indice = indice or obter_indice('similares')
+    linha = indice['linhas'].get((tipo, item_id))
+    if linha is None:
+        return None
+    scores = np.zeros(indice['total'], dtype=np.float32)
+    inicio, fim = indice['entradas_por_linha'][linha], indice['entradas_por_linha'][linha + 1]
+    for genero, peso in zip(indice['genero_linha'][inicio:fim], indice['peso_linha'][inicio:fim]):
+        coluna = slice(indice['inicio_coluna'][genero], indice['inicio_coluna'][genero + 1])
+        scores[indice['coluna_linhas'][coluna]] += peso * indice['coluna_pesos'][coluna]
+
+    scores[linha] = 0
+    for outro, (ini, fim_faixa) in indice['faixas'].items():
+        if outro not in tipos:
+            scores[ini:fim_faixa] = 0
+    # Alguns com folga: cópias do próprio item (mesmo id repetido no arquivo) saem depois
+    k = min(limite + 5, int(np.count_nonzero(scores > 0)))
+    if k == 0:
+        return []
+    melhores = np.argpartition(-scores, k - 1)[:k]
+    melhores = melhores[np.lexsort((melhores, -scores[melhores]))]
+
+    resultado = []
+    for n in melhores.tolist():
+        tipo_n = next(t for t, (ini, fim_faixa) in indice['faixas'].items() if ini <= n < fim_faixa)
+        if (tipo_n, indice['ids'][n]) != (tipo, item_id):
+            resultado.append((tipo_n, n - indice['faixas'][tipo_n][0], round(float(scores[n]), 4)))
+    return resultado[:limite]
+
+def buscar_fuzzy(termo_normalizado, limite, campos=None):
+    """Top-k de itens por similaridade de trigramas com o termo, dentro do orçamento de tempo.
+
+    Percorre as listas de postings do trigrama mais raro para o mais comum,
+    contando trigramas em comum por documento; se o orçamento estourar, para e
+    pontua o que já contou (`parcial`). Só os melhores candidatos são
+    re-pontuados: Dice dos trigramas, com bônus quando o termo aparece inteiro
+    no título.
+    """
+    inicio = time.perf_counter()
+    orcamento = CONFIG['BUSCA_FUZZY_ORCAMENTO_MS'] / 1000
+    indice = obter_indice('trigramas')
+    grams_termo = trigramas(termo_normalizado)
+    listas = sorted((indice['postings'].get(gram, ()) for gram in grams_termo), key=len)
+
+    comuns = Counter()
+    parcial = False
+    for lista in listas:
+        if time.perf_counter() - inicio > orcamento:
+            parcial = True
+            break
+        comuns.update(lista)
+
+    melhores = {}
+    for doc, em_comum in comuns.most_common(CONFIG['BUSCA_FUZZY_CANDIDATOS']):
+        posicao, texto, total = indice['documentos'][doc]
+        score = 2 * em_comum / (len(grams_termo) + total)
+        if termo_normalizado in texto:
+            score += 0.5
+        if score >= CONFIG['BUSCA_FUZZY_SCORE_MINIMO'] and score > melhores.get(posicao, 0):
+            melhores[posicao] = score
+
+    ranking = sorted(melhores.items(), key=lambda par: (-par[1], par[0]))[:limite]
+    resultados = []
+    for posicao, score in ranking:
+        tipo, item = indice['itens'][posicao]
+        extras = {'tipo': tipo, 'score': round(score, 4)}
+        resultados.append({**item, **extras} if campos is None else projetar(item, campos, extras))
+    return resultados, parcial
+
+def calcular_etag(chave_cache, codificacao):
+    """ETag forte da representação: versão + parâmetros + codificação."""
+    resumo = hashlib.sha1(repr(chave_cache).encode('utf-8')).hexdigest()[:20]
+    return resumo if codificacao == 'identity' else f"{resumo}-{codificacao}"
+
+def escolher_codificacao():
+    """Escolhe br, gzip ou identity a partir do Accept-Encoding da requisição."""
+    if not has_request_context():
+        return 'identity'
+    aceitas = request.accept_encodings
+    if brotli is not None and aceitas['br']:
+        return 'br'
+    if aceitas['gzip']:
+        return 'gzip'
+    return 'identity'
+
+def comprimir(corpo, codificacao):
+    """Comprime o corpo na codificação pedida; corpos pequenos não compensam."""
+    if codificacao == 'identity' or len(corpo) < CONFIG['COMPRESS_MIN_BYTES']:
+        return corpo, 'identity'
+    if codificacao == 'br':
+        return brotli.compress(corpo, quality=CONFIG['BROTLI_QUALITY']), 'br'
+    return gzip.compress(corpo, compresslevel=CONFIG['GZIP_LEVEL'], mtime=0), 'gzip'
+
+def serializar_json(dados):
+    """Serializa como o jsonify faria (compacto fora do modo debug), mas devolve bytes."""
+    if (app.json.compact is None and app.debug) or app.json.compact is False:
+        argumentos = {'indent': 2}
+    else:
+        argumentos = {'separators': (',', ':')}
+    return (app.json.dumps(dados, **argumentos) + "\n").encode('utf-8')
+
+def montar_resposta(corpo, codificacao, status=200):
+    response = app.response_class(corpo, status=status, mimetype=app.json.mimetype)
+    if codificacao != 'identity':
+        response.headers['Content-Encoding'] = codificacao
+    response.vary.add('Accept-Encoding')
+    return response
+
+def aplicar_validadores(response, etag, cache_control):
+    """Adiciona ETag, Cache-Control e Vary a uma resposta de catálogo."""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    # As rotas exigem X-API-Key; um cache compartilhado não pode reaproveitar
+    # a resposta para uma requisição com outra chave (ou sem chave)
+    response.vary.update(('Accept-Encoding', 'X-API-Key'))
+    return response
+
+def resposta_json(dados, status=200):
+    """Resposta JSON comprimida conforme o Accept-Encoding, sem cache."""
+    with medir_fase('serializacao'):
+        corpo, codificacao = comprimir(serializar_json(dados), escolher_codificacao())
+    return montar_resposta(corpo, codificacao, status)
+
+# Cache LRU de corpos já serializados/comprimidos:
+# (chave, caminhos, versão) -> {codificação pedida: (bytes, codificação aplicada)}
+corpos_cache = OrderedDict()
+corpos_cache_bytes = 0
+corpos_lock = Lock()
+
+def _guardar_corpo(chave_cache, pedida, corpo, codificacao):
+    global corpos_cache_bytes
+    with corpos_lock:
+        variantes = corpos_cache.setdefault(chave_cache, {})
+        if pedida not in variantes:
+            variantes[pedida] = (corpo, codificacao)
+            corpos_cache_bytes += len(corpo)
+        corpos_cache.move_to_end(chave_cache)
+        while corpos_cache_bytes > CONFIG['CACHE_CORPOS_MAX_BYTES'] and len(corpos_cache) > 1:
+            _, antigas = corpos_cache.popitem(last=False)
+            corpos_cache_bytes -= sum(len(c) for c, _ in antigas.values())
+
+def descartar_corpos(caminho):
+    """Remove do cache os corpos gerados a partir de `caminho`."""
+    global corpos_cache_bytes
+    with corpos_lock:
+        for chave_cache in [c for c in corpos_cache if caminho in c[1]]:
+            corpos_cache_bytes -= sum(len(corpo) for corpo, _ in corpos_cache.pop(chave_cache).values())
+
+def _buscar_corpo(chave_cache, pedida):
+    with corpos_lock:
+        variantes = corpos_cache.get(chave_cache)
+        if variantes is None or pedida not in variantes:
+            return None
+        corpos_cache.move_to_end(chave_cache)
+        return variantes[pedida]
+
+def resposta_versionada(chave, caminhos, gerar, cache_control=None, compartilhar=False, cacheavel=None):
+    """Resposta JSON de um payload que só depende da versão dos arquivos em `caminhos`.
+
+    O payload é gerado, serializado e comprimido uma única vez por versão e
+    codificação; as requisições seguintes devolvem os bytes do cache. Um
+    If-None-Match com a ETag atual recebe 304 sem carregar nem serializar
+    nada. A ETag vem do hash do conteúdo dos arquivos (versao_conteudo), então
+    vale em qualquer nó com os mesmos bytes, mesmo com outro mtime. Com
+    `compartilhar`, o corpo também vai para o Redis (se houver), indexado pela
+    ETag, para os outros workers e nós. Retorna None se `gerar` devolver None. Se `cacheavel(dados)` for
+    falso, a resposta sai com no-store, sem ETag e sem passar pelos caches.
+    """
+    versao = versao_arquivos(*caminhos)
+    chave_cache = (chave, tuple(caminhos), versao)
+    pedida = escolher_codificacao()
+    etag = calcular_etag((chave, versao_conteudo(*caminhos)), pedida)
+    cache_control = cache_control or CONFIG['CACHE_CONTROL']
+
+    if has_request_context() and etag in request.if_none_match:
+        return aplicar_validadores(app.response_class(status=304), etag, cache_control)
+
+    encontrado = _buscar_corpo(chave_cache, pedida)
+    chave_global = None
+    if encontrado is None and compartilhar and cache_compartilhado.distribuido:
+        # A ETag é do conteúdo dos arquivos: um corpo do Redis só é servido (e
+        # guardado sob a versão local) se veio destes mesmos bytes
+        chave_global = chave_redis('resposta', etag)
+        valor = cache_compartilhado.get(chave_global)
+        if valor:
+            codificacao, _, corpo = valor.partition(b'\n')
+            encontrado = (corpo, codificacao.decode('ascii'))
+            _guardar_corpo(chave_cache, pedida, *encontrado)
+    if encontrado is None:
+        bruto = _buscar_corpo(chave_cache, 'identity')
+        if bruto is None:
+            with medir_fase('filtro'):
+                dados = gerar()
+            if dados is None:
+                return None
+            with medir_fase('serializacao'):
+                bruto = (serializar_json(dados), 'identity')
+            if cacheavel is not None and not cacheavel(dados):
+                with medir_fase('serializacao'):
+                    resposta = montar_resposta(*comprimir(bruto[0], pedida))
+                resposta.headers['Cache-Control'] = 'no-store'
+                return resposta
+            _guardar_corpo(chave_cache, 'identity', *bruto)
+        with medir_fase('serializacao'):
+            encontrado = comprimir(bruto[0], pedida)
+        _guardar_corpo(chave_cache, pedida, *encontrado)
+        if chave_global:
+            cache_compartilhado.set(chave_global, encontrado[1].encode('ascii') + b'\n' + encontrado[0],
+                                    CONFIG['CACHE_COMPARTILHADO_TTL'])
+    return aplicar_validadores(montar_resposta(*encontrado), etag, cache_control)
+
+def codigos_do_cache(caminho):
+    """Payload de /codigos/* a partir do arquivo em cache, ou None se estiver vazio."""
+    cache = carregar_snapshot(caminho)['dados']
+    if not cache:
+        return None
+    logger.info("Retornando %d códigos do cache", len(cache.get('codigos', [])))
+    payload = {"codigos": ", ".join(cache.get("codigos", []))}
+    codigos_bons[caminho] = payload
+    return payload
+
+# --------------- Listas de códigos do upstream (/codigos/*) ---------------
+# Último payload bom de cada arquivo de códigos, para servir velho se o arquivo sumir
+codigos_bons = {}
+
+def _extrair_codigos_filmes(response):
+    soup = BeautifulSoup(response.content, CONFIG['HTML_PARSER'])
+    return re.findall(r'tt\d+', soup.get_text())
+
+def _extrair_codigos_series(response):
+    soup = BeautifulSoup(response.content, CONFIG['HTML_PARSER'])
+    raw_codigos = soup.decode_contents().split('<br/>')
+    return [codigo.strip() for codigo in raw_codigos if codigo.strip().isdigit()]
+
+def _extrair_codigos_animes(response):
+    # Texto bruto dividido por <br>, sem passar pelo BeautifulSoup
+    raw_codigos = response.text.split('<br>')
+    logger.info("Encontrados %d códigos brutos", len(raw_codigos))
+    return [codigo.strip() for codigo in raw_codigos if codigo.strip().isdigit()]
+
+FONTES_CODIGOS = {
+    'filmes': {'caminho': JSON_PATHS['code_filmes'], 'url': '/filmes/lista/', 'rotulo': 'filmes',
+               'extrair': _extrair_codigos_filmes, 'headers': {}},
+    'series': {'caminho': JSON_PATHS['code_series'], 'url': '/series/lista/', 'rotulo': 'séries',
+               'extrair': _extrair_codigos_series, 'headers': {}},
+    'animes': {'caminho': JSON_PATHS['animes'], 'url': '/animes/export/', 'rotulo': 'animes',
+               'extrair': _extrair_codigos_animes,
+               'headers': {'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+                           'Accept-Language': 'en-US,en;q=0.5'}},
+}
+
+class Disjuntor:
+    """Circuit breaker: depois de DISJUNTOR_FALHAS falhas seguidas, abre e falha rápido.
+
+    Passado DISJUNTOR_ABERTO_S, fica meio-aberto: a próxima tentativa decide se
+    fecha (sucesso) ou abre de novo (falha).
+    """
+
+    def __init__(self):
+        self.falhas = 0
+        self.aberto_ate = 0.0
+        self._lock = Lock()
+
+    def permite(self):
+        return time.monotonic() >= self.aberto_ate
+
+    def restante(self):
+        return max(0.0, self.aberto_ate - time.monotonic())
+
+    def estado(self):
+        if not self.permite():
+            return 'aberto'
+        return 'meio-aberto' if self.falhas >= CONFIG['DISJUNTOR_FALHAS'] else 'fechado'
+
+    def sucesso(self):
+        with self._lock:
+            self.falhas = 0
+            self.aberto_ate = 0.0
+
+    def falha(self):
+        with self._lock:
+            self.falhas += 1
+            if self.falhas >= CONFIG['DISJUNTOR_FALHAS']:
+                self.aberto_ate = time.monotonic() + CONFIG['DISJUNTOR_ABERTO_S']
+
+class AtualizadorCodigos:
+    """Busca uma lista de códigos no upstream em uma thread própria, uma de cada vez.
+
+    As requisições nunca fazem a busca: só garantem que a thread está rodando
+    e, se não têm nem uma lista velha para servir, esperam a próxima tentativa.
+    A thread repete com backoff exponencial (com jitter) até conseguir,
+    respeitando o disjuntor. Cada lista boa também vai para uma cópia em
+    Filmes_Encontrados, que sobrevive a um temp/ apagado no deploy.
+    """
+
+    def __init__(self, nome, fonte):
+        self.nome = nome
+        self.fonte = fonte
+        self.backup = os.path.join(FILMES_ENCONTRADOS_DIR, f"Backup{os.path.basename(fonte['caminho'])}")
+        self.disjuntor = Disjuntor()
+        self.condicao = Condition()
+        self.thread = None
+        self.tentativas = 0
+        self.ultimo_erro = None
+
+    def garantir(self):
+        """Inicia a busca em segundo plano, se já não houver uma; retorna o nº de tentativas até aqui."""
+        with self.condicao:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = Thread(target=self._executar, daemon=True, name=f"codigos-{self.nome}")
+                self.thread.start()
+            return self.tentativas
+
+    def esperar(self, vista, timeout):
+        """Espera terminar uma tentativa depois da `vista`; diz se a lista foi obtida."""
+        with self.condicao:
+            self.condicao.wait_for(lambda: self.tentativas > vista, timeout)
+            return self.tentativas > vista and self.ultimo_erro is None
+
+    def _executar(self):
+        espera = CONFIG['CODIGOS_BACKOFF_INICIAL']
+        while True:
+            time.sleep(self.disjuntor.restante())
+            try:
+                self._buscar()
+                erro = None
+            except (requests.exceptions.RequestException, ValueError) as e:
+                erro = e
+            with self.condicao:
+                self.tentativas += 1
+                self.ultimo_erro = erro
+                self.condicao.notify_all()
+            if erro is None:
+                self.disjuntor.sucesso()
+                return
+            self.disjuntor.falha()
+            logger.error("Erro ao carregar códigos de %s: %s; nova tentativa em %.1fs",
+                         self.fonte['rotulo'], erro, espera)
+            time.sleep(espera * random.uniform(0.5, 1.0))
+            espera = min(espera * 2, CONFIG['CODIGOS_BACKOFF_MAX'])
+
+    def _buscar(self):
+        url = urljoin(CONFIG['BASE_URL'], self.fonte['url'])
+        headers = {'User-Agent': CONFIG['USER_AGENT'], **self.fonte['headers']}
+        logger.info("Tentando acessar URL: %s", url)
+        response = requests.get(url, headers=headers, timeout=CONFIG['CODIGOS_TIMEOUT'])
+        response.raise_for_status()
+        codigos = self.fonte['extrair'](response)
+        if not codigos:
+            # Lista vazia é falha do upstream: não sobrescreve a última lista boa
+            raise ValueError("nenhum código válido encontrado no conteúdo")
+        cache = {"codigos": codigos}
+        salvar_dados_json(self.fonte['caminho'], cache)
+        salvar_dados_json(self.backup, cache)
+        logger.info("Códigos de %s atualizados (%d)", self.fonte['rotulo'], len(codigos))
+
+    def lista_velha(self):
+        """Última lista boa conhecida (memória, depois a cópia em disco), ou None."""
+        payload = codigos_bons.get(self.fonte['caminho'])
+        if payload is None and os.path.exists(self.backup):
+            cache = carregar_dados_json(self.backup)
+            if cache and cache.get('codigos'):
+                payload = {"codigos": ", ".join(cache['codigos'])}
+        return payload
+
+atualizadores_codigos = {nome: AtualizadorCodigos(nome, fonte) for nome, fonte in FONTES_CODIGOS.items()}
+
+def responder_codigos(nome):
+    """Resposta de /codigos/<nome>: do arquivo; se ele estiver ausente ou vazio, a lista velha ou 503.
+
+    O caminho frio nunca faz a requisição ao upstream na thread da requisição:
+    dispara (uma vez) a busca em segundo plano e, sem lista velha, espera por
+    ela no máximo CODIGOS_ESPERA_MAX, ou nada se o disjuntor estiver aberto.
+    """
+    atualizador = atualizadores_codigos[nome]
+    caminho = atualizador.fonte['caminho']
+    resposta = resposta_versionada(f'codigos_{nome}', [caminho], lambda: codigos_do_cache(caminho))
+    if resposta is not None:
+        return resposta
+
+    vista = atualizador.garantir()
+    velha = atualizador.lista_velha()
+    if velha is not None:
+        response = resposta_json(velha)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['Warning'] = '110 - "Response is Stale"'
+        return response
+
+    if atualizador.disjuntor.permite() and atualizador.esperar(vista, CONFIG['CODIGOS_ESPERA_MAX']):
+        resposta = resposta_versionada(f'codigos_{nome}', [caminho], lambda: codigos_do_cache(caminho))
+        if resposta is not None:
+            return resposta
+
+    response = jsonify({'error': f"Erro ao carregar códigos de {atualizador.fonte['rotulo']}"})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(max(1, round(atualizador.disjuntor.restante()
+                                                       or CONFIG['CODIGOS_BACKOFF_INICIAL'])))
+    return response
+
 @app.route('/anime/detalhes')
 def anime_detalhes():
     """Retorna detalhes de um anime pelo ID."""
@@ -276,15 +2219,17 @@ def anime_detalhes():
 
     anime_id = request.args.get('id')
     if not validar_id(anime_id):
-        logger.warning(f"ID de anime inválido: {anime_id}")
+        logger.warning("ID de anime inválido: %s", anime_id)
         return jsonify({'erro': 'ID inválido'}), 400
 
-    animes = carregar_dados_json(JSON_PATHS['animes_nomes'])
-    for anime in animes:
-        if anime.get('id') == anime_id:
-            return jsonify(anime)
+    resposta = resposta_versionada(
+        ('anime_detalhes', anime_id), [JSON_PATHS['animes_nomes']],
+        lambda: obter_indice('ids_anime').get(anime_id)
+    )
+    if resposta is not None:
+        return resposta
 
-    logger.info(f"Anime com ID {anime_id} não encontrado")
+    logger.info("Anime com ID %s não encontrado", anime_id)
     return jsonify({'erro': 'Anime não encontrado'}), 404
 
 
@@ -297,33 +2242,39 @@ def animes_pagina():
         return auth_error
 
     pagina = validar_pagina(request.args.get('pagina', 1))
-    animes = carregar_dados_json(JSON_PATHS['animes_nomes'])
-
-    if not animes:
-        logger.info("Nenhum anime encontrado")
-        return jsonify({
-            'resultados': [],
-            'total': 0,
-            'total_paginas': 1,
-            'pagina_atual': pagina
-        }), 200
+    campos = campos_pedidos()
 
-    # Paginação
-    inicio = (pagina - 1) * CONFIG['ITEMS_PER_PAGE']
-    fim = inicio + CONFIG['ITEMS_PER_PAGE']
-    animes_paginados = animes[inicio:fim]
+    def gerar():
+        animes = carregar_snapshot(JSON_PATHS['animes_nomes'])['dados']
 
-    total_itens = len(animes)
-    total_paginas = (total_itens + CONFIG['ITEMS_PER_PAGE'] - 1) // CONFIG['ITEMS_PER_PAGE']
+        if not animes:
+            logger.info("Nenhum anime encontrado")
+            return {
+                'resultados': [],
+                'total': 0,
+                'total_paginas': 1,
+                'pagina_atual': pagina
+            }
 
-    logger.info(f"Retornando {len(animes_paginados)} animes da página {pagina}/{total_paginas}")
+        # Paginação
+        inicio = (pagina - 1) * CONFIG['ITEMS_PER_PAGE']
+        fim = inicio + CONFIG['ITEMS_PER_PAGE']
+        animes_paginados = registros('animes_nomes', campos, inicio, fim)
 
-    return jsonify({
-        'resultados': animes_paginados,
-        'total': total_itens,
-        'total_paginas': total_paginas,
-        'pagina_atual': pagina
-    })
+        total_itens = len(animes)
+        total_paginas = (total_itens + CONFIG['ITEMS_PER_PAGE'] - 1) // CONFIG['ITEMS_PER_PAGE']
+
+        logger.info("Retornando %d animes da página %d/%d", len(animes_paginados), pagina, total_paginas)
+
+        return {
+            'resultados': animes_paginados,
+            'total': total_itens,
+            'total_paginas': total_paginas,
+            'pagina_atual': pagina
+        }
+
+    return resposta_versionada(('animes_pagina', pagina, campos), [JSON_PATHS['animes_nomes']], gerar,
+                               compartilhar=True)
 
 
 @app.route('/codigos/animes')
@@ -333,44 +2284,7 @@ def codigos_animes():
     if auth_error:
         return auth_error
 
-    cache = carregar_dados_json(JSON_PATHS['animes'])
-    if cache:
-        logger.info(f"Retornando {len(cache.get('codigos', []))} códigos do cache")
-        return jsonify({"codigos": ", ".join(cache.get("codigos", []))})
-
-    try:
-        url = urljoin(CONFIG['BASE_URL'], '/animes/export/')
-        headers = {
-            'User-Agent': CONFIG['USER_AGENT'],
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5'
-        }
-        logger.info(f"Tentando acessar URL: {url}")
-        response = requests.get(url, headers=headers, timeout=5)
-        logger.info(f"Status da resposta: {response.status_code}")
-        response.raise_for_status()
-
-        # Extrair o texto bruto
-        content = response.text
-        logger.info(f"Primeiros 500 caracteres do conteúdo: {content[:500]}")
-
-        # Dividir por <br> e limpar os códigos
-        raw_codigos = content.split('<br>')
-        logger.info(f"Encontrados {len(raw_codigos)} códigos brutos")
-        codigos = [codigo.strip() for codigo in raw_codigos if codigo.strip().isdigit()]
-        logger.info(f"Encontrados {len(codigos)} códigos válidos após validação")
-
-        if not codigos:
-            logger.warning("Nenhum código válido encontrado no conteúdo")
-
-        cache = {"codigos": codigos}
-        salvar_dados_json(JSON_PATHS['animes'], cache)
-        logger.info("Códigos de animes atualizados")
-        return jsonify({"codigos": ", ".join(codigos)})
-
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Erro ao carregar códigos de animes: {e}")
-        return jsonify({'error': 'Erro ao carregar códigos de animes'}), 500
+    return responder_codigos('animes')
     
 
 @app.route('/health', methods=['GET'])
@@ -378,6 +2292,42 @@ def health_check():
     """Rota para verificar se o servidor está ativo."""
     return jsonify({"status": "ok"}), 200
 
+@app.route('/metrics')
+def metrics():
+    """Métricas de latência, status e fases por rota no formato do Prometheus."""
+    auth_error = check_admin_key()
+    if auth_error:
+        return auth_error
+    return app.response_class(metricas_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/debug/profile')
+def debug_profile():
+    """Amostra as pilhas do worker por alguns segundos (?segundos=, ?intervalo_ms=)."""
+    auth_error = check_admin_key()
+    if auth_error:
+        return auth_error
+
+    try:
+        segundos = min(max(float(request.args.get('segundos', 5)), 0.1), CONFIG['PROFILE_MAX_SEGUNDOS'])
+        intervalo = max(float(request.args.get('intervalo_ms', CONFIG['PROFILE_INTERVALO_MS'])), 1.0) / 1000
+    except ValueError:
+        return jsonify({'erro': 'Parâmetros inválidos'}), 400
+
+    # Cada amostragem segura uma thread por até PROFILE_MAX_SEGUNDOS
+    if not perfis_em_andamento.acquire(blocking=False):
+        response = jsonify({'erro': 'Já há uma amostragem em andamento'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(int(segundos) + 1)
+        return response
+    try:
+        logger.info("Profiling por %ss (intervalo %.0fms)", segundos, intervalo * 1000)
+        linhas = amostrar_pilhas(segundos, intervalo)
+    finally:
+        perfis_em_andamento.release()
+    response = app.response_class('\n'.join(linhas) + '\n', mimetype='text/plain')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 @app.route('/get-csrf-token', methods=['GET'])
 def get_csrf_token():
     """Retorna um token CSRF para o frontend."""
@@ -396,15 +2346,17 @@ def filme_detalhes():
 
     filme_id = request.args.get('id')
     if not validar_id(filme_id):
-        logger.warning(f"ID de filme inválido: {filme_id}")
+        logger.warning("ID de filme inválido: %s", filme_id)
         return jsonify({'erro': 'ID inválido'}), 400
 
-    filmes = carregar_dados_json(JSON_PATHS['filmes_pagina'])
-    for filme in filmes:
-        if filme.get('id') == filme_id:
-            return jsonify(filme)
+    resposta = resposta_versionada(
+        ('filme_detalhes', filme_id), [JSON_PATHS['filmes_pagina']],
+        lambda: obter_indice('ids_filme').get(filme_id)
+    )
+    if resposta is not None:
+        return resposta
 
-    logger.info(f"Filme com ID {filme_id} não encontrado")
+    logger.info("Filme com ID %s não encontrado", filme_id)
     return jsonify({'erro': 'Filme não encontrado'}), 404
 
 @app.route('/serie/detalhes')
@@ -416,15 +2368,17 @@ def serie_detalhes():
 
     serie_id = request.args.get('id')
     if not validar_id(serie_id):
-        logger.warning(f"ID de série inválido: {serie_id}")
+        logger.warning("ID de série inválido: %s", serie_id)
         return jsonify({'erro': 'ID inválido'}), 400
 
-    series = carregar_dados_json(JSON_PATHS['series_nomes'])
-    for serie in series:
-        if serie.get('id') == serie_id:
-            return jsonify(serie)
+    resposta = resposta_versionada(
+        ('serie_detalhes', serie_id), [JSON_PATHS['series_nomes']],
+        lambda: obter_indice('ids_serie').get(serie_id)
+    )
+    if resposta is not None:
+        return resposta
 
-    logger.info(f"Série com ID {serie_id} não encontrada")
+    logger.info("Série com ID %s não encontrada", serie_id)
     return jsonify({'erro': 'Série não encontrada'}), 404
 
 @app.route('/codigos/series')
@@ -434,28 +2388,7 @@ def codigos_series():
     if auth_error:
         return auth_error
 
-    cache = carregar_dados_json(JSON_PATHS['code_series'])
-    if cache:
-        return jsonify({"codigos": ", ".join(cache.get("codigos", []))})
-
-    try:
-        url = urljoin(CONFIG['BASE_URL'], '/series/lista/')
-        headers = {'User-Agent': CONFIG['USER_AGENT']}
-        response = requests.get(url, headers=headers, timeout=5)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-        raw_codigos = soup.decode_contents().split('<br/>')
-        codigos = [codigo.strip() for codigo in raw_codigos if codigo.strip().isdigit()]
-
-        cache = {"codigos": codigos}
-        salvar_dados_json(JSON_PATHS['code_series'], cache)
-        logger.info("Códigos de séries atualizados")
-        return jsonify({"codigos": ", ".join(codigos)})
-
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Erro ao carregar códigos de séries: {e}")
-        return jsonify({'error': 'Erro ao carregar códigos de séries'}), 500
+    return responder_codigos('series')
 
 @app.route('/codigos/filmes')
 def codigos_filmes():
@@ -464,29 +2397,7 @@ def codigos_filmes():
     if auth_error:
         return auth_error
 
-    cache = carregar_dados_json(JSON_PATHS['code_filmes'])
-    if cache:
-        return jsonify({"codigos": ", ".join(cache.get("codigos", []))})
-
-    try:
-        url = urljoin(CONFIG['BASE_URL'], '/filmes/lista/')
-        headers = {'User-Agent': CONFIG['USER_AGENT']}
-        response = requests.get(url, headers=headers, timeout=5)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-        dados = soup.get_text()
-        import re
-        codigos = re.findall(r'tt\d+', dados)
-
-        cache = {"codigos": codigos}
-        salvar_dados_json(JSON_PATHS['code_filmes'], cache)
-        logger.info("Códigos de filmes atualizados")
-        return jsonify({"codigos": ", ".join(codigos)})
-
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Erro ao carregar códigos de filmes: {e}")
-        return jsonify({'error': 'Erro ao carregar códigos de filmes'}), 500
+    return responder_codigos('filmes')
 
 @app.route('/filmes/novos')
 def filmes_novos():
@@ -496,19 +2407,15 @@ def filmes_novos():
         return auth_error
 
     wait = request.args.get('wait', 'false').lower() == 'true'
-    cache = carregar_dados_json(JSON_PATHS['filmes_novos'])
-
-    thread = Thread(
-        target=run_async_in_thread,
-        args=(atualizar_dados(urljoin(CONFIG['BASE_URL'], '/filmes'), JSON_PATHS['filmes_novos'], 'filmes'),)
-    )
-    thread.start()
 
+    job = enfileirar_atualizacao(urljoin(CONFIG['BASE_URL'], '/filmes'), JSON_PATHS['filmes_novos'], 'filmes')
     if wait:
-        thread.join()
-        cache = carregar_dados_json(JSON_PATHS['filmes_novos'])
+        return resposta_job_aceito(job)
 
-    return jsonify(cache)
+    campos = campos_pedidos()
+    return resposta_versionada(('filmes_novos', campos), [JSON_PATHS['filmes_novos']],
+                               lambda: registros('filmes_novos', campos),
+                               cache_control=CONFIG['CACHE_CONTROL_ATUALIZACAO'])
 
 @app.route('/filmes/home')
 def filmes_home():
@@ -517,8 +2424,8 @@ def filmes_home():
     if auth_error:
         return auth_error
 
-    cache = carregar_dados_json(JSON_PATHS['filmes_home'])
-    return jsonify(cache)
+    return resposta_versionada('filmes_home', [JSON_PATHS['filmes_home']],
+                               lambda: carregar_snapshot(JSON_PATHS['filmes_home'])['dados'])
 
 @app.route('/filmes/pagina')
 def filmes_pagina():
@@ -528,21 +2435,27 @@ def filmes_pagina():
         return auth_error
 
     pagina = validar_pagina(request.args.get('pagina', 1))
-    cache = carregar_dados_json(JSON_PATHS['filmes_pagina'])
+    campos = campos_pedidos()
 
-    inicio = (pagina - 1) * CONFIG['ITEMS_PER_PAGE']
-    fim = inicio + CONFIG['ITEMS_PER_PAGE']
-    filmes_paginados = cache[inicio:fim]
+    def gerar():
+        cache = carregar_snapshot(JSON_PATHS['filmes_pagina'])['dados']
 
-    total_itens = len(cache)
-    total_paginas = (total_itens + CONFIG['ITEMS_PER_PAGE'] - 1) // CONFIG['ITEMS_PER_PAGE']
+        inicio = (pagina - 1) * CONFIG['ITEMS_PER_PAGE']
+        fim = inicio + CONFIG['ITEMS_PER_PAGE']
+        filmes_paginados = registros('filmes_pagina', campos, inicio, fim)
 
-    return jsonify({
-        'filmes': filmes_paginados,
-        'total_itens': total_itens,
-        'total_paginas': total_paginas,
-        'pagina_atual': pagina
-    })
+        total_itens = len(cache)
+        total_paginas = (total_itens + CONFIG['ITEMS_PER_PAGE'] - 1) // CONFIG['ITEMS_PER_PAGE']
+
+        return {
+            'filmes': filmes_paginados,
+            'total_itens': total_itens,
+            'total_paginas': total_paginas,
+            'pagina_atual': pagina
+        }
+
+    return resposta_versionada(('filmes_pagina', pagina, campos), [JSON_PATHS['filmes_pagina']], gerar,
+                               compartilhar=True)
 
 @app.route('/filmes/pagina/atualizar')
 def filmes_pagina_atualizar():
@@ -552,19 +2465,14 @@ def filmes_pagina_atualizar():
         return auth_error
 
     wait = request.args.get('wait', 'false').lower() == 'true'
-    cache = carregar_dados_json(JSON_PATHS['filmes_pagina'])
-
-    thread = Thread(
-        target=run_async_in_thread,
-        args=(atualizar_dados(urljoin(CONFIG['BASE_URL'], '/filmes'), JSON_PATHS['filmes_pagina'], 'filmes'),)
-    )
-    thread.start()
 
+    job = enfileirar_atualizacao(urljoin(CONFIG['BASE_URL'], '/filmes'), JSON_PATHS['filmes_pagina'], 'filmes')
     if wait:
-        thread.join()
-        cache = carregar_dados_json(JSON_PATHS['filmes_pagina'])
+        return resposta_job_aceito(job)
 
-    return jsonify(cache)
+    return resposta_versionada('filmes_pagina_atualizar', [JSON_PATHS['filmes_pagina']],
+                               lambda: carregar_snapshot(JSON_PATHS['filmes_pagina'])['dados'],
+                               cache_control=CONFIG['CACHE_CONTROL_ATUALIZACAO'])
 
 @app.route('/series/pagina')
 def series_pagina():
@@ -574,21 +2482,27 @@ def series_pagina():
         return auth_error
 
     pagina = validar_pagina(request.args.get('pagina', 1))
-    cache = carregar_dados_json(JSON_PATHS['series_nomes'])
+    campos = campos_pedidos()
 
-    inicio = (pagina - 1) * CONFIG['ITEMS_PER_PAGE']
-    fim = inicio + CONFIG['ITEMS_PER_PAGE']
-    series_paginadas = cache[inicio:fim]
+    def gerar():
+        cache = carregar_snapshot(JSON_PATHS['series_nomes'])['dados']
 
-    total_itens = len(cache)
-    total_paginas = (total_itens + CONFIG['ITEMS_PER_PAGE'] - 1) // CONFIG['ITEMS_PER_PAGE']
+        inicio = (pagina - 1) * CONFIG['ITEMS_PER_PAGE']
+        fim = inicio + CONFIG['ITEMS_PER_PAGE']
+        series_paginadas = registros('series_nomes', campos, inicio, fim)
 
-    return jsonify({
-        'series': series_paginadas,
-        'total_itens': total_itens,
-        'total_paginas': total_paginas,
-        'pagina_atual': pagina
-    })
+        total_itens = len(cache)
+        total_paginas = (total_itens + CONFIG['ITEMS_PER_PAGE'] - 1) // CONFIG['ITEMS_PER_PAGE']
+
+        return {
+            'series': series_paginadas,
+            'total_itens': total_itens,
+            'total_paginas': total_paginas,
+            'pagina_atual': pagina
+        }
+
+    return resposta_versionada(('series_pagina', pagina, campos), [JSON_PATHS['series_nomes']], gerar,
+                               compartilhar=True)
 
 @app.route('/series')
 def series():
@@ -598,19 +2512,80 @@ def series():
         return auth_error
 
     wait = request.args.get('wait', 'false').lower() == 'true'
-    cache = carregar_dados_json(JSON_PATHS['series'])
-
-    thread = Thread(
-        target=run_async_in_thread,
-        args=(atualizar_dados(urljoin(CONFIG['BASE_URL'], '/series'), JSON_PATHS['series'], 'séries'),)
-    )
-    thread.start()
 
+    job = enfileirar_atualizacao(urljoin(CONFIG['BASE_URL'], '/series'), JSON_PATHS['series'], 'séries')
     if wait:
-        thread.join()
-        cache = carregar_dados_json(JSON_PATHS['series'])
+        return resposta_job_aceito(job)
+
+    campos = campos_pedidos()
+    return resposta_versionada(('series', campos), [JSON_PATHS['series']], lambda: registros('series', campos),
+                               cache_control=CONFIG['CACHE_CONTROL_ATUALIZACAO'])
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Status de um job de atualização; com ?timeout=N espera até N segundos pela conclusão."""
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
 
-    return jsonify(cache)
+    job = jobs.get(job_id)
+    if not job:
+        return job_status_remoto(job_id)
+
+    try:
+        timeout = min(max(float(request.args.get('timeout', 0)), 0.0), CONFIG['JOBS_LONG_POLL_MAX'])
+    except ValueError:
+        timeout = 0.0
+    if timeout and not job['evento'].is_set():
+        # Cada long-poll segura uma thread: limitados para não esgotar o worker
+        with classes_admissao['espera_job'].admitir():
+            job['evento'].wait(timeout)
+
+    if not job['evento'].is_set():
+        response = jsonify(resumo_job(job))
+        response.status_code = 202
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    resultado = resumo_job(job)
+    if job['status'] == 'concluido':
+        resultado['dados'] = carregar_snapshot(job['cache_path'])['dados']
+    response = resposta_json(resultado)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+def job_status_remoto(job_id):
+    """Status de um job criado por outro worker/nó, lido do cache compartilhado (sem long-poll).
+
+    Sem Redis o estado dos jobs fica no worker que os criou: um ID com o
+    formato certo que este worker não conhece recebe 202 'desconhecido' (o
+    job pode estar em outro worker), não 404. Com mais de um worker, configure
+    REDIS_URL para o status ser consultável de qualquer um. Um job concluído
+    em outro nó sai sem 'dados': quem atualizou foram os arquivos daquele nó.
+    """
+    valor = cache_compartilhado.get(chave_redis('job', job_id))
+    if not valor:
+        if cache_compartilhado.distribuido or not re.fullmatch(r'[0-9a-f]{32}', job_id):
+            return jsonify({'erro': 'Job não encontrado'}), 404
+        response = jsonify({
+            'job_id': job_id,
+            'status': 'desconhecido',
+            'observacao': 'Job de outro worker: sem Redis o status não é compartilhado',
+            'status_url': f"/jobs/{job_id}"
+        })
+        response.status_code = 202
+        response.headers['Retry-After'] = '2'
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+    resultado = json.loads(valor)
+    cache_path = resultado.pop('cache_path', None)
+    # Os dados vêm dos arquivos deste nó: só valem se foi este nó que atualizou
+    mesmo_no = resultado.pop('no', None) == ID_DO_NO
+    if mesmo_no and resultado['status'] == 'concluido' and cache_path in JSON_PATHS.values():
+        resultado['dados'] = carregar_snapshot(cache_path)['dados']
+    response = resposta_json(resultado, status=200 if resultado['status'] in ('concluido', 'erro') else 202)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
 
 @app.route('/animes/novos')
 def animes_novos():
@@ -619,9 +2594,14 @@ def animes_novos():
     if auth_error:
         return auth_error
 
-    cache = carregar_dados_json(JSON_PATHS['animes_novos'])
-    logger.info(f"Retornando {len(cache)} animes novos do cache")
-    return jsonify(cache)
+    campos = campos_pedidos()
+
+    def gerar():
+        cache = registros('animes_novos', campos)
+        logger.info("Retornando %d animes novos do cache", len(cache))
+        return cache
+
+    return resposta_versionada(('animes_novos', campos), [JSON_PATHS['animes_novos']], gerar)
 
 @app.route('/buscar')
 def buscar_nomes():
@@ -634,58 +2614,85 @@ def buscar_nomes():
     pagina = validar_pagina(request.args.get('pagina', 1))
 
     if not termo or len(termo) < 2:
-        logger.warning(f"Termo de busca inválido: {termo}")
+        logger.warning("Termo de busca inválido: %s", termo)
         return jsonify({'erro': 'Termo de busca inválido ou muito curto'}), 400
 
     termo_normalizado = normalize_text(termo)
+    campos = campos_pedidos()
+
+    if request.args.get('modo') == 'fuzzy':
+        try:
+            limite = min(max(int(request.args.get('limite', CONFIG['BUSCA_FUZZY_LIMITE'])), 1),
+                         CONFIG['ITEMS_PER_PAGE'])
+        except ValueError:
+            limite = CONFIG['BUSCA_FUZZY_LIMITE']
+
+        def gerar_fuzzy():
+            resultados, parcial = buscar_fuzzy(termo_normalizado, limite, campos)
+            if parcial:
+                logger.warning("Busca aproximada por '%s' estourou o orçamento de tempo", termo)
+            logger.info("Busca aproximada por '%s' retornou %d resultados", termo, len(resultados))
+            return {
+                'resultados': resultados,
+                'total': len(resultados),
+                'total_paginas': 1,
+                'pagina_atual': 1,
+                'modo': 'fuzzy',
+                'parcial': parcial
+            }
 
-    filmes = carregar_dados_json(JSON_PATHS['filmes_pagina'])
-    series = carregar_dados_json(JSON_PATHS['series_nomes'])
-    animes = carregar_dados_json(JSON_PATHS['animes_nomes'])
+        # Resultado parcial (orçamento estourado) não é guardado: a próxima consulta tenta de novo
+        return resposta_versionada(('buscar_fuzzy', termo_normalizado, limite, campos), list(CATALOGOS.values()),
+                                   gerar_fuzzy, compartilhar=True, cacheavel=lambda dados: not dados['parcial'])
 
-    # Busca parcial com normalização
-    resultados_filmes = [
-        {**f, 'tipo': 'filme'} for f in filmes
-        if termo_normalizado in normalize_text(f.get('titulo', ''))
-        or termo_normalizado in normalize_text(f.get('titulo_original', ''))
-    ]
-    resultados_series = [
-        {**s, 'tipo': 'serie'} for s in series
-        if termo_normalizado in normalize_text(s.get('titulo', ''))
-        or termo_normalizado in normalize_text(s.get('titulo_original', ''))
-    ]
-    resultados_animes = [
-        {**a, 'tipo': 'anime'} for a in animes
-        if termo_normalizado in normalize_text(a.get('titulo', ''))
-        or termo_normalizado in normalize_text(a.get('titulo_original', ''))
-    ]
-    resultados = resultados_filmes + resultados_series + resultados_animes
-
-    if not resultados:
-        logger.info(f"Nenhum filme, série ou anime encontrado para o termo: {termo}")
-        return jsonify({
-            'resultados': [],
-            'total': 0,
-            'total_paginas': 1,
+    so_contagem = request.args.get('count_only', 'false').lower() == 'true'
+    curto = len(termo_normalizado) <= CONFIG['BUSCA_TERMO_CURTO']
+
+    def gerar():
+        # Busca parcial com normalização, sobre os campos já normalizados do snapshot
+        encontrados = correspondencias(CATALOGOS, lambda campos: termo_normalizado in campos[0]
+                                       or termo_normalizado in campos[1])
+        resultados_paginados, total_itens = paginar_correspondencias(encontrados, pagina, so_contagem, campos)
+        total_paginas = max((total_itens + CONFIG['ITEMS_PER_PAGE'] - 1) // CONFIG['ITEMS_PER_PAGE'], 1)
+
+        if so_contagem:
+            return {'total': total_itens, 'total_paginas': total_paginas}
+
+        if not total_itens:
+            logger.info("Nenhum filme, série ou anime encontrado para o termo: %s", termo)
+        else:
+            logger.info("Busca por '%s' retornou %d resultados, página %d/%d", termo, total_itens, pagina, total_paginas)
+
+        return {
+            'resultados': resultados_paginados,
+            'total': total_itens,
+            'total_paginas': total_paginas,
             'pagina_atual': pagina
-        }), 200
+        }
 
-    # Paginação
-    inicio = (pagina - 1) * CONFIG['ITEMS_PER_PAGE']
-    fim = inicio + CONFIG['ITEMS_PER_PAGE']
-    resultados_paginados = resultados[inicio:fim]
+    # Termo curto casa com quase tudo: a varredura é cara e passa pela admissão
+    return resposta_versionada(('buscar', termo_normalizado, pagina, so_contagem, campos), list(CATALOGOS.values()),
+                               admitido('busca_curta', gerar) if curto else gerar, compartilhar=True)
+
+@app.route('/autocompletar')
+def autocompletar_titulos():
+    """Sugestões de títulos (id, tipo, titulo, capa) que começam com o prefixo digitado."""
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
 
-    total_itens = len(resultados)
-    total_paginas = (total_itens + CONFIG['ITEMS_PER_PAGE'] - 1) // CONFIG['ITEMS_PER_PAGE']
+    prefixo = ' '.join(normalize_text(request.args.get('q', '')).split())
+    try:
+        limite = min(max(int(request.args.get('limite', CONFIG['AUTOCOMPLETAR_LIMITE'])), 1),
+                     CONFIG['ITEMS_PER_PAGE'])
+    except ValueError:
+        limite = CONFIG['AUTOCOMPLETAR_LIMITE']
 
-    logger.info(f"Busca por '{termo}' retornou {total_itens} resultados, página {pagina}/{total_paginas}")
+    if not prefixo:
+        return jsonify({'erro': 'Prefixo não fornecido'}), 400
 
-    return jsonify({
-        'resultados': resultados_paginados,
-        'total': total_itens,
-        'total_paginas': total_paginas,
-        'pagina_atual': pagina
-    })
+    return resposta_versionada(('autocompletar', prefixo, limite), list(CATALOGOS.values()),
+                               lambda: {'sugestoes': autocompletar(prefixo, limite)})
 
 @app.route('/buscar_por_genero')
 def buscar_por_genero():
@@ -702,119 +2709,537 @@ def buscar_por_genero():
         logger.warning("Gênero não fornecido")
         return jsonify({'erro': 'Gênero não fornecido'}), 400
 
-    logger.info(f"Busca por gêneros: {generos}, tipo: {tipo}, página: {pagina}")
+    so_contagem = request.args.get('count_only', 'false').lower() == 'true'
+    campos = campos_pedidos()
+    logger.info("Busca por gêneros: %s, tipo: %s, página: %d", generos, tipo, pagina)
+    generos_normalizados = [normalize_text(g) for g in generos]
 
-    # Carregar os dados com base no tipo
-    resultados = []
-    json_paths = {
-        'filme': JSON_PATHS.get('filmes_pagina', []),
-        'serie': JSON_PATHS.get('series_nomes', []),
-        'anime': JSON_PATHS.get('animes_nomes', [])
-    }
+    def casa(campos):
+        # Algum gênero pedido está contido em algum gênero do item
+        return campos[2] is not None and any(
+            g in genero for g in generos_normalizados for genero in campos[2]
+        )
 
-    for content_type in ['filme', 'serie', 'anime']:
-        if tipo != 'all' and tipo != content_type:
-            continue
-        try:
-            dados = carregar_dados_json(json_paths[content_type])
-            logger.debug(f"Carregados {len(dados)} itens do tipo {content_type}")
-            for item in dados:
-                item_generos = item.get('generos', [])
-                if not isinstance(item_generos, list):
-                    logger.warning(f"Item {item.get('id', 'unknown')} tem gêneros inválidos: {item_generos}")
-                    continue
-                # Normalizar gêneros do item
-                item_generos_normalized = [normalize_text(g) for g in item_generos]
-                # Verifica se algum gênero solicitado corresponde
-                for g in generos:
-                    g_normalized = normalize_text(g)
-                    if any(g_normalized in genre_normalized for genre_normalized in item_generos_normalized):
-                        resultados.append({**item, 'tipo': content_type})
-                        logger.debug(f"Match encontrado para item {item.get('titulo', 'unknown')} com gênero {g}")
-                        break
-        except Exception as e:
-            logger.error(f"Erro ao carregar dados para {content_type}: {str(e)}")
-
-    if not resultados:
-        logger.info(f"Nenhum resultado encontrado para gêneros: {', '.join(generos)}, tipo: {tipo}")
-        return jsonify({
-            'mensagem': f'Nenhum resultado para o gênero {", ".join(generos)}',
-            'resultados': [],
-            'total': 0,
-            'total_paginas': 0,
+    def gerar():
+        tipos = [t for t in CATALOGOS if tipo in ('all', t)]
+        resultados_paginados, total_itens = paginar_correspondencias(correspondencias(tipos, casa), pagina,
+                                                                     so_contagem, campos)
+        total_paginas = (total_itens + CONFIG['ITEMS_PER_PAGE'] - 1) // CONFIG['ITEMS_PER_PAGE']
+
+        if so_contagem:
+            return {'total': total_itens, 'total_paginas': total_paginas}
+
+        if not total_itens:
+            logger.info("Nenhum resultado encontrado para gêneros: %s, tipo: %s", ', '.join(generos), tipo)
+            return {
+                'mensagem': f'Nenhum resultado para o gênero {", ".join(generos)}',
+                'resultados': [],
+                'total': 0,
+                'total_paginas': 0,
+                'pagina_atual': pagina
+            }
+
+        logger.info("Busca por gêneros '%s', tipo '%s' retornou %d resultados, página %d/%d",
+                    ', '.join(generos), tipo, total_itens, pagina, total_paginas)
+
+        return {
+            'resultados': resultados_paginados,
+            'total': total_itens,
+            'total_paginas': total_paginas,
             'pagina_atual': pagina
-        }), 200
+        }
 
-    # Paginação
-    inicio = (pagina - 1) * CONFIG['ITEMS_PER_PAGE']
-    fim = inicio + CONFIG['ITEMS_PER_PAGE']
-    resultados_paginados = resultados[inicio:fim]
+    return resposta_versionada(('buscar_por_genero', tuple(generos), tipo, pagina, so_contagem, campos),
+                               list(CATALOGOS.values()), admitido('genero_todos', gerar) if tipo == 'all' else gerar,
+                               compartilhar=True)
 
-    total_itens = len(resultados)
-    total_paginas = (total_itens + CONFIG['ITEMS_PER_PAGE'] - 1) // CONFIG['ITEMS_PER_PAGE']
+@app.route('/navegar')
+def navegar_catalogo():
+    """Navegação facetada: filtra por tipo, gênero, qualidade e faixa de ano, ordenando por data ou título.
 
-    logger.info(f"Busca por gêneros '{', '.join(generos)}', tipo '{tipo}' retornou {total_itens} resultados, página {pagina}/{total_paginas}")
+    Parâmetros (todos opcionais): tipo, genero e qualidade (listas separadas por
+    vírgula), ano_min, ano_max, ordem ('recentes', 'antigos' ou 'titulo'),
+    pagina, fields e count_only.
+    """
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
 
-    return jsonify({
-        'resultados': resultados_paginados,
-        'total': total_itens,
-        'total_paginas': total_paginas,
-        'pagina_atual': pagina
-    })
+    def lista(nome):
+        valores = tuple(sorted({normalize_text(v) for v in request.args.get(nome, '').split(',') if v.strip()}))
+        return valores or None
 
-@app.route('/buscar_generos')
-def buscar_generos():
-    """Retorna sugestões de gêneros com base no termo de busca."""
+    tipos, generos, qualidades = lista('tipo'), lista('genero'), lista('qualidade')
+    ordem = request.args.get('ordem', 'recentes').lower()
+    pagina = validar_pagina(request.args.get('pagina', 1))
+    campos = campos_pedidos()
+    so_contagem = request.args.get('count_only', 'false').lower() == 'true'
+    try:
+        ano_min = int(request.args['ano_min']) if request.args.get('ano_min') else None
+        ano_max = int(request.args['ano_max']) if request.args.get('ano_max') else None
+    except ValueError:
+        return jsonify({'erro': 'Ano inválido'}), 400
+
+    if ordem not in ORDENS_NAVEGACAO:
+        return jsonify({'erro': f'Ordem inválida; use {", ".join(ORDENS_NAVEGACAO)}'}), 400
+    if tipos and any(t not in CATALOGOS for t in tipos):
+        return jsonify({'erro': 'Tipo inválido'}), 400
+
+    def gerar():
+        catalogos, indice = obter_indice_com_dados('navegacao')
+        numeros, total_itens = navegar(tipos, generos, qualidades, ano_min, ano_max, ordem, indice)
+        total_paginas = (total_itens + CONFIG['ITEMS_PER_PAGE'] - 1) // CONFIG['ITEMS_PER_PAGE']
+        if so_contagem:
+            return {'total': total_itens, 'total_paginas': total_paginas}
+
+        inicio = (pagina - 1) * CONFIG['ITEMS_PER_PAGE']
+        itens = indice['itens']
+        dados = dict(zip(CATALOGOS, catalogos))
+        resultados = []
+        for n in numeros[inicio:inicio + CONFIG['ITEMS_PER_PAGE']]:
+            tipo, posicao = itens[n]
+            resultados.append(registro_de_busca(tipo, posicao, dados[tipo][posicao], campos))
+
+        return {
+            'resultados': resultados,
+            'total': total_itens,
+            'total_paginas': total_paginas,
+            'pagina_atual': pagina
+        }
+
+    chave = ('navegar', tipos, generos, qualidades, ano_min, ano_max, ordem, pagina, campos, so_contagem)
+    return resposta_versionada(chave, list(CATALOGOS.values()), gerar, compartilhar=True)
+
+@app.route('/mudancas')
+def mudancas():
+    """Mudanças de filmes, séries e animes desde a versão `desde`, para sincronização incremental.
+
+    Sem `desde`, ou com `ressincronizar: true` na resposta, o cliente deve
+    baixar as páginas inteiras e guardar `versao` (um token "<época>.<n>")
+    para a próxima consulta. `tipo` limita as mudanças a um catálogo. Uma
+    entrada com `ressincronizar` pede a sincronização completa só daquele tipo.
+    """
     auth_error = check_api_key()
     if auth_error:
         return auth_error
 
-    termo = request.args.get('q', '').lower()
-    generos = [ "Action", "Adventure","Animation","Biography","Comedy","Crime","Demons","Disaster",
-    "Documentary", "Drama","Ecchi", "Family","Fantasy","Game","Harem","Historical", "Horror","Isekai",
-    "Josei","Martial Arts","Military","Music","Musical", "Mystery","Psychological","Reality",
-    "Romance","School","Sci-Fi","Seinen","Shoujo","Shounen","Sports","Superhero","Supernatural",
-    "Talk","Thriller","Vampire","War","Western","Yaoi","Yuri"
-]
+    tipo = request.args.get('tipo')
+    desde = request.args.get('desde') or None
+    try:
+        if desde is not None:
+            ler_token_feed(desde)
+    except ValueError:
+        return jsonify({'erro': 'Versão inválida'}), 400
+    if tipo is not None and tipo not in CATALOGOS:
+        return jsonify({'erro': 'Tipo inválido'}), 400
+
+    # Recarrega o que tiver mudado no disco, o que registra as mudanças no log
+    for caminho in CATALOGOS.values():
+        carregar_snapshot(caminho)
+
+    response = resposta_json(mudancas_desde(desde, tipo))
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+class TransmissorNovidades:
+    """Fan-out das novidades para as conexões SSE deste processo.
+
+    Não guarda fila por assinante: cada stream espera a versão do log passar
+    da última que enviou e então lê as entradas novas do próprio log, que é
+    compartilhado entre os nós. Enquanto houver assinantes, uma thread vigia
+    os arquivos no disco para que gravações feitas por outros processos (jobs,
+    scripts de enriquecimento) também virem eventos em poucos segundos.
+    """
+
+    def __init__(self):
+        self.condicao = Condition()
+        self.versao = 0
+        self.assinantes = 0
+        self.vigia = None
+
+    def notificar(self, versao):
+        with self.condicao:
+            if versao > self.versao:
+                self.versao = versao
+                self.condicao.notify_all()
+
+    def esperar(self, vista, timeout):
+        """Bloqueia até haver versão maior que `vista` ou acabar o `timeout`; diz se houve."""
+        with self.condicao:
+            return self.condicao.wait_for(lambda: self.versao > vista, timeout)
+
+    def entrar(self):
+        with self.condicao:
+            if self.assinantes >= limite_assinantes_eventos():
+                return False
+            self.assinantes += 1
+            if self.vigia is None or not self.vigia.is_alive():
+                self.vigia = Thread(target=self._vigiar, daemon=True, name="vigia-novidades")
+                self.vigia.start()
+            return True
+
+    def sair(self):
+        with self.condicao:
+            self.assinantes -= 1
+
+    def _vigiar(self):
+        while self.assinantes > 0:
+            for caminho in (*TIPO_DO_CATALOGO, *TIPO_DAS_NOVIDADES):
+                try:
+                    carregar_snapshot(caminho)
+                except Exception as e:
+                    logger.error("Erro ao verificar %s: %s", caminho, e)
+            time.sleep(CONFIG['EVENTOS_INTERVALO_VIGIA'])
+
+transmissor_novidades = TransmissorNovidades()
 
-    if not termo:
-        return jsonify(generos)
+def limite_assinantes_eventos():
+    """Assinantes SSE por processo: o configurado, ou o derivado das threads do worker."""
+    if CONFIG['EVENTOS_MAX_ASSINANTES'] is not None:
+        return CONFIG['EVENTOS_MAX_ASSINANTES']
+    espera_job = CONFIG['ADMISSAO_CLASSES']['espera_job']['concorrencia']
+    return max(1, CONFIG['THREADS_POR_WORKER'] // 2 - espera_job)
 
-    sugestoes = [g for g in generos if termo in g.lower()]
-    return jsonify(sugestoes)
+def _ao_receber_novidade(mensagem):
+    try:
+        transmissor_novidades.notificar(int(json.loads(mensagem)['versao']))
+    except (ValueError, KeyError, TypeError):
+        pass
+
+cache_compartilhado.assinar(CANAL_NOVIDADES, _ao_receber_novidade)
+
+def evento_sse(nome, dados, evento_id=None):
+    linhas = [f"id: {evento_id}"] if evento_id is not None else []
+    linhas += [f"event: {nome}", f"data: {json.dumps(dados, ensure_ascii=False)}"]
+    return '\n'.join(linhas) + '\n\n'
+
+def transmitir_novidades(tipos, ultimo):
+    """Gerador do stream SSE: repete o que houver depois de `ultimo` e segue ao vivo.
+
+    O id de cada evento é o token de versão do log de mudanças, então o
+    Last-Event-ID da reconexão retoma de onde parou, em qualquer worker ou nó
+    que compartilhe o log; em outra época, o stream começa com 'ressincronizar'.
+    """
+    inicio = time.monotonic()
+    yield f"retry: {CONFIG['EVENTOS_RETRY_MS']}\n\n"
+    if ultimo is None:
+        ultimo = mudancas_desde(None)['versao']
+    while time.monotonic() - inicio < CONFIG['EVENTOS_DURACAO_MAX']:
+        resultado = mudancas_desde(ultimo, origem=None)
+        if resultado['ressincronizar'] and resultado['versao'] != ultimo:
+            yield evento_sse('ressincronizar', {'versao': resultado['versao']}, resultado['versao'])
+        for entrada in resultado['mudancas']:
+            if entrada['tipo'] in tipos and (entrada.get('adicionados') or entrada.get('ressincronizar')):
+                yield evento_sse(entrada['tipo'], {
+                    'tipo': entrada['tipo'],
+                    'origem': entrada.get('origem', 'catalogo'),
+                    'versao': entrada['versao'],
+                    'total': len(entrada.get('adicionados', [])),
+                    'itens': entrada.get('itens', []),
+                    'ressincronizar': entrada.get('ressincronizar', False),
+                }, entrada['versao'])
+        ultimo = resultado['versao']
+        if not transmissor_novidades.esperar(ler_token_feed(ultimo)[1], CONFIG['EVENTOS_HEARTBEAT']):
+            yield ": keep-alive\n\n"
+
+@app.route('/eventos/novidades')
+def eventos_novidades():
+    """Stream SSE com os títulos novos, um canal (`event:`) por tipo.
+
+    `tipos` (filme,serie,anime) escolhe os canais; a retomada usa o header
+    Last-Event-ID ou `ultimo_id`. O stream fecha sozinho depois de
+    EVENTOS_DURACAO_MAX e o EventSource reconecta, o que distribui as conexões
+    entre os workers. Use o gunicorn com worker gthread (veja o Procfile):
+    cada assinante ocupa uma thread parada, não um worker inteiro.
+    """
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    tipos = {t.strip() for t in request.args.get('tipos', ','.join(CATALOGOS)).split(',') if t.strip()}
+    if not tipos or not tipos <= set(CATALOGOS):
+        return jsonify({'erro': 'Tipo inválido'}), 400
+    try:
+        ultimo = request.headers.get('Last-Event-ID') or request.args.get('ultimo_id') or None
+        if ultimo is not None:
+            ler_token_feed(ultimo)
+    except ValueError:
+        return jsonify({'erro': 'Last-Event-ID inválido'}), 400
+
+    if not transmissor_novidades.entrar():
+        response = jsonify({'erro': 'Muitas conexões de eventos; tente novamente'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(CONFIG['EVENTOS_RETRY_MS'] // 1000)
+        return response
+
+    response = app.response_class(transmitir_novidades(tipos, ultimo), mimetype='text/event-stream')
+    # Roda quando a conexão fecha, mesmo que o gerador nem tenha começado
+    response.call_on_close(transmissor_novidades.sair)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Sem buffer em proxies nginx
+    return response
+
+@app.route('/similares')
+def titulos_similares():
+    """Títulos parecidos com um filme, série ou anime, pelos gêneros em comum.
+
+    `tipo` e `id` identificam o item; `tipos` limita os resultados (padrão:
+    todos), `limite` é o k e `fields` muda a projeção (padrão: cartões).
+    """
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    if np is None:
+        return jsonify({'erro': 'Recomendações indisponíveis: numpy não está instalado'}), 503
+
+    tipo = request.args.get('tipo', '').lower()
+    item_id = request.args.get('id', '')
+    tipos = tuple(sorted({t.strip() for t in request.args.get('tipos', ','.join(CATALOGOS)).split(',') if t.strip()}))
+    campos = campos_pedidos() or CAMPOS_CARTAO
+    try:
+        limite = min(max(int(request.args.get('limite', CONFIG['SIMILARES_LIMITE'])), 1), CONFIG['ITEMS_PER_PAGE'])
+    except ValueError:
+        limite = CONFIG['SIMILARES_LIMITE']
+
+    if tipo not in CATALOGOS or not tipos or any(t not in CATALOGOS for t in tipos):
+        return jsonify({'erro': 'Tipo inválido'}), 400
+    if not validar_id(item_id):
+        return jsonify({'erro': 'ID inválido'}), 400
+
+    def gerar():
+        catalogos, indice = obter_indice_com_dados('similares')
+        encontrados = similares(tipo, item_id, tipos, limite, indice)
+        if encontrados is None:
+            return None
+        dados = dict(zip(CATALOGOS, catalogos))
+        return {
+            'id': item_id,
+            'tipo': tipo,
+            'resultados': [projetar(dados[t][posicao], campos, {'tipo': t, 'score': score})
+                           for t, posicao, score in encontrados],
+        }
+
+    response = resposta_versionada(('similares', tipo, item_id, tipos, limite, campos), list(CATALOGOS.values()),
+                                   gerar)
+    if response is None:
+        return jsonify({'erro': 'Título não encontrado'}), 404
+    return response
+
+@app.route('/buscar_generos')
+def buscar_generos():
+    """Retorna sugestões de gêneros existentes nos catálogos, dos mais populares aos menos.
+
+    `q` filtra por prefixo (do nome ou de uma palavra dele), `tipo` restringe a
+    um catálogo e `contagens=true` devolve {genero, total, por_tipo} em vez dos nomes.
+    """
+    auth_error = check_api_key()
+    if auth_error:
+        return auth_error
+
+    termo = normalize_text(request.args.get('q', ''))
+    tipo = request.args.get('tipo', 'all').lower()
+    contagens = request.args.get('contagens', 'false').lower() == 'true'
+
+    if tipo != 'all' and tipo not in CATALOGOS:
+        return jsonify({'erro': 'Tipo inválido'}), 400
+
+    def gerar():
+        facetas = sugerir_generos(termo, tipo)
+        return facetas if contagens else [faceta['genero'] for faceta in facetas]
+
+    return resposta_versionada(('buscar_generos', termo, tipo, contagens), list(CATALOGOS.values()), gerar)
+
+# --------------- Arquivos estáticos ---------------
+# Nome com hash do conteúdo (app.3f2a9c1b7d4e.js): pode ficar em cache para sempre
+NOME_COM_HASH = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+app.config['USE_X_SENDFILE'] = CONFIG['ESTATICOS_X_SENDFILE']
+
+def construir_estaticos(origem=None):
+    """Grava em static/<ESTATICOS_BUILD_DIR> cópias com hash no nome (e .gz/.br) e o manifest.json.
+
+    Cópias de builds anteriores ficam: páginas antigas ainda podem pedi-las.
+    """
+    origem = origem or app.static_folder
+    destino = os.path.join(origem, CONFIG['ESTATICOS_BUILD_DIR'])
+    manifesto = {}
+    for raiz, diretorios, arquivos in os.walk(origem):
+        diretorios[:] = sorted(d for d in diretorios if os.path.join(raiz, d) != destino)
+        for nome in sorted(arquivos):
+            relativo = os.path.relpath(os.path.join(raiz, nome), origem).replace(os.sep, '/')
+            with open(os.path.join(raiz, nome), 'rb') as f:
+                conteudo = f.read()
+            base, extensao = os.path.splitext(relativo)
+            com_hash = f"{base}.{hashlib.sha256(conteudo).hexdigest()[:12]}{extensao}"
+            saida = os.path.join(destino, *com_hash.split('/'))
+            manifesto[relativo] = f"{CONFIG['ESTATICOS_BUILD_DIR']}/{com_hash}"
+            if os.path.exists(saida):
+                continue
+            os.makedirs(os.path.dirname(saida), exist_ok=True)
+            variantes = [('', conteudo)]
+            if extensao.lower() in CONFIG['ESTATICOS_EXTENSOES_COMPRIMIVEIS'] and len(conteudo) >= CONFIG['COMPRESS_MIN_BYTES']:
+                variantes.append(('.gz', gzip.compress(conteudo, compresslevel=9, mtime=0)))
+                if brotli is not None:
+                    variantes.append(('.br', brotli.compress(conteudo, quality=11)))
+            for sufixo, corpo in variantes:
+                if sufixo and len(corpo) >= len(conteudo):
+                    continue
+                with open(f"{saida}{sufixo}.tmp", 'wb') as f:
+                    f.write(corpo)
+                os.replace(f"{saida}{sufixo}.tmp", f"{saida}{sufixo}")
+    os.makedirs(destino, exist_ok=True)
+    salvar_dados_json(os.path.join(destino, 'manifest.json'), manifesto)
+    return manifesto
+
+@app.cli.command('construir-estaticos')
+def comando_construir_estaticos():
+    """Gera as cópias com hash, .gz/.br e o manifest.json dos estáticos.
+
+    Uso: ATUALIZAR_NA_INICIALIZACAO=false flask --app BackEnd.app construir-estaticos
+    """
+    manifesto = construir_estaticos()
+    click.echo(f"{len(manifesto)} arquivos estáticos em {os.path.join(app.static_folder, CONFIG['ESTATICOS_BUILD_DIR'])}")
+
+def variante_estatico(caminho):
+    """(arquivo a enviar, Content-Encoding): o irmão .br/.gz pré-comprimido, se existir e for aceito."""
+    aceitas = request.accept_encodings
+    for codificacao, sufixo in (('br', '.br'), ('gzip', '.gz')):
+        if aceitas[codificacao] and os.path.isfile(caminho + sufixo):
+            return caminho + sufixo, codificacao
+    return caminho, None
 
 @app.route('/<path:path>')
 def serve_static(path):
-    """Serve arquivos estáticos."""
+    """Serve arquivos estáticos: com hash no nome, imutáveis; os demais revalidam por ETag/Last-Modified."""
     auth_error = check_api_key()
     if auth_error:
         return auth_error
 
-    return send_from_directory(app.static_folder, path)
+    caminho = safe_join(app.static_folder, path)
+    if caminho is None or not os.path.isfile(caminho):
+        return jsonify({'erro': 'Arquivo não encontrado'}), 404
+
+    imutavel = path.startswith(f"{CONFIG['ESTATICOS_BUILD_DIR']}/") and NOME_COM_HASH.search(path) is not None
+    arquivo, codificacao = variante_estatico(caminho)
+    response = send_file(arquivo, mimetype=mimetypes.guess_type(caminho)[0] or 'application/octet-stream',
+                         conditional=True, etag=True, max_age=None)
+    if codificacao:
+        response.headers['Content-Encoding'] = codificacao
+    response.headers['Cache-Control'] = CONFIG['CACHE_CONTROL_IMUTAVEL' if imutavel else 'CACHE_CONTROL_ESTATICOS']
+    response.vary.update(('Accept-Encoding', 'X-API-Key'))
+    return response
+
+# Estado da inicialização, exposto em /ready
+estado_inicializacao = {
+    'iniciado_em': time.time(),
+    'snapshots_prontos_em': None,
+    'indices_prontos_em': None,
+    'atualizacao_inicial': 'desativada'
+}
+
+def aquecer_snapshots():
+    """Carrega o último snapshot salvo de cada arquivo e constrói os índices."""
+    for caminho in JSON_PATHS.values():
+        carregar_snapshot(caminho)
+    estado_inicializacao['snapshots_prontos_em'] = time.time()
+    for nome in indices:
+        obter_indice(nome)
+    estado_inicializacao['indices_prontos_em'] = time.time()
 
 def atualizar_codigos_inicial():
-    """Atualiza códigos de filmes, séries e animes na inicialização e pré-carrega dados populares."""
-    with app.app_context():
-        codigos_filmes()
-        codigos_series()
-        codigos_animes()  # Chama a nova rota
-        run_async_in_thread(
-            atualizar_dados(
-                urljoin(CONFIG['BASE_URL'], '/filmes'),
-                JSON_PATHS['filmes_pagina'],
-                'filmes'
-            )
-        )
-        run_async_in_thread(
-            atualizar_dados(
-                urljoin(CONFIG['BASE_URL'], '/series'),
-                JSON_PATHS['series_nomes'],
-                'séries'
-            )
-        )
-        logger.info("Códigos iniciais e filmes/séries populares atualizados")
+    """Dispara a busca dos códigos que faltarem e enfileira a atualização de filmes e séries populares."""
+    estado_inicializacao['atualizacao_inicial'] = 'executando'
+    try:
+        for atualizador in atualizadores_codigos.values():
+            if codigos_do_cache(atualizador.fonte['caminho']) is None:
+                atualizador.garantir()
+        enfileirar_atualizacao(urljoin(CONFIG['BASE_URL'], '/filmes'), JSON_PATHS['filmes_pagina'], 'filmes')
+        enfileirar_atualizacao(urljoin(CONFIG['BASE_URL'], '/series'), JSON_PATHS['series_nomes'], 'séries')
+        estado_inicializacao['atualizacao_inicial'] = 'enfileirada'
+        logger.info("Códigos iniciais verificados e atualização de filmes/séries populares enfileirada")
+    except Exception as e:
+        estado_inicializacao['atualizacao_inicial'] = 'erro'
+        logger.error("Erro na atualização inicial: %s", e)
+
+# Arquivo do lock mantido aberto pelo processo que ficou com a atualização inicial
+lock_atualizacao_inicial = None
+
+def obter_lock_do_no(nome):
+    """Lock exclusivo entre os processos deste nó (flock em um arquivo do temp/), mantido até o processo sair.
+
+    Sem Redis, os locks do cache compartilhado valem só por processo; este
+    garante que só um dos workers do gunicorn faça a tarefa. Sem fcntl (fora
+    do Unix) sempre concede: lá só há o processo de desenvolvimento.
+    """
+    global lock_atualizacao_inicial
+    if fcntl is None:
+        return True
+    arquivo = open(os.path.join(TEMP_DIR, f'.{nome}.lock'), 'w')
+    try:
+        fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        arquivo.close()
+        return False
+    lock_atualizacao_inicial = arquivo
+    return True
+
+def iniciar_aplicacao():
+    """Serve a partir dos arquivos em disco de imediato; o upstream é consultado em segundo plano.
+
+    Roda na importação do módulo, então vale tanto para o gunicorn quanto para __main__.
+    A atualização inicial (ATUALIZAR_NA_INICIALIZACAO) roda em um único
+    worker por nó; com Redis, o lock de cada atualização evita repeti-la
+    entre nós.
+    """
+    try:
+        aquecer_snapshots()
+        logger.info("Snapshots e índices carregados em %.2fs",
+                    estado_inicializacao['indices_prontos_em'] - estado_inicializacao['iniciado_em'])
+    except Exception as e:
+        logger.error("Erro ao carregar snapshots na inicialização: %s", e)
+    if CONFIG['ATUALIZAR_NA_INICIALIZACAO']:
+        if not obter_lock_do_no('atualizacao-inicial'):
+            estado_inicializacao['atualizacao_inicial'] = 'em_outro_processo'
+            return
+        estado_inicializacao['atualizacao_inicial'] = 'pendente'
+        Thread(target=atualizar_codigos_inicial, daemon=True, name='atualizacao-inicial').start()
+
+def contar_itens(dados):
+    """Itens de um arquivo de dados: a lista, ou os códigos de um arquivo {'codigos': [...]}."""
+    if isinstance(dados, dict) and 'codigos' in dados:
+        return len(dados['codigos'])
+    return len(dados)
+
+@app.route('/ready', methods=['GET'])
+def ready_check():
+    """Prontidão: snapshots e índices carregados, e a idade de cada arquivo de dados."""
+    agora = time.time()
+    arquivos = {}
+    for nome, caminho in JSON_PATHS.items():
+        snapshot = snapshots.get(caminho)
+        try:
+            idade = round(agora - os.stat(caminho).st_mtime)
+        except OSError:
+            idade = None
+        arquivos[nome] = {
+            'carregado': snapshot is not None,
+            'existe': idade is not None,
+            'itens': contar_itens(snapshot['dados']) if snapshot else 0,
+            'idade_segundos': idade
+        }
+
+    pronto = estado_inicializacao['indices_prontos_em'] is not None
+    return jsonify({
+        'status': 'pronto' if pronto else 'carregando',
+        'snapshots_prontos': estado_inicializacao['snapshots_prontos_em'] is not None,
+        'indices_prontos': pronto,
+        'indices': sorted(nome for nome, indice in indices.items() if indice['estado'] is not None),
+        'atualizacao_inicial': estado_inicializacao['atualizacao_inicial'],
+        'arquivos': arquivos
+    }), 200 if pronto else 503
+
 
+iniciar_aplicacao()
 
 if __name__ == '__main__':
-    atualizar_codigos_inicial()
-    app.run(debug=True, port=5001)
\ No newline at end of file
+    app.run(debug=True, port=5001)
@@ -0,0 +1,332 @@
+"""Benchmark HTTP ponta a ponta do BackEnd/app.py com os arquivos reais do catálogo.
+
+Sobe a API (servidor de desenvolvimento do Flask ou gunicorn com N workers)
+lendo Filmes_Encontrados/ e temp/, aponta as rotas de scraping para um stub
+local do superflixapi e dispara uma mistura de rotas com concorrência fixa.
+
+Para cada rota informa req/s, p50/p95/p99 e o pico de RSS do servidor
+(somando os workers); no fim roda a mistura ponderada de todas as rotas.
+O resultado sai em JSON para comparar execuções entre commits.
+
+Uso:
+    python Benchmarks/bench_http.py [--servidor flask|gunicorn] [--workers 4]
+        [--concorrencia 8] [--duracao 5] [--saida resultado.json]
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.abspath(os.path.join(BENCH_DIR, '..'))
+TEMP_DIR = os.path.join(BASE_DIR, 'temp')
+FILMES_ENCONTRADOS_DIR = os.path.join(BASE_DIR, 'Filmes_Encontrados')
+API_KEY = os.environ.get('API_KEY', 'x9k3m7p2q8w4z6t1')
+
+# Peso de cada grupo de rotas na mistura final (aproximando o tráfego real)
+PESOS = {
+    'buscar': 30,
+    'buscar_por_genero': 10,
+    'filmes_pagina': 8,
+    'series_pagina': 8,
+    'animes_pagina': 8,
+    'serie_detalhes': 12,
+    'anime_detalhes': 12,
+    'filme_detalhes': 4,
+    'codigos_filmes': 2,
+    'codigos_series': 1,
+    'codigos_animes': 1,
+    'filmes_novos': 2,
+    'series': 2,
+}
+
+
+def carregar(caminho):
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+# --------------- Stub do superflixapi ---------------
+def pagina_listagem(itens, tipo):
+    """Listagem no formato que atualizar_dados espera, só com itens já em cache."""
+    posters = ''.join(
+        f'<div class="poster"><img src="{item.get("capa") or "/img.jpg"}">'
+        f'<span class="title">{item.get("titulo", "")}</span><span class="year">{item.get("qualidade", "HD")}</span>'
+        f'<a class="btn" href="/{tipo}/{item["id"]}">Assistir</a></div>'
+        for item in itens if item.get('id')
+    )
+    return f'<html><body>{posters}</body></html>'.encode('utf-8')
+
+
+def iniciar_stub():
+    """Sobe o stub e retorna (servidor, URL base)."""
+    paginas = {
+        '/filmes': pagina_listagem(carregar(os.path.join(TEMP_DIR, 'Novosfilmes.json')), 'filme'),
+        '/series': pagina_listagem(carregar(os.path.join(TEMP_DIR, 'series.json')), 'serie'),
+    }
+
+    class Stub(BaseHTTPRequestHandler):
+        def do_GET(self):
+            corpo = paginas.get(self.path.rstrip('/'), b'<html><body></body></html>')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), Stub)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f'http://127.0.0.1:{servidor.server_address[1]}'
+
+
+# --------------- Servidor da API ---------------
+def iniciar_api(tipo, workers, porta, url_stub):
+    env = dict(os.environ, SUPERFLIX_BASE_URL=url_stub, ATUALIZAR_NA_INICIALIZACAO='false',
+               LIMITE_TAXA_ATIVO='false', PYTHONPATH=BASE_DIR, LOG_LIMITE_POR_SEGUNDO='5')
+    if tipo == 'gunicorn':
+        comando = [sys.executable, '-m', 'gunicorn', '-w', str(workers), '-b', f'127.0.0.1:{porta}',
+                   '--log-level', 'warning', 'BackEnd.app:app']
+    else:
+        comando = [sys.executable, '-c',
+                   f'from BackEnd.app import app; app.run(host="127.0.0.1", port={porta}, threaded=True)']
+    processo = subprocess.Popen(comando, cwd=BASE_DIR, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    limite = time.time() + 60
+    while time.time() < limite:
+        try:
+            conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=2)
+            conexao.request('GET', '/ready')
+            if conexao.getresponse().status == 200:
+                return processo
+        except OSError:
+            pass
+        time.sleep(0.2)  # Ainda subindo ou /ready em 503 (aquecendo): espera antes de tentar de novo
+    processo.kill()
+    raise RuntimeError('A API não ficou pronta em 60s')
+
+
+def rss_arvore(pid):
+    """RSS (KiB) do processo e de todos os descendentes, lendo /proc."""
+    filhos = {}
+    for entrada in os.listdir('/proc'):
+        if entrada.isdigit():
+            try:
+                with open(f'/proc/{entrada}/stat') as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+                filhos.setdefault(ppid, []).append(int(entrada))
+            except (OSError, ValueError, IndexError):
+                continue
+    total, pendentes = 0, [pid]
+    while pendentes:
+        atual = pendentes.pop()
+        try:
+            with open(f'/proc/{atual}/status') as f:
+                for linha in f:
+                    if linha.startswith('VmRSS:'):
+                        total += int(linha.split()[1])
+        except OSError:
+            pass
+        pendentes.extend(filhos.get(atual, []))
+    return total
+
+
+# --------------- Carga ---------------
+def gerar_requisicoes():
+    """Geradores de caminho por grupo de rotas, sorteando parâmetros do catálogo real."""
+    filmes = carregar(os.path.join(FILMES_ENCONTRADOS_DIR, 'CodeFilmesNomes.json'))
+    series = carregar(os.path.join(FILMES_ENCONTRADOS_DIR, 'CodeSeriesNomes.json'))
+    animes = carregar(os.path.join(FILMES_ENCONTRADOS_DIR, 'CodeAnimesNomes.json'))
+    catalogo = filmes + series + animes
+
+    titulos = [item['titulo'] for item in catalogo if item.get('titulo')]
+    termos = []
+    for titulo in random.sample(titulos, min(300, len(titulos))):
+        palavra = max(titulo.split(), key=len)
+        termos.append(palavra[:random.randint(2, max(2, len(palavra)))])
+    termos += ['a', 'the', 'de', 'naruto', 'breaking bad', 'lo']
+    termos = [t for t in termos if len(t) >= 2] or ['lo']
+
+    generos = sorted({g for item in catalogo for g in item.get('generos') or []}) or ['Drama']
+    ids = {
+        'filme': [item['id'] for item in filmes] or ['tt0000000'],
+        'serie': [item['id'] for item in series] or ['0'],
+        'anime': [item['id'] for item in animes] or ['0'],
+    }
+
+    def paginas(lista):
+        return max(1, (len(lista) + 49) // 50)
+
+    return {
+        'buscar': lambda: f'/buscar?q={quote(random.choice(termos))}&pagina={random.choice([1, 1, 1, 2])}',
+        'buscar_por_genero': lambda: f'/buscar_por_genero?genero={quote(random.choice(generos))}'
+                                     f'&tipo={random.choice(["all", "filme", "serie", "anime"])}',
+        'filmes_pagina': lambda: f'/filmes/pagina?pagina={random.randint(1, paginas(filmes))}',
+        'series_pagina': lambda: f'/series/pagina?pagina={random.randint(1, paginas(series))}',
+        'animes_pagina': lambda: f'/animes/pagina?pagina={random.randint(1, paginas(animes))}',
+        'serie_detalhes': lambda: f'/serie/detalhes?id={random.choice(ids["serie"])}',
+        'anime_detalhes': lambda: f'/anime/detalhes?id={random.choice(ids["anime"])}',
+        'filme_detalhes': lambda: f'/filme/detalhes?id={random.choice(ids["filme"])}',
+        'codigos_filmes': lambda: '/codigos/filmes',
+        'codigos_series': lambda: '/codigos/series',
+        'codigos_animes': lambda: '/codigos/animes',
+        'filmes_novos': lambda: '/filmes/novos',
+        'series': lambda: '/series',
+    }
+
+
+def percentil(valores, q):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+
+def executar_fase(porta, pid, escolher, concorrencia, duracao, cabecalhos):
+    """Roda `concorrencia` clientes por `duracao` segundos; `escolher()` retorna (grupo, caminho)."""
+    latencias, erros, lock = {}, {}, threading.Lock()
+    fim = time.time() + duracao
+    pico_rss = [rss_arvore(pid)]
+
+    def amostrar_rss():
+        while time.time() < fim:
+            pico_rss[0] = max(pico_rss[0], rss_arvore(pid))
+            time.sleep(0.1)
+
+    def cliente():
+        conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=30)
+        locais, erros_locais = {}, {}
+        while time.time() < fim:
+            grupo, caminho = escolher()
+            inicio = time.perf_counter()
+            try:
+                conexao.request('GET', caminho, headers=cabecalhos)
+                resposta = conexao.getresponse()
+                resposta.read()
+                # 4xx também é falha: um 429/401 responde rápido e mascararia a latência
+                if resposta.status >= 400:
+                    erros_locais[grupo] = erros_locais.get(grupo, 0) + 1
+            except (OSError, http.client.HTTPException):
+                erros_locais[grupo] = erros_locais.get(grupo, 0) + 1
+                conexao.close()
+                conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=30)
+                continue
+            locais.setdefault(grupo, []).append(time.perf_counter() - inicio)
+        with lock:
+            for grupo, valores in locais.items():
+                latencias.setdefault(grupo, []).extend(valores)
+            for grupo, total in erros_locais.items():
+                erros[grupo] = erros.get(grupo, 0) + total
+
+    threads = [threading.Thread(target=cliente) for _ in range(concorrencia)]
+    threads.append(threading.Thread(target=amostrar_rss))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        grupo: {
+            'requisicoes': len(valores),
+            'req_s': round(len(valores) / duracao, 1),
+            'p50_ms': round(percentil(valores, 0.50) * 1000, 2),
+            'p95_ms': round(percentil(valores, 0.95) * 1000, 2),
+            'p99_ms': round(percentil(valores, 0.99) * 1000, 2),
+            'erros': erros.get(grupo, 0),
+        }
+        for grupo, valores in latencias.items()
+    }, pico_rss[0]
+
+
+def commit_atual():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--servidor', choices=['flask', 'gunicorn'], default='flask')
+    parser.add_argument('--workers', type=int, default=4, help='Workers do gunicorn')
+    parser.add_argument('--concorrencia', type=int, default=8)
+    parser.add_argument('--duracao', type=float, default=5.0, help='Segundos por fase')
+    parser.add_argument('--rotas', help='Grupos de rotas separados por vírgula (padrão: todos)')
+    parser.add_argument('--gzip', action='store_true', help='Envia Accept-Encoding: gzip')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--saida', help='Arquivo JSON para gravar o resultado')
+    args = parser.parse_args()
+
+    random.seed(args.semente)
+    geradores = gerar_requisicoes()
+    grupos = args.rotas.split(',') if args.rotas else list(PESOS)
+    cabecalhos = {'X-API-Key': API_KEY}
+    if args.gzip:
+        cabecalhos['Accept-Encoding'] = 'gzip'
+
+    stub, url_stub = iniciar_stub()
+    porta = porta_livre()
+    processo = iniciar_api(args.servidor, args.workers, porta, url_stub)
+    try:
+        resultado = {
+            'commit': commit_atual(),
+            'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'servidor': args.servidor,
+            'workers': args.workers if args.servidor == 'gunicorn' else 1,
+            'concorrencia': args.concorrencia,
+            'duracao_fase_s': args.duracao,
+            'rss_inicial_kib': rss_arvore(processo.pid),
+            'rotas': {},
+        }
+
+        for grupo in grupos:
+            estatisticas, pico = executar_fase(porta, processo.pid, lambda g=grupo: (g, geradores[g]()),
+                                               args.concorrencia, args.duracao, cabecalhos)
+            resultado['rotas'][grupo] = dict(estatisticas.get(grupo, {'requisicoes': 0}), pico_rss_kib=pico)
+            print(f"{grupo:20s} {json.dumps(resultado['rotas'][grupo])}", file=sys.stderr)
+
+        populacao = [g for g in grupos for _ in range(PESOS.get(g, 1))]
+
+        def escolher_misto():
+            grupo = random.choice(populacao)
+            return grupo, geradores[grupo]()
+
+        estatisticas, pico = executar_fase(porta, processo.pid, escolher_misto,
+                                           args.concorrencia, args.duracao, cabecalhos)
+        resultado['mistura'] = {
+            'req_s': round(sum(e['requisicoes'] for e in estatisticas.values()) / args.duracao, 1),
+            'pico_rss_kib': pico,
+            'rotas': estatisticas,
+        }
+    finally:
+        processo.terminate()
+        processo.wait(timeout=10)
+        stub.shutdown()
+
+    print(json.dumps(resultado, indent=4, ensure_ascii=False))
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=4, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark e comparação dos extratores do IMDb em Codes/A-AppCode.py.
+
+Roda os modos 'soup' e 'jsonld' sobre as páginas salvas em fixtures/imdb,
+mede o tempo de CPU por filme e compara campo a campo o resultado dos dois.
+
+As fixtures atuais foram montadas à mão no layout do IMDb; a comparação só
+vale contra páginas reais. --capturar baixa as páginas dos IDs informados
+para fixtures/imdb, com os mesmos cabeçalhos de obter_dados_imdb.
+
+Uso:
+    python Benchmarks/bench_imdb.py [--repeticoes 20] [--saida resultado.json]
+    python Benchmarks/bench_imdb.py --capturar tt0110912 tt3918584 ...
+"""
+import argparse
+import importlib.util
+import json
+import os
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.abspath(os.path.join(BENCH_DIR, '..'))
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures', 'imdb')
+
+
+def carregar_app_code():
+    """Importa Codes/A-AppCode.py (o nome do arquivo não é um módulo válido)."""
+    caminho = os.path.join(BASE_DIR, 'Codes', 'A-AppCode.py')
+    spec = importlib.util.spec_from_file_location('app_code', caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def capturar(ids):
+    """Salva em fixtures/imdb a página real de cada ID, como obter_dados_imdb a recebe."""
+    import requests
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    falhas = 0
+    for filme_id in ids:
+        try:
+            response = requests.get(f"https://www.imdb.com/title/{filme_id}/",
+                                    headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            # A fixture existente fica como estava
+            print(f"{filme_id}: falha ao baixar ({e})")
+            falhas += 1
+            continue
+        response.encoding = 'utf-8'
+        with open(os.path.join(FIXTURES_DIR, f'{filme_id}.html'), 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        print(f"{filme_id}: {len(response.text)} caracteres")
+    return falhas
+
+
+def carregar_fixtures():
+    paginas = {}
+    for nome in sorted(os.listdir(FIXTURES_DIR)):
+        if nome.endswith('.html'):
+            with open(os.path.join(FIXTURES_DIR, nome), 'r', encoding='utf-8') as f:
+                paginas[nome[:-5]] = f.read()
+    return paginas
+
+
+def medir(extrator, paginas, repeticoes):
+    """Retorna o tempo médio de CPU (ms) por filme."""
+    inicio = time.process_time()
+    for _ in range(repeticoes):
+        for filme_id, html in paginas.items():
+            extrator(html, filme_id)
+    total = time.process_time() - inicio
+    return total * 1000 / (repeticoes * len(paginas))
+
+
+def comparar(app_code, paginas):
+    """Compara campo a campo os dois extratores para cada fixture."""
+    divergencias = {}
+    for filme_id, html in paginas.items():
+        soup = app_code.extrair_imdb_soup(html, filme_id)
+        jsonld = app_code.extrair_imdb_jsonld(html, filme_id)
+        diferentes = {
+            campo: {'soup': soup.get(campo), 'jsonld': jsonld.get(campo)}
+            for campo in app_code.EXTRATORES_SOUP
+            if soup.get(campo) != jsonld.get(campo)
+        }
+        if diferentes:
+            divergencias[filme_id] = diferentes
+    return divergencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeticoes', type=int, default=20)
+    parser.add_argument('--saida', help='Arquivo JSON para gravar o resultado')
+    parser.add_argument('--capturar', nargs='+', metavar='ID', help='Baixa as páginas reais desses IDs')
+    args = parser.parse_args()
+
+    if args.capturar:
+        if capturar(args.capturar):
+            raise SystemExit(1)
+        return
+
+    app_code = carregar_app_code()
+    paginas = carregar_fixtures()
+
+    resultado = {
+        'fixtures': len(paginas),
+        'repeticoes': args.repeticoes,
+        'ms_por_filme': {
+            modo: round(medir(extrator, paginas, args.repeticoes), 3)
+            for modo, extrator in app_code.EXTRATORES_IMDB.items()
+        },
+        'divergencias': comparar(app_code, paginas),
+    }
+    resultado['aceleracao'] = round(
+        resultado['ms_por_filme']['soup'] / max(resultado['ms_por_filme']['jsonld'], 1e-9), 1
+    )
+
+    print(json.dumps(resultado, indent=4, ensure_ascii=False))
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=4, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
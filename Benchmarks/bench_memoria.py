@@ -0,0 +1,121 @@
+"""Benchmark de memória de um worker do BackEnd/app.py.
+
+Mostra para onde vai a memória de um worker aquecido: bytes vivos de cada
+snapshot de catálogo, de cada índice derivado (tracemalloc, construindo um
+de cada vez sobre os snapshots já carregados) e o RSS de um processo
+recém-iniciado, que na importação já carrega os snapshots e os índices. O RSS
+roda em um processo próprio para não somar o que o tracemalloc alocou.
+
+Uso:
+    python Benchmarks/bench_memoria.py [--saida resultado.json]
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.abspath(os.path.join(BENCH_DIR, '..'))
+
+
+def rss_kb():
+    """RSS atual do processo em KiB (Linux); cai para o pico do getrusage fora dele."""
+    try:
+        with open('/proc/self/status', 'r', encoding='ascii') as f:
+            for linha in f:
+                if linha.startswith('VmRSS:'):
+                    return int(linha.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def importar_app():
+    os.environ['ATUALIZAR_NA_INICIALIZACAO'] = 'false'
+    sys.path.insert(0, BASE_DIR)
+    from BackEnd import app as api
+    return api
+
+
+def medir_worker():
+    """Processo filho: importa o app (aquecendo snapshots e índices) e informa o RSS."""
+    antes = rss_kb()
+    api = importar_app()
+    gc.collect()
+    print(json.dumps({
+        'rss_kb': rss_kb(),
+        'rss_app_kb': rss_kb() - antes,
+        'itens': sum(len(api.carregar_snapshot(c)['dados']) for c in api.CATALOGOS.values()),
+    }))
+
+
+def rss_worker():
+    saida = subprocess.run([sys.executable, os.path.abspath(__file__), '--filho'],
+                           capture_output=True, text=True, check=True).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def alocado(construir):
+    """Bytes que continuam vivos depois de `construir()` (o resultado é mantido até medir)."""
+    gc.collect()
+    tracemalloc.start()
+    valor = construir()
+    gc.collect()
+    vivos = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del valor
+    return vivos
+
+
+def alocado_por_snapshot(api):
+    """Bytes vivos de cada arquivo de JSON_PATHS como o json.load devolve."""
+    resultado = {}
+    for nome, caminho in api.JSON_PATHS.items():
+        if os.path.exists(caminho):
+            resultado[nome] = alocado(lambda: api.carregar_dados_json(caminho))
+    return resultado
+
+
+def alocado_por_indice(api):
+    """Bytes de cada índice registrado, sobre os snapshots já em memória (que não entram na conta)."""
+    resultado = {}
+    for nome, indice in api.indices.items():
+        dados = [api.carregar_snapshot(c)['dados'] for c in indice['caminhos']]
+        resultado[nome] = alocado(lambda: indice['construir'](*dados))
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--saida', help='Arquivo JSON para gravar o resultado')
+    parser.add_argument('--filho', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        medir_worker()
+        return
+
+    worker = rss_worker()
+    api = importar_app()
+    snapshots = alocado_por_snapshot(api)
+    indices = alocado_por_indice(api)
+    resultado = {
+        'snapshots': snapshots,
+        'indices': dict(sorted(indices.items(), key=lambda par: -par[1])),
+        'snapshots_kb': sum(snapshots.values()) // 1024,
+        'indices_kb': sum(indices.values()) // 1024,
+        'worker': worker,
+    }
+
+    print(json.dumps(resultado, indent=4, ensure_ascii=False))
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=4, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""Benchmark do scraping (atualizar_dados / extrair_detalhes_item) contra um replay local.
+
+Um servidor aiohttp serve as listagens e a página de detalhes salvas em
+fixtures/superflix, com latência, taxa de erro e respostas 429 configuráveis.
+O harness roda uma atualização completa do BackEnd/app.py contra ele, com um
+cache vazio, e informa páginas/s, tempo de parsing x tempo de espera, pico de
+requisições simultâneas no servidor e se a saída gravada está correta.
+
+Uso:
+    python Benchmarks/bench_scraper.py [--tipo filmes|series] [--latencia-ms 80]
+        [--jitter-ms 40] [--taxa-erro 0.0] [--taxa-429 0.0] [--semaforo 5]
+        [--periodo 1.0] [--parser html.parser] [--saida resultado.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+
+from aiohttp import web
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.abspath(os.path.join(BENCH_DIR, '..'))
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures', 'superflix')
+
+# Valores que a página de detalhes da fixture deve produzir
+DETALHES_ESPERADOS = {
+    'titulo_original': 'Celda 211',
+    'generos': ['Drama', 'Crime', 'Thriller'],
+}
+
+
+def ler_fixture(nome):
+    with open(os.path.join(FIXTURES_DIR, nome), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+# --------------- Servidor de replay ---------------
+class Replay:
+    """Servidor aiohttp em uma thread própria, para o parsing do harness não atrasar as respostas."""
+
+    def __init__(self, latencia_ms, jitter_ms, taxa_erro, taxa_429):
+        self.latencia = latencia_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.taxa_erro = taxa_erro
+        self.taxa_429 = taxa_429
+        self.listagens = {
+            '/filmes': ler_fixture('listagem_filmes.html'),
+            '/series': ler_fixture('listagem_series.html'),
+        }
+        self.detalhe = ler_fixture('detalhe.html')
+        self.em_andamento = 0
+        self.pico_concorrencia = 0
+        self.contagem = {'200': 0, '429': 0, '500': 0}
+        self.porta = None
+        self._pronto = threading.Event()
+
+    async def responder(self, request):
+        self.em_andamento += 1
+        self.pico_concorrencia = max(self.pico_concorrencia, self.em_andamento)
+        try:
+            await asyncio.sleep(max(0.0, self.latencia + random.uniform(-self.jitter, self.jitter)))
+            sorteio = random.random()
+            if sorteio < self.taxa_429:
+                self.contagem['429'] += 1
+                return web.Response(status=429, headers={'Retry-After': '1'})
+            if sorteio < self.taxa_429 + self.taxa_erro:
+                self.contagem['500'] += 1
+                return web.Response(status=500)
+            caminho = request.path.rstrip('/')
+            corpo = self.listagens.get(caminho)
+            if corpo is None:
+                if not re.fullmatch(r'/(filme|serie)/\w+', caminho):
+                    return web.Response(status=404)
+                corpo = self.detalhe
+            self.contagem['200'] += 1
+            return web.Response(text=corpo, content_type='text/html')
+        finally:
+            self.em_andamento -= 1
+
+    def _executar(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        aplicacao = web.Application()
+        aplicacao.router.add_get('/{caminho:.*}', self.responder)
+        runner = web.AppRunner(aplicacao, access_log=None)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        loop.run_until_complete(site.start())
+        self.porta = site._server.sockets[0].getsockname()[1]
+        self._pronto.set()
+        loop.run_forever()
+
+    def iniciar(self):
+        threading.Thread(target=self._executar, daemon=True).start()
+        self._pronto.wait()
+        return f'http://127.0.0.1:{self.porta}'
+
+
+# --------------- Harness ---------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tipo', choices=['filmes', 'series'], default='filmes')
+    parser.add_argument('--latencia-ms', type=float, default=80.0)
+    parser.add_argument('--jitter-ms', type=float, default=40.0)
+    parser.add_argument('--taxa-erro', type=float, default=0.0, help='Fração de respostas 500')
+    parser.add_argument('--taxa-429', type=float, default=0.0, help='Fração de respostas 429')
+    parser.add_argument('--semaforo', type=int, help='Sobrescreve RATE_LIMIT_REQUESTS')
+    parser.add_argument('--periodo', type=float, help='Sobrescreve RATE_LIMIT_PERIOD')
+    parser.add_argument('--parser', help='Parser do BeautifulSoup (html.parser, lxml, ...)')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--saida', help='Arquivo JSON para gravar o resultado')
+    args = parser.parse_args()
+    random.seed(args.semente)
+
+    replay = Replay(args.latencia_ms, args.jitter_ms, args.taxa_erro, args.taxa_429)
+    url_base = replay.iniciar()
+
+    os.environ['SUPERFLIX_BASE_URL'] = url_base
+    os.environ['ATUALIZAR_NA_INICIALIZACAO'] = 'false'
+    sys.path.insert(0, BASE_DIR)
+    from BackEnd import app as api
+
+    if args.semaforo:
+        api.CONFIG['RATE_LIMIT_REQUESTS'] = args.semaforo
+    if args.periodo is not None:
+        api.CONFIG['RATE_LIMIT_PERIOD'] = args.periodo
+    if args.parser:
+        api.CONFIG['HTML_PARSER'] = args.parser
+
+    # Cronometra cada construção de soup (é onde está o custo do parsing)
+    tempo_parsing = [0.0]
+    soup_original = api.BeautifulSoup
+
+    def soup_cronometrado(*a, **kw):
+        inicio = time.perf_counter()
+        try:
+            return soup_original(*a, **kw)
+        finally:
+            tempo_parsing[0] += time.perf_counter() - inicio
+
+    api.BeautifulSoup = soup_cronometrado
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        cache_path = os.path.join(diretorio, 'cache.json')
+        inicio = time.perf_counter()
+        api.run_async_in_thread(api.atualizar_dados(f'{url_base}/{args.tipo}', cache_path, args.tipo))
+        duracao = time.perf_counter() - inicio
+        itens = api.carregar_dados_json(cache_path)
+
+    posters = ler_fixture(f'listagem_{args.tipo}.html').count('class="poster"')
+    completos = [
+        item for item in itens
+        if item.get('titulo') and item.get('capa') and item.get('id')
+        and all(item.get(campo) == valor for campo, valor in DETALHES_ESPERADOS.items())
+    ]
+    paginas = sum(replay.contagem.values())
+
+    resultado = {
+        'config': {
+            'tipo': args.tipo,
+            'latencia_ms': args.latencia_ms,
+            'jitter_ms': args.jitter_ms,
+            'taxa_erro': args.taxa_erro,
+            'taxa_429': args.taxa_429,
+            'semaforo': api.CONFIG['RATE_LIMIT_REQUESTS'],
+            'periodo': api.CONFIG['RATE_LIMIT_PERIOD'],
+            'parser': api.CONFIG['HTML_PARSER'],
+        },
+        'duracao_s': round(duracao, 3),
+        'paginas': paginas,
+        'paginas_s': round(paginas / duracao, 1),
+        'parsing_s': round(tempo_parsing[0], 3),
+        'espera_s': round(duracao - tempo_parsing[0], 3),
+        'pico_concorrencia': replay.pico_concorrencia,
+        'respostas': replay.contagem,
+        'saida': {
+            'posters_na_listagem': posters,
+            'itens_gravados': len(itens),
+            'itens_completos': len(completos),
+            'correto': len(itens) == posters and len(completos) == posters,
+        },
+    }
+
+    print(json.dumps(resultado, indent=4, ensure_ascii=False))
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=4, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,8 +3,13 @@ from bs4 import BeautifulSoup
 import json
 import os
 import logging
+import re
+from html import unescape
 from ratelimit import limits, sleep_and_retry
 import time
+import argparse
+import heapq
+from datetime import datetime, timedelta, timezone
 from unidecode import unidecode  # Para limpar nomes no fallback
 
 # Configurar logging
@@ -34,6 +39,15 @@ os.makedirs(TEMP_DIR, exist_ok=True)
 CALLS_PER_MINUTE = 20
 PERIOD = 60
 
+# Revalidação: quantos registros atualizar por execução e idade mínima (em dias)
+# para um registro ser considerado desatualizado
+REVALIDAR_LIMITE = int(os.environ.get('REVALIDAR_LIMITE', CALLS_PER_MINUTE))
+REVALIDAR_IDADE_DIAS = float(os.environ.get('REVALIDAR_IDADE_DIAS', 30))
+
+def agora_iso():
+    """Data/hora atual em UTC no formato usado no campo 'atualizado_em'."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
 # Função para normalizar nomes de animes (automática)
 def normalize_anime_name(nome_anime, tmdb_id):
     """Converte nomes para inglês automaticamente usando TMDb ou limpeza de texto."""
@@ -56,6 +70,115 @@ def normalize_anime_name(nome_anime, tmdb_id):
     return normalized_name, False  # Tentar AniList como padrão
 
 # --------------- FILMES - IMDb ---------------
+# Modo de extração: 'jsonld' lê o bloco application/ld+json da página e só usa o
+# BeautifulSoup para os campos que faltarem; 'soup' faz a varredura completa antiga.
+IMDB_EXTRACAO = os.environ.get('IMDB_EXTRACAO', 'jsonld')
+
+# O IMDb não informa qualidade de vídeo; procurar "4K"/"HD"/"SD" no HTML inteiro
+# marcava quase todo filme como "HD" por acaso. Usamos o mesmo padrão de séries/animes.
+QUALIDADE_PADRAO = "HD"
+
+LD_JSON_RE = re.compile(r'<script[^>]*type="application/ld\+json"[^>]*>(.*?)</script>', re.S)
+
+def _imdb_titulo(soup):
+    titulo = soup.find('span', class_='hero__primary-text')
+    return titulo.get_text(strip=True) if titulo else None
+
+def _imdb_titulo_original(soup):
+    titulo_original = soup.find('div', class_='sc-ec65ba05-1 fUCCIx')
+    return titulo_original.get_text(strip=True).replace('Título original: ', '') if titulo_original else None
+
+def _imdb_capa(soup):
+    capa_imagem = soup.find('meta', property='og:image')
+    return capa_imagem['content'] if capa_imagem else None
+
+def _imdb_descricao(soup):
+    descricao_tag = soup.find('span', attrs={'data-testid': 'plot-xl'}) or soup.find('span', attrs={'data-testid': 'plot-l'})
+    return descricao_tag.get_text(strip=True) if descricao_tag else "Descrição não disponível"
+
+def _imdb_generos(soup):
+    generos_tag = soup.find_all('span', class_='ipc-chip__text')
+    return [genero.get_text(strip=True) for genero in generos_tag if genero.get_text(strip=True)]
+
+def _imdb_data_lancamento(soup):
+    data_tag = soup.find('a', href=lambda x: x and '/releaseinfo' in x)
+    return data_tag.get_text(strip=True) if data_tag else "Data não disponível"
+
+# Extratores por campo usados pelo modo 'soup' e pelo fallback do modo 'jsonld'
+EXTRATORES_SOUP = {
+    "titulo": _imdb_titulo,
+    "titulo_original": _imdb_titulo_original,
+    "capa": _imdb_capa,
+    "descricao": _imdb_descricao,
+    "generos": _imdb_generos,
+    "data_lancamento": _imdb_data_lancamento,
+}
+
+# Campos que, ausentes no JSON-LD, justificam montar o soup da página
+CAMPOS_FALLBACK = ("titulo", "capa", "descricao", "generos", "data_lancamento")
+
+def extrair_imdb_soup(html, filme_id):
+    """Extrai os dados do filme percorrendo a página inteira com BeautifulSoup."""
+    soup = BeautifulSoup(html, 'html.parser')
+    dados = {campo: extrator(soup) for campo, extrator in EXTRATORES_SOUP.items()}
+    dados["id"] = filme_id
+    dados["qualidade"] = QUALIDADE_PADRAO
+    return dados
+
+def _ler_ld_json(html):
+    """Retorna o primeiro objeto schema.org de filme/série do bloco ld+json, se houver."""
+    for bloco in LD_JSON_RE.findall(html):
+        try:
+            dados = json.loads(bloco)
+        except ValueError:
+            continue
+        for item in (dados if isinstance(dados, list) else [dados]):
+            if isinstance(item, dict) and item.get('name'):
+                return item
+    return None
+
+def _texto_ld(valor):
+    return unescape(valor).strip() if isinstance(valor, str) and valor.strip() else None
+
+def extrair_imdb_jsonld(html, filme_id):
+    """Extrai os dados do filme do bloco ld+json, recorrendo ao soup só para campos ausentes."""
+    ld = _ler_ld_json(html) or {}
+    # No JSON-LD do IMDb, 'name' é o título original e 'alternateName' o
+    # título localizado (ausente quando não há tradução)
+    nome = _texto_ld(ld.get('name'))
+    nome_alternativo = _texto_ld(ld.get('alternateName'))
+
+    imagem = ld.get('image')
+    if isinstance(imagem, dict):
+        imagem = imagem.get('url')
+    generos = ld.get('genre') or []
+    if isinstance(generos, str):
+        generos = [generos]
+
+    dados = {
+        "titulo": nome_alternativo or nome,
+        "titulo_original": nome if nome_alternativo and nome_alternativo != nome else None,
+        "id": filme_id,
+        "capa": imagem if isinstance(imagem, str) else None,
+        "qualidade": QUALIDADE_PADRAO,
+        "descricao": _texto_ld(ld.get('description')),
+        "generos": [_texto_ld(g) for g in generos if _texto_ld(g)],
+        "data_lancamento": _texto_ld(ld.get('datePublished')),
+    }
+
+    faltando = [campo for campo in CAMPOS_FALLBACK if not dados[campo]]
+    if faltando:
+        logging.debug(f"JSON-LD incompleto para {filme_id}, usando soup para: {faltando}")
+        soup = BeautifulSoup(html, 'html.parser')
+        for campo in faltando:
+            dados[campo] = EXTRATORES_SOUP[campo](soup)
+    return dados
+
+EXTRATORES_IMDB = {
+    'jsonld': extrair_imdb_jsonld,
+    'soup': extrair_imdb_soup,
+}
+
 @sleep_and_retry
 @limits(calls=CALLS_PER_MINUTE, period=PERIOD)
 def obter_dados_imdb(filme_id):
@@ -71,57 +194,25 @@ def obter_dados_imdb(filme_id):
         logging.info(f"Status Code para {url}: {response.status_code}")
 
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Título
-            titulo = soup.find('span', class_='hero__primary-text')
-            titulo_texto = titulo.get_text(strip=True) if titulo else None
-
-            # Título original
-            titulo_original = soup.find('div', class_='sc-ec65ba05-1 fUCCIx')
-            titulo_original_texto = titulo_original.get_text(strip=True).replace('Título original: ', '') if titulo_original else None
-
-            # Capa
-            capa_imagem = soup.find('meta', property='og:image')
-            capa_url = capa_imagem['content'] if capa_imagem else None
-
-            # Descrição
-            descricao_tag = soup.find('span', attrs={'data-testid': 'plot-xl'}) or soup.find('span', attrs={'data-testid': 'plot-l'})
-            descricao = descricao_tag.get_text(strip=True) if descricao_tag else "Descrição não disponível"
-
-            # Qualidade
-            qualidade = None
-            if "4K" in response.text:
-                qualidade = "4K"
-            elif "HD" in response.text:
-                qualidade = "HD"
-            elif "SD" in response.text:
-                qualidade = "SD"
-            else:
-                qualidade = "Desconhecida"
-
-            # Gêneros
-            generos_tag = soup.find_all('span', class_='ipc-chip__text')
-            generos = [genero.get_text(strip=True) for genero in generos_tag if genero.get_text(strip=True)]
-
-            # Data de lançamento
-            data_tag = soup.find('a', href=lambda x: x and '/releaseinfo' in x)
-            data_lancamento = data_tag.get_text(strip=True) if data_tag else "Data não disponível"
+            extrator = EXTRATORES_IMDB.get(IMDB_EXTRACAO, extrair_imdb_jsonld)
+            dados = extrator(response.text, filme_id)
 
             # Validação
-            if not titulo_texto or not generos:
-                logging.warning(f"Dados incompletos para filme {filme_id}: título={titulo_texto}, gêneros={generos}")
+            if not dados["titulo"] or not dados["generos"]:
+                logging.warning(f"Dados incompletos para filme {filme_id}: título={dados['titulo']}, gêneros={dados['generos']}")
                 return None
 
             return {
-                "titulo": titulo_texto,
-                "titulo_original": titulo_original_texto,
+                "titulo": dados["titulo"],
+                "titulo_original": dados["titulo_original"],
                 "id": filme_id,
-                "capa": capa_url,
-                "qualidade": qualidade,
-                "descricao": descricao,
-                "generos": generos,
-                "data_lancamento": data_lancamento
+                "capa": dados["capa"],
+                "qualidade": dados["qualidade"],
+                "descricao": dados["descricao"],
+                "generos": dados["generos"],
+                "data_lancamento": dados["data_lancamento"],
+                "fonte": "imdb",
+                "atualizado_em": agora_iso()
             }
         else:
             logging.error(f"Erro ao acessar {url}: Status {response.status_code}")
@@ -168,7 +259,9 @@ def buscar_dados_tmdb(item_id, tipo='tv', normalize=False):
                 "descricao": descricao,
                 "generos": generos,
                 "data_estreia": data_estreia,
-                "original_language": dados.get("original_language")  # Para verificar idioma
+                "original_language": dados.get("original_language"),  # Para verificar idioma
+                "fonte": "tmdb",
+                "atualizado_em": agora_iso()
             }
         else:
             logging.error(f"Erro ao buscar {tipo} de ID {item_id}: Status {response.status_code}")
@@ -252,7 +345,9 @@ def buscar_dados_anilist(nome_anime, tmdb_id):
                 "qualidade": "HD",
                 "descricao": descricao,
                 "generos": generos or ["Animação"],
-                "data_estreia": data_estreia
+                "data_estreia": data_estreia,
+                "fonte": "anilist",
+                "atualizado_em": agora_iso()
             }
         else:
             logging.error(f"Erro ao buscar '{anime_nome}' na AniList: Status {response.status_code}, Resposta: {response.text}")
@@ -316,6 +411,63 @@ def salvar_json_incremental(nome_arquivo, dados):
     except IOError as e:
         logging.error(f"Erro ao salvar {caminho}: {e}")
 
+def buscar_dados_anime(anime_id, animlist):
+    """Busca um anime na AniList pelo nome do animlist.json, ou no TMDb se não houver nome."""
+    anime_nome = next((item['nome'] for item in animlist if item['id'] == str(anime_id)), None)
+    if not anime_nome:
+        logging.warning(f"Nome não encontrado para anime ID {anime_id} em animlist.json")
+        return buscar_dados_tmdb(anime_id, tipo='tv')
+    return buscar_dados_anilist(anime_nome, anime_id)
+
+# --------------- REVALIDAÇÃO ---------------
+def selecionar_desatualizados(catalogos, limite, idade_dias):
+    """Retorna até `limite` pares (arquivo, índice) dos registros mais antigos.
+
+    Registros sem 'atualizado_em' vêm primeiro. Uma tentativa que falhou
+    ('falha_em') também conta como verificação, para que um ID quebrado não
+    ocupe o orçamento de toda execução.
+    """
+    corte = (datetime.now(timezone.utc) - timedelta(days=idade_dias)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    candidatos = []
+    for nome_arquivo, registros in catalogos.items():
+        for indice, registro in enumerate(registros):
+            verificado = max(registro.get('atualizado_em') or '', registro.get('falha_em') or '')
+            if verificado < corte:
+                candidatos.append((verificado, nome_arquivo, indice))
+    return [(nome_arquivo, indice) for _, nome_arquivo, indice in heapq.nsmallest(limite, candidatos)]
+
+def revalidar(limite=REVALIDAR_LIMITE, idade_dias=REVALIDAR_IDADE_DIAS):
+    """Atualiza no lugar os `limite` registros mais desatualizados de Filmes_Encontrados."""
+    animlist = carregar_animlist()
+    buscadores = {
+        'CodeFilmesNomes.json': obter_dados_imdb,
+        'CodeSeriesNomes.json': lambda item_id: buscar_dados_tmdb(item_id, tipo='tv'),
+        'CodeAnimesNomes.json': lambda item_id: buscar_dados_anime(item_id, animlist),
+    }
+    catalogos = {nome_arquivo: carregar_json_existente(nome_arquivo) for nome_arquivo in buscadores}
+    selecionados = selecionar_desatualizados(catalogos, limite, idade_dias)
+    logging.info(f"🔄 Revalidando {len(selecionados)} registros (limite={limite}, idade mínima={idade_dias} dias)")
+
+    alterados = set()
+    try:
+        for nome_arquivo, indice in selecionados:
+            registro = catalogos[nome_arquivo][indice]
+            logging.info(f"🔍 Revalidando {registro['id']} ({nome_arquivo}), atualizado em {registro.get('atualizado_em', 'nunca')}")
+            dados = buscadores[nome_arquivo](registro['id'])
+            if dados:
+                registro.update(dados)
+                registro.pop('falha_em', None)
+            else:
+                logging.warning(f"⚠️ Falha ao revalidar {registro['id']} ({nome_arquivo})")
+                registro['falha_em'] = agora_iso()
+            alterados.add(nome_arquivo)
+    finally:
+        # Só os arquivos com registros revalidados são regravados, uma vez cada
+        for nome_arquivo in alterados:
+            salvar_json_incremental(nome_arquivo, catalogos[nome_arquivo])
+
+    logging.info(f"✅ Revalidação finalizada: {len(selecionados)} registros em {len(alterados)} arquivos")
+
 # --------------- MAIN ---------------
 def main():
     filmes_ids = carregar_ids_filmes()
@@ -351,7 +503,9 @@ def main():
                         "qualidade": dados["qualidade"],
                         "descricao": dados["descricao"],
                         "generos": dados["generos"],
-                        "data_lancamento": dados["data_lancamento"]
+                        "data_lancamento": dados["data_lancamento"],
+                        "fonte": dados["fonte"],
+                        "atualizado_em": dados["atualizado_em"]
                     }
                     filmes_nomes.append(novo_filme)
                     salvar_json_incremental('CodeFilmesNomes.json', filmes_nomes)
@@ -379,13 +533,7 @@ def main():
 
             if str(anime_id) not in animes_ids_processados:
                 logging.info(f"🔍 Buscando anime ID: {anime_id}")
-                # Buscar nome correspondente no animlist.json
-                anime_nome = next((item['nome'] for item in animlist if item['id'] == str(anime_id)), None)
-                if not anime_nome:
-                    logging.warning(f"Nome não encontrado para anime ID {anime_id} em animlist.json")
-                    dados = buscar_dados_tmdb(anime_id, tipo='tv')
-                else:
-                    dados = buscar_dados_anilist(anime_nome, anime_id)
+                dados = buscar_dados_anime(anime_id, animlist)
 
                 if dados:
                     animes_nomes.append(dados)
@@ -397,4 +545,16 @@ def main():
     logging.info(f"Arquivos atualizados em: {SAIDA_DIR}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Busca dados de filmes, séries e animes.")
+    parser.add_argument('--revalidar', action='store_true',
+                        help="Atualiza os registros mais antigos em vez de buscar IDs novos")
+    parser.add_argument('--limite', type=int, default=REVALIDAR_LIMITE,
+                        help="Máximo de registros revalidados nesta execução")
+    parser.add_argument('--idade-dias', type=float, default=REVALIDAR_IDADE_DIAS,
+                        help="Idade mínima, em dias, para um registro ser revalidado")
+    args = parser.parse_args()
+
+    if args.revalidar:
+        revalidar(args.limite, args.idade_dias)
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,107 @@
+import importlib.util
+import json
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('ATUALIZAR_NA_INICIALIZACAO', 'false')
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from BackEnd import app as api_modulo  # noqa: E402
+
+
+class CacheDistribuido(api_modulo.CacheLocal):
+    """CacheLocal que se apresenta como Redis, para exercitar os caminhos compartilhados."""
+    distribuido = True
+
+
+@pytest.fixture(scope='module')
+def app_code():
+    """Codes/A-AppCode.py (o nome com hífen não deixa importar direto)."""
+    caminho = os.path.join(os.path.dirname(__file__), '..', 'Codes', 'A-AppCode.py')
+    spec = importlib.util.spec_from_file_location('app_code', caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+@pytest.fixture
+def api():
+    return api_modulo
+
+
+@pytest.fixture
+def cliente(api):
+    return api.app.test_client()
+
+
+@pytest.fixture
+def cabecalhos(api):
+    return {'X-API-Key': api.API_KEY}
+
+
+@pytest.fixture
+def cache_distribuido(api, monkeypatch):
+    cache = CacheDistribuido()
+    monkeypatch.setattr(api, 'cache_compartilhado', cache)
+    return cache
+
+
+@pytest.fixture
+def limpar_corpos(api):
+    """Esvazia o cache local de corpos, como em um worker recém-iniciado."""
+    def limpar():
+        with api.corpos_lock:
+            api.corpos_cache.clear()
+            api.corpos_cache_bytes = 0
+    return limpar
+
+
+FILMES = [
+    {'id': 'tt0133093', 'titulo': 'Matrix', 'titulo_original': 'The Matrix', 'capa': 'https://image.tmdb.org/t/p/w500/m.jpg',
+     'qualidade': 'HD', 'descricao': 'Um hacker descobre a verdade.', 'generos': ['Ação', 'Ficção científica'],
+     'data_lancamento': '1999-03-31'},
+    {'id': 'tt0848228', 'titulo': 'Os Vingadores', 'titulo_original': 'The Avengers', 'capa': 'https://image.tmdb.org/t/p/w500/v.jpg',
+     'qualidade': 'HD', 'descricao': 'Heróis se unem.', 'generos': ['Ação', 'Aventura', 'Ficção científica'],
+     'data_lancamento': '2012-04-27'},
+    {'id': 'tt0110912', 'titulo': 'Pulp Fiction: Tempo de Violência', 'titulo_original': 'Pulp Fiction',
+     'capa': 'https://image.tmdb.org/t/p/w500/p.jpg', 'qualidade': 'CAM', 'descricao': 'Histórias cruzadas.',
+     'generos': ['Crime', 'Drama'], 'data_lancamento': '1994-10-14'},
+]
+SERIES = [
+    {'id': '63174', 'titulo': 'Lucifer', 'capa': 'https://image.tmdb.org/t/p/w500/l.jpg', 'qualidade': 'HD',
+     'descricao': 'O diabo em Los Angeles.', 'generos': ['Crime', 'Drama', 'Fantasia'], 'data_estreia': '2016-01-25'},
+    {'id': '70523', 'titulo': 'Dark', 'capa': 'https://image.tmdb.org/t/p/w500/d.jpg', 'qualidade': 'HD',
+     'descricao': 'Viagem no tempo.', 'generos': ['Drama', 'Ficção científica'], 'data_estreia': '2017-12-01'},
+]
+ANIMES = [
+    {'id': '1429', 'titulo': 'Attack on Titan', 'titulo_original': 'Shingeki no Kyojin',
+     'capa': 'https://image.tmdb.org/t/p/w500/a.jpg', 'qualidade': 'HD', 'descricao': 'Titãs.',
+     'generos': ['Animação', 'Ação'], 'data_estreia': '2013-04-07'},
+]
+
+
+@pytest.fixture
+def catalogo(api, tmp_path, monkeypatch, limpar_corpos):
+    """Troca os três catálogos por FILMES, SERIES e ANIMES em arquivos temporários.
+
+    Os índices registrados passam a ler os arquivos novos (e são reconstruídos);
+    os snapshots reais continuam intactos para os outros testes.
+    """
+    trocados = {}
+    for (tipo, caminho), dados in zip(api.CATALOGOS.items(), (FILMES, SERIES, ANIMES)):
+        novo = str(tmp_path / os.path.basename(caminho))
+        with open(novo, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False)
+        trocados[caminho] = novo
+        monkeypatch.setitem(api.CATALOGOS, tipo, novo)
+    for nome, caminho in list(api.JSON_PATHS.items()):
+        if caminho in trocados:
+            monkeypatch.setitem(api.JSON_PATHS, nome, trocados[caminho])
+    monkeypatch.setattr(api, 'indices', {
+        nome: {**indice, 'caminhos': [trocados.get(c, c) for c in indice['caminhos']], 'estado': None}
+        for nome, indice in api.indices.items()
+    })
+    limpar_corpos()
+    return {'filme': FILMES, 'serie': SERIES, 'anime': ANIMES}
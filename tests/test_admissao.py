@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def classe(api, monkeypatch):
+    classe = api.ClasseAdmissao('busca_curta', concorrencia=1, fila=1)
+    monkeypatch.setitem(api.classes_admissao, 'busca_curta', classe)
+    monkeypatch.setitem(api.CONFIG, 'ADMISSAO_ESPERA_MAX', 0.05)
+    return classe
+
+
+def test_fila_cheia_descarta_na_hora(api, classe):
+    classe.fila = 0
+    with classe.admitir():
+        with pytest.raises(api.Sobrecarga):
+            with classe.admitir():
+                pass
+    assert classe.contadores == {'admitidas': 1, 'descartadas': 1}
+    assert classe.executando == 0
+
+
+def test_espera_na_fila_ate_a_vaga(api, classe, monkeypatch):
+    monkeypatch.setitem(api.CONFIG, 'ADMISSAO_ESPERA_MAX', 5)
+    dentro, liberar, resultado = threading.Event(), threading.Event(), []
+
+    def ocupar():
+        with classe.admitir():
+            dentro.set()
+            liberar.wait(5)
+
+    ocupante = threading.Thread(target=ocupar)
+    ocupante.start()
+    dentro.wait(5)
+
+    def esperar():
+        with classe.admitir():
+            resultado.append('admitida')
+
+    esperando = threading.Thread(target=esperar)
+    esperando.start()
+    while not classe.na_fila:
+        time.sleep(0.001)
+    liberar.set()
+    ocupante.join()
+    esperando.join()
+    assert resultado == ['admitida']
+    assert classe.contadores == {'admitidas': 2, 'enfileiradas': 1}
+
+
+def test_fila_que_nao_anda_desiste(api, classe):
+    with classe.admitir():
+        with pytest.raises(api.Sobrecarga):
+            with classe.admitir():
+                pass
+    assert classe.contadores['enfileiradas'] == 1
+    assert classe.contadores['descartadas'] == 1
+    assert classe.na_fila == 0
+
+
+def test_busca_curta_sobrecarregada_responde_503(cliente, cabecalhos, classe, limpar_corpos):
+    limpar_corpos()
+    classe.fila = 0
+    with classe.admitir():
+        resposta = cliente.get('/buscar?q=ab', headers=cabecalhos)
+    assert resposta.status_code == 503
+    assert resposta.headers['Retry-After'] == '1'
+    assert resposta.headers['Cache-Control'] == 'no-store'
+
+
+def test_resposta_em_cache_nao_passa_pela_admissao(cliente, cabecalhos, classe, limpar_corpos):
+    limpar_corpos()
+    assert cliente.get('/buscar?q=ab', headers=cabecalhos).status_code == 200
+    classe.fila = 0
+    with classe.admitir():
+        resposta = cliente.get('/buscar?q=ab', headers=cabecalhos)
+    assert resposta.status_code == 200
+    assert classe.contadores['descartadas'] == 0
+
+
+def test_termo_longo_nao_passa_pela_admissao(cliente, cabecalhos, classe, limpar_corpos):
+    limpar_corpos()
+    classe.fila = 0
+    with classe.admitir():
+        assert cliente.get('/buscar?q=matrix', headers=cabecalhos).status_code == 200
@@ -0,0 +1,28 @@
+def sugerir(cliente, cabecalhos, prefixo, **params):
+    return cliente.get('/autocompletar', query_string={'q': prefixo, **params}, headers=cabecalhos)
+
+
+def test_titulo_que_comeca_com_o_prefixo(cliente, cabecalhos, catalogo):
+    sugestoes = sugerir(cliente, cabecalhos, 'Mat').get_json()['sugestoes']
+    assert sugestoes == [{'id': 'tt0133093', 'titulo': 'Matrix', 'capa': catalogo['filme'][0]['capa'], 'tipo': 'filme'}]
+
+
+def test_palavra_do_meio_e_titulo_original(cliente, cabecalhos, catalogo):
+    assert [s['id'] for s in sugerir(cliente, cabecalhos, 'vingad').get_json()['sugestoes']] == ['tt0848228']
+    assert [s['id'] for s in sugerir(cliente, cabecalhos, 'shingeki').get_json()['sugestoes']] == ['1429']
+
+
+def test_ordem_alfabetica_e_sem_repetidos(cliente, cabecalhos, catalogo):
+    ids = [s['id'] for s in sugerir(cliente, cabecalhos, 'the').get_json()['sugestoes']]
+    assert ids == ['tt0848228', 'tt0133093']
+    # titulo e titulo_original começam com "pulp": o item aparece uma vez só
+    assert [s['id'] for s in sugerir(cliente, cabecalhos, 'pulp').get_json()['sugestoes']] == ['tt0110912']
+
+
+def test_acentos_e_limite(cliente, cabecalhos, catalogo):
+    assert [s['id'] for s in sugerir(cliente, cabecalhos, 'VIOLÊN').get_json()['sugestoes']] == ['tt0110912']
+    assert len(sugerir(cliente, cabecalhos, 'd', limite=1).get_json()['sugestoes']) == 1
+
+
+def test_prefixo_vazio(cliente, cabecalhos, catalogo):
+    assert sugerir(cliente, cabecalhos, '  ').status_code == 400
@@ -0,0 +1,63 @@
+import json
+import os
+
+
+def pedir(cliente, cabecalhos, caminho, **params):
+    return cliente.get(caminho, query_string=params, headers=cabecalhos).get_json()
+
+
+def test_busca_paginada_e_contagem(api, cliente, cabecalhos, catalogo, monkeypatch):
+    monkeypatch.setitem(api.CONFIG, 'ITEMS_PER_PAGE', 1)
+    # "ti" casa com "Pulp Fiction" e "Attack on Titan"
+    primeira = pedir(cliente, cabecalhos, '/buscar', q='Ti')
+    assert primeira['total'] == 2 and primeira['total_paginas'] == 2
+    assert [(r['id'], r['tipo']) for r in primeira['resultados']] == [('tt0110912', 'filme')]
+    segunda = pedir(cliente, cabecalhos, '/buscar', q='Ti', pagina=2)
+    assert [(r['id'], r['tipo']) for r in segunda['resultados']] == [('1429', 'anime')]
+
+    assert pedir(cliente, cabecalhos, '/buscar', q='Ti', count_only='true') == {'total': 2, 'total_paginas': 2}
+
+
+def test_genero_por_tipo_e_contagem(cliente, cabecalhos, catalogo):
+    todos = pedir(cliente, cabecalhos, '/buscar_por_genero', genero='ficcao')
+    assert [r['id'] for r in todos['resultados']] == ['tt0133093', 'tt0848228', '70523']
+    series = pedir(cliente, cabecalhos, '/buscar_por_genero', genero='drama,fantasia', tipo='serie')
+    assert [r['id'] for r in series['resultados']] == ['63174', '70523']
+    assert pedir(cliente, cabecalhos, '/buscar_por_genero', genero='crime', count_only='true') == \
+        {'total': 2, 'total_paginas': 1}
+
+
+def test_so_a_pagina_pedida_e_copiada(api, monkeypatch):
+    monkeypatch.setitem(api.CONFIG, 'ITEMS_PER_PAGE', 3)
+    copiados = []
+    original = api.registro_de_busca
+    monkeypatch.setattr(api, 'registro_de_busca', lambda *args: copiados.append(args[1]) or original(*args))
+    encontrados = (('filme', posicao, {'id': str(posicao)}) for posicao in range(10))
+
+    itens, total = api.paginar_correspondencias(encontrados, 2)
+    assert total == 10
+    assert [item['id'] for item in itens] == ['3', '4', '5']
+    assert copiados == [3, 4, 5]
+
+    copiados.clear()
+    encontrados = (('filme', posicao, {'id': str(posicao)}) for posicao in range(10))
+    assert api.paginar_correspondencias(encontrados, 1, so_contagem=True) == ([], 10)
+    assert copiados == []
+
+
+def test_indice_e_dados_vem_da_mesma_versao(api, catalogo):
+    caminho = api.CATALOGOS['serie']
+    (dados,), indice = api.obter_indice_com_dados('busca_serie')
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(catalogo['serie'][:1], f)
+    os.utime(caminho, ns=(9_000_000_000, 9_000_000_000))
+
+    (novos,), novo_indice = api.obter_indice_com_dados('busca_serie')
+    assert novos is api.carregar_snapshot(caminho)['dados']
+    assert len(novos) == len(novo_indice) == 1
+    assert len(dados) == len(indice) == 2  # Quem já tinha o par antigo continua com ele inteiro
+
+
+def test_cartao_de_outra_versao_nao_e_usado(api, catalogo):
+    antigo = {**catalogo['serie'][1], 'titulo': 'Dark (antigo)'}
+    assert api.registro_de_busca('serie', 1, antigo, api.CAMPOS_CARTAO)['titulo'] == 'Dark (antigo)'
@@ -0,0 +1,42 @@
+def buscar(cliente, cabecalhos, termo, **params):
+    return cliente.get('/buscar', query_string={'q': termo, 'modo': 'fuzzy', **params}, headers=cabecalhos)
+
+
+def test_erro_de_digitacao_acha_o_titulo(cliente, cabecalhos, catalogo):
+    resposta = buscar(cliente, cabecalhos, 'lucfer')
+    assert resposta.status_code == 200
+    dados = resposta.get_json()
+    assert dados['modo'] == 'fuzzy' and not dados['parcial']
+    assert dados['resultados'][0]['id'] == '63174'
+    assert dados['resultados'][0]['tipo'] == 'serie'
+
+
+def test_titulo_original_tambem_conta(cliente, cabecalhos, catalogo):
+    resultados = buscar(cliente, cabecalhos, 'shingeki kyojn').get_json()['resultados']
+    assert [r['id'] for r in resultados] == ['1429']
+
+
+def test_termo_contido_no_titulo_vem_antes(cliente, cabecalhos, catalogo):
+    resultados = buscar(cliente, cabecalhos, 'matrix').get_json()['resultados']
+    assert resultados[0]['id'] == 'tt0133093'
+    assert resultados[0]['score'] > 1
+    assert all(r['score'] <= resultados[0]['score'] for r in resultados)
+
+
+def test_limite_e_projecao(cliente, cabecalhos, catalogo):
+    resultados = buscar(cliente, cabecalhos, 'the', limite=1, fields='id,titulo').get_json()['resultados']
+    assert len(resultados) == 1
+    assert set(resultados[0]) == {'id', 'titulo', 'tipo', 'score'}
+
+
+def test_orcamento_estourado_devolve_parcial_sem_cache(api, cliente, cabecalhos, catalogo, monkeypatch):
+    monkeypatch.setitem(api.CONFIG, 'BUSCA_FUZZY_ORCAMENTO_MS', -1)
+    resposta = buscar(cliente, cabecalhos, 'vingadores')
+    assert resposta.get_json()['parcial']
+    assert resposta.headers['Cache-Control'] == 'no-store'
+    assert 'ETag' not in resposta.headers
+
+    monkeypatch.setitem(api.CONFIG, 'BUSCA_FUZZY_ORCAMENTO_MS', 50)
+    dados = buscar(cliente, cabecalhos, 'vingadores').get_json()
+    assert not dados['parcial']
+    assert dados['resultados'][0]['id'] == 'tt0848228'
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from conftest import SERIES
+
+
+def pedir(cliente, cabecalhos, caminho, **params):
+    return cliente.get(caminho, query_string=params, headers=cabecalhos).get_json()
+
+
+@pytest.mark.parametrize('fields', ['card', 'id,titulo,capa,qualidade'])
+def test_cartao_na_lista_paginada(api, cliente, cabecalhos, catalogo, fields):
+    series = pedir(cliente, cabecalhos, '/series/pagina', fields=fields)['series']
+    assert series == [{campo: item[campo] for campo in api.CAMPOS_CARTAO} for item in catalogo['serie']]
+
+
+def test_campos_escolhidos_e_ausentes(cliente, cabecalhos, catalogo):
+    series = pedir(cliente, cabecalhos, '/series/pagina', fields='titulo, titulo_original,titulo')['series']
+    # Campo que o item não tem fica de fora, sem null; repetidos contam uma vez
+    assert series == [{'titulo': 'Lucifer'}, {'titulo': 'Dark'}]
+
+
+def test_sem_fields_vem_o_registro_inteiro(cliente, cabecalhos, catalogo):
+    assert pedir(cliente, cabecalhos, '/series/pagina')['series'] == catalogo['serie']
+
+
+def test_busca_projetada_leva_o_tipo(cliente, cabecalhos, catalogo):
+    resultados = pedir(cliente, cabecalhos, '/buscar', q='dark', fields='card')['resultados']
+    assert resultados == [{'id': '70523', 'titulo': 'Dark', 'capa': catalogo['serie'][1]['capa'],
+                           'qualidade': 'HD', 'tipo': 'serie'}]
+    resultados = pedir(cliente, cabecalhos, '/buscar_por_genero', genero='fantasia', fields='id')['resultados']
+    assert resultados == [{'id': '63174', 'tipo': 'serie'}]
+
+
+def test_cartao_de_busca_reaproveita_o_da_lista(api, catalogo):
+    (dados,), cartoes = api.obter_indice_com_dados('cartoes_series_nomes')
+    cartao = cartoes[1]
+    busca = api.registro_de_busca('serie', 1, dados[1], api.CAMPOS_CARTAO)
+    assert busca == {**cartao, 'tipo': 'serie'}
+    assert all(busca[campo] is cartao[campo] for campo in api.CAMPOS_CARTAO)
+    assert 'cartoes_busca_serie' not in api.indices
+
+
+def test_valores_repetidos_viram_um_so_objeto(api, tmp_path):
+    caminho = tmp_path / 'itens.json'
+    caminho.write_text(json.dumps([
+        {'titulo': 'Dark', 'titulo_original': 'Dark', 'qualidade': 'HD', 'generos': ['Drama', 'Mistério']},
+        {'titulo': 'Lucifer', 'qualidade': 'HD', 'generos': ['Drama'], 'descricao': 'Drama'},
+    ]), encoding='utf-8')
+    primeiro, segundo = api.carregar_dados_json(str(caminho))
+    assert primeiro['qualidade'] is segundo['qualidade']
+    assert primeiro['generos'][0] is segundo['generos'][0]
+    assert primeiro['titulo_original'] is primeiro['titulo']
+    assert segundo['descricao'] is not segundo['generos'][0]  # Campos fora da lista ficam como vieram
+
+
+def test_campos_fazem_parte_da_etag(cliente, cabecalhos, catalogo):
+    def etag(**params):
+        return cliente.get('/series/pagina', query_string=params, headers=cabecalhos).headers['ETag']
+
+    assert etag(fields='card') == etag(fields='id,titulo,capa,qualidade')
+    assert etag(fields='card') != etag()
+
+
+@pytest.mark.parametrize('fields', ['card', 'titulo'])
+def test_series_tambem_projeta(api, cliente, cabecalhos, tmp_path, monkeypatch, fields):
+    caminho = str(tmp_path / 'series.json')
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(SERIES, f)
+    monkeypatch.setitem(api.JSON_PATHS, 'series', caminho)
+    monkeypatch.setitem(api.indices['cartoes_series'], 'caminhos', [caminho])
+    monkeypatch.setattr(api, 'enfileirar_atualizacao', lambda *args: None)
+
+    resposta = cliente.get('/series', query_string={'fields': fields}, headers=cabecalhos).get_json()
+    campos = api.CAMPOS_CARTAO if fields == 'card' else ('titulo',)
+    assert resposta == [{campo: item[campo] for campo in campos} for item in SERIES]
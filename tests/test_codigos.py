@@ -0,0 +1,123 @@
+import json
+
+import pytest
+import requests
+
+
+@pytest.fixture
+def relogio(api, monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(api.time, 'monotonic', lambda: agora[0])
+    return agora
+
+
+@pytest.fixture
+def atualizador(api, tmp_path, monkeypatch, limpar_corpos):
+    """Atualizador de /codigos/filmes sobre arquivos temporários e sem thread de busca."""
+    fonte = {**api.FONTES_CODIGOS['filmes'], 'caminho': str(tmp_path / 'CodeFilmes.json')}
+    atualizador = api.AtualizadorCodigos('filmes', fonte)
+    atualizador.backup = str(tmp_path / 'BackupCodeFilmes.json')
+    monkeypatch.setattr(atualizador, 'garantir', lambda: atualizador.tentativas)
+    monkeypatch.setitem(api.atualizadores_codigos, 'filmes', atualizador)
+    monkeypatch.setitem(api.CONFIG, 'CODIGOS_ESPERA_MAX', 0.01)
+    monkeypatch.setattr(api, 'codigos_bons', {})
+    limpar_corpos()
+    return atualizador
+
+
+class Parar(Exception):
+    pass
+
+
+class RespostaFalsa:
+    def __init__(self, texto):
+        self.content = texto.encode('utf-8')
+        self.text = texto
+
+    def raise_for_status(self):
+        pass
+
+
+def test_disjuntor_abre_depois_das_falhas_seguidas(api, relogio, monkeypatch):
+    monkeypatch.setitem(api.CONFIG, 'DISJUNTOR_FALHAS', 2)
+    disjuntor = api.Disjuntor()
+    disjuntor.falha()
+    assert disjuntor.estado() == 'fechado'
+    disjuntor.falha()
+    assert disjuntor.estado() == 'aberto'
+    assert not disjuntor.permite()
+    assert disjuntor.restante() == api.CONFIG['DISJUNTOR_ABERTO_S']
+
+    relogio[0] += api.CONFIG['DISJUNTOR_ABERTO_S']
+    assert disjuntor.estado() == 'meio-aberto'
+    disjuntor.falha()
+    assert disjuntor.estado() == 'aberto'
+
+    relogio[0] += api.CONFIG['DISJUNTOR_ABERTO_S']
+    disjuntor.sucesso()
+    assert disjuntor.estado() == 'fechado'
+
+
+def test_lista_vazia_nao_sobrescreve_a_ultima_boa(api, atualizador, monkeypatch):
+    monkeypatch.setattr(api.requests, 'get', lambda *a, **k: RespostaFalsa('tt0110912 tt0133093'))
+    atualizador._buscar()
+    with open(atualizador.backup, encoding='utf-8') as f:
+        assert json.load(f) == {'codigos': ['tt0110912', 'tt0133093']}
+
+    monkeypatch.setattr(api.requests, 'get', lambda *a, **k: RespostaFalsa('manutenção'))
+    with pytest.raises(ValueError):
+        atualizador._buscar()
+    with open(atualizador.fonte['caminho'], encoding='utf-8') as f:
+        assert json.load(f) == {'codigos': ['tt0110912', 'tt0133093']}
+
+
+def test_busca_falha_ate_abrir_o_disjuntor(api, atualizador, monkeypatch):
+    monkeypatch.setitem(api.CONFIG, 'CODIGOS_BACKOFF_INICIAL', 0)
+
+    def falhar(*args, **kwargs):
+        raise requests.exceptions.ConnectionError('sem rede')
+
+    def parar_depois_de_abrir(segundos):
+        if atualizador.disjuntor.estado() == 'aberto':
+            raise Parar
+
+    monkeypatch.setattr(api.requests, 'get', falhar)
+    monkeypatch.setattr(api.time, 'sleep', parar_depois_de_abrir)
+    with pytest.raises(Parar):
+        atualizador._executar()
+    assert atualizador.tentativas == api.CONFIG['DISJUNTOR_FALHAS']
+    assert isinstance(atualizador.ultimo_erro, requests.exceptions.ConnectionError)
+
+
+def test_sem_arquivo_serve_a_copia_velha(cliente, cabecalhos, atualizador):
+    with open(atualizador.backup, 'w', encoding='utf-8') as f:
+        json.dump({'codigos': ['tt0110912']}, f)
+    resposta = cliente.get('/codigos/filmes', headers=cabecalhos)
+    assert resposta.status_code == 200
+    assert resposta.get_json() == {'codigos': 'tt0110912'}
+    assert resposta.headers['Warning'] == '110 - "Response is Stale"'
+    assert resposta.headers['Cache-Control'] == 'no-cache'
+
+
+def test_sem_lista_nenhuma_responde_503(cliente, cabecalhos, atualizador):
+    resposta = cliente.get('/codigos/filmes', headers=cabecalhos)
+    assert resposta.status_code == 503
+    assert resposta.headers['Retry-After'] == '1'
+
+
+def test_disjuntor_aberto_responde_503_sem_esperar(api, cliente, cabecalhos, atualizador, relogio, monkeypatch):
+    for _ in range(api.CONFIG['DISJUNTOR_FALHAS']):
+        atualizador.disjuntor.falha()
+    monkeypatch.setattr(atualizador, 'esperar', lambda *a: pytest.fail('esperou com o disjuntor aberto'))
+    resposta = cliente.get('/codigos/filmes', headers=cabecalhos)
+    assert resposta.status_code == 503
+    assert resposta.headers['Retry-After'] == str(round(api.CONFIG['DISJUNTOR_ABERTO_S']))
+
+
+def test_com_arquivo_responde_do_arquivo(cliente, cabecalhos, atualizador):
+    with open(atualizador.fonte['caminho'], 'w', encoding='utf-8') as f:
+        json.dump({'codigos': ['tt0110912', 'tt0133093']}, f)
+    resposta = cliente.get('/codigos/filmes', headers=cabecalhos)
+    assert resposta.status_code == 200
+    assert resposta.get_json() == {'codigos': 'tt0110912, tt0133093'}
+    assert 'Warning' not in resposta.headers
@@ -0,0 +1,51 @@
+import gzip
+
+import pytest
+
+
+def pedir(cliente, cabecalhos, codificacao, caminho='/series/pagina?pagina=1'):
+    return cliente.get(caminho, headers={**cabecalhos, 'Accept-Encoding': codificacao})
+
+
+def test_gzip_negociado_pelo_accept_encoding(cliente, cabecalhos, limpar_corpos):
+    limpar_corpos()
+    simples = pedir(cliente, cabecalhos, 'identity')
+    comprimida = pedir(cliente, cabecalhos, 'gzip')
+    assert 'Content-Encoding' not in simples.headers
+    assert comprimida.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(comprimida.get_data()) == simples.get_data()
+    assert 'Accept-Encoding' in comprimida.headers['Vary']
+
+
+def test_brotli_preferido_quando_aceito(api, cliente, cabecalhos, limpar_corpos):
+    if api.brotli is None:
+        pytest.skip('brotli não instalado')
+    limpar_corpos()
+    simples = pedir(cliente, cabecalhos, 'identity')
+    comprimida = pedir(cliente, cabecalhos, 'gzip, br')
+    assert comprimida.headers['Content-Encoding'] == 'br'
+    assert api.brotli.decompress(comprimida.get_data()) == simples.get_data()
+
+
+def test_corpo_pequeno_sai_sem_compressao(cliente, cabecalhos):
+    resposta = pedir(cliente, cabecalhos, 'gzip', '/buscar?q=zzzzzz&count_only=true')
+    assert resposta.status_code == 200
+    assert 'Content-Encoding' not in resposta.headers
+
+
+def test_corpo_comprimido_uma_vez_por_versao(api, tmp_path, limpar_corpos):
+    caminho = str(tmp_path / 'series.json')
+    dados = [{'titulo': f'Série {i}', 'descricao': 'x' * 50} for i in range(100)]
+    chamadas = []
+
+    def gerar():
+        chamadas.append(1)
+        return dados
+
+    open(caminho, 'w').close()
+    limpar_corpos()
+    for codificacao in ('gzip', 'gzip', 'identity'):
+        with api.app.test_request_context('/', headers={'Accept-Encoding': codificacao}):
+            resposta = api.resposta_versionada(('teste', caminho), [caminho], gerar)
+        assert resposta.status_code == 200
+    assert chamadas == [1]
@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.fixture
+def chave_admin(api, monkeypatch):
+    monkeypatch.setattr(api, 'ADMIN_API_KEY', 'admin-teste')
+    return {'X-API-Key': 'admin-teste'}
+
+
+@pytest.mark.parametrize('caminho', ['/metrics', '/debug/profile?segundos=0.1'])
+def test_sem_admin_api_key_as_rotas_nao_existem(api, cliente, cabecalhos, monkeypatch, caminho):
+    monkeypatch.setattr(api, 'ADMIN_API_KEY', None)
+    assert cliente.get(caminho, headers=cabecalhos).status_code == 404
+
+
+@pytest.mark.parametrize('caminho', ['/metrics', '/debug/profile?segundos=0.1'])
+def test_chave_publica_nao_abre_o_diagnostico(cliente, cabecalhos, chave_admin, caminho):
+    assert cliente.get(caminho, headers=cabecalhos).status_code == 401
+
+
+def test_metrics_com_chave_admin(cliente, chave_admin):
+    resposta = cliente.get('/metrics', headers=chave_admin)
+    assert resposta.status_code == 200
+    assert 'filmes_request_duration_seconds' in resposta.get_data(as_text=True)
+
+
+def test_profile_limitado_a_uma_amostragem_por_vez(api, cliente, chave_admin):
+    assert api.perfis_em_andamento.acquire(blocking=False)
+    try:
+        resposta = cliente.get('/debug/profile?segundos=0.1', headers=chave_admin)
+    finally:
+        api.perfis_em_andamento.release()
+    assert resposta.status_code == 503
+    assert resposta.headers['Retry-After'] == '1'
+
+    assert cliente.get('/debug/profile?segundos=0.1', headers=chave_admin).status_code == 200
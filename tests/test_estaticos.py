@@ -0,0 +1,61 @@
+import gzip
+
+import pytest
+
+
+@pytest.fixture
+def estaticos(api, tmp_path, monkeypatch):
+    (tmp_path / 'js').mkdir()
+    (tmp_path / 'js' / 'app.js').write_text('console.log("filmes");\n' * 100)
+    (tmp_path / 'logo.svg').write_text('<svg/>')
+    monkeypatch.setattr(api.app, 'static_folder', str(tmp_path))
+    return tmp_path
+
+
+def test_construir_grava_copias_com_hash_e_comprimidas(api, estaticos):
+    manifesto = api.construir_estaticos()
+    assert set(manifesto) == {'js/app.js', 'logo.svg'}
+    app_js = estaticos / manifesto['js/app.js']
+    assert api.NOME_COM_HASH.search(manifesto['js/app.js'])
+    assert app_js.read_bytes() == (estaticos / 'js' / 'app.js').read_bytes()
+    assert gzip.decompress((estaticos / f"{manifesto['js/app.js']}.gz").read_bytes()) == app_js.read_bytes()
+    assert (estaticos / f"{manifesto['js/app.js']}.br").exists() == (api.brotli is not None)
+    # Pequeno demais para compensar a compressão
+    assert not (estaticos / f"{manifesto['logo.svg']}.gz").exists()
+
+    # Rodar de novo não copia o build para dentro de si mesmo
+    assert api.construir_estaticos() == manifesto
+
+
+def test_comando_construir_estaticos(api, estaticos):
+    resultado = api.app.test_cli_runner().invoke(args=['construir-estaticos'])
+    assert resultado.exit_code == 0
+    assert resultado.output.startswith('2 arquivos estáticos em ')
+    assert (estaticos / 'build' / 'manifest.json').exists()
+
+
+def test_arquivo_com_hash_e_imutavel_e_sai_pre_comprimido(api, cliente, cabecalhos, estaticos):
+    caminho = api.construir_estaticos()['js/app.js']
+    resposta = cliente.get(f'/{caminho}', headers={**cabecalhos, 'Accept-Encoding': 'gzip'})
+    assert resposta.status_code == 200
+    assert resposta.headers['Cache-Control'] == api.CONFIG['CACHE_CONTROL_IMUTAVEL']
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert resposta.mimetype in ('text/javascript', 'application/javascript')
+    assert gzip.decompress(resposta.get_data()) == (estaticos / 'js' / 'app.js').read_bytes()
+    assert 'Accept-Encoding' in resposta.headers['Vary']
+
+
+def test_arquivo_sem_hash_revalida(api, cliente, cabecalhos, estaticos):
+    resposta = cliente.get('/js/app.js', headers=cabecalhos)
+    assert resposta.headers['Cache-Control'] == api.CONFIG['CACHE_CONTROL_ESTATICOS']
+    assert 'Content-Encoding' not in resposta.headers
+    revalidada = cliente.get('/js/app.js', headers={**cabecalhos, 'If-None-Match': resposta.headers['ETag']})
+    assert revalidada.status_code == 304
+
+
+def test_fora_da_pasta_ou_inexistente(api, cliente, cabecalhos, estaticos):
+    (estaticos.parent / 'segredo.txt').write_text('x')
+    with api.app.test_request_context('/', headers=cabecalhos):
+        resposta, status = api.serve_static('../segredo.txt')
+    assert status == 404
+    assert cliente.get('/js/nao-existe.js', headers=cabecalhos).status_code == 404
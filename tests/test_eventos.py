@@ -0,0 +1,67 @@
+import pytest
+
+
+@pytest.fixture
+def cache(api, monkeypatch):
+    monkeypatch.setattr(api, 'cache_compartilhado', api.CacheLocal())
+    monkeypatch.setitem(api.CONFIG, 'EVENTOS_HEARTBEAT', 0.01)
+
+
+def mudanca(api, tipo, **campos):
+    api.anexar_mudanca({'tipo': tipo, 'origem': 'catalogo', 'adicionados': [], 'atualizados': [],
+                        'removidos': [], **campos})
+
+
+def test_canais_filtrados_por_tipo(api, cache):
+    inicio = api.mudancas_desde(None)['versao']
+    mudanca(api, 'filme', adicionados=['tt1'])
+    mudanca(api, 'serie', atualizados=['s1'])  # Sem títulos novos: não vira evento
+    mudanca(api, 'serie', adicionados=['s2'], itens=[{'id': 's2'}])
+    stream = api.transmitir_novidades({'serie'}, inicio)
+    next(stream)
+    evento = next(stream)
+    assert evento.startswith(f"id: {api.mudancas_desde(None)['versao']}\nevent: serie\n")
+    assert '"itens": [{"id": "s2"}]' in evento
+    assert next(stream) == ": keep-alive\n\n"
+
+
+def test_nova_versao_acorda_quem_espera(api):
+    transmissor = api.TransmissorNovidades()
+    assert not transmissor.esperar(0, 0.01)
+    transmissor.notificar(3)
+    assert transmissor.esperar(2, 0.01)
+    transmissor.notificar(1)  # Versão velha (fora de ordem) não volta o contador
+    assert transmissor.versao == 3
+
+
+def test_rota_de_eventos(api, cliente, cabecalhos, cache, monkeypatch):
+    monkeypatch.setattr(api, 'transmissor_novidades', api.TransmissorNovidades())
+    monkeypatch.setitem(api.CONFIG, 'EVENTOS_INTERVALO_VIGIA', 0.01)
+    resposta = cliente.get('/eventos/novidades?tipos=anime', headers=cabecalhos, buffered=False)
+    assert resposta.status_code == 200
+    assert resposta.mimetype == 'text/event-stream'
+    assert resposta.headers['Cache-Control'] == 'no-cache'
+    assert resposta.headers['X-Accel-Buffering'] == 'no'
+    assert api.transmissor_novidades.assinantes == 1
+    assert next(resposta.response).startswith(b'retry: ')
+    resposta.close()
+    assert api.transmissor_novidades.assinantes == 0
+
+
+def test_limite_de_assinantes(api, cliente, cabecalhos, cache, monkeypatch):
+    monkeypatch.setattr(api, 'transmissor_novidades', api.TransmissorNovidades())
+    monkeypatch.setitem(api.CONFIG, 'EVENTOS_MAX_ASSINANTES', 0)
+    resposta = cliente.get('/eventos/novidades', headers=cabecalhos)
+    assert resposta.status_code == 503
+    assert resposta.headers['Retry-After'] == str(api.CONFIG['EVENTOS_RETRY_MS'] // 1000)
+
+
+def test_tipo_invalido(cliente, cabecalhos):
+    assert cliente.get('/eventos/novidades?tipos=filme,podcast', headers=cabecalhos).status_code == 400
+
+
+@pytest.mark.parametrize('threads, esperado', [(64, 16), (32, 1), (8, 1), (200, 84)])
+def test_limite_derivado_das_threads(api, monkeypatch, threads, esperado):
+    monkeypatch.setitem(api.CONFIG, 'EVENTOS_MAX_ASSINANTES', None)
+    monkeypatch.setitem(api.CONFIG, 'THREADS_POR_WORKER', threads)
+    assert api.limite_assinantes_eventos() == esperado
@@ -0,0 +1,29 @@
+def generos(cliente, cabecalhos, **params):
+    resposta = cliente.get('/buscar_generos', query_string=params, headers=cabecalhos)
+    return resposta.get_json() if resposta.status_code == 200 else resposta.status_code
+
+
+def test_do_mais_popular_para_o_menos(cliente, cabecalhos, catalogo):
+    assert generos(cliente, cabecalhos) == ['Ação', 'Drama', 'Ficção científica', 'Crime',
+                                            'Animação', 'Aventura', 'Fantasia']
+
+
+def test_prefixo_do_nome_ou_de_uma_palavra(cliente, cabecalhos, catalogo):
+    assert generos(cliente, cabecalhos, q='CIEN') == ['Ficção científica']
+    assert generos(cliente, cabecalhos, q='a') == ['Ação', 'Animação', 'Aventura']
+
+
+def test_por_tipo_ordena_pela_contagem_do_tipo(cliente, cabecalhos, catalogo):
+    assert generos(cliente, cabecalhos, tipo='serie') == ['Drama', 'Ficção científica', 'Crime', 'Fantasia']
+    assert generos(cliente, cabecalhos, tipo='outro') == 400
+
+
+def test_contagens(cliente, cabecalhos, catalogo):
+    facetas = generos(cliente, cabecalhos, q='drama', contagens='true')
+    assert facetas == [{'genero': 'Drama', 'total': 3, 'por_tipo': {'filme': 1, 'serie': 2, 'anime': 0}}]
+
+
+def test_grafias_que_normalizam_igual_viram_uma_faceta(api):
+    filmes = [{'generos': ['Ação']}, {'generos': ['Acao', 'Ação']}, {'generos': ['Ação ']}]
+    indice = api.construir_indice_generos(filmes, [{'generos': 'Drama'}], [])
+    assert indice['generos'] == [{'genero': 'Ação', 'total': 3, 'por_tipo': {'filme': 3, 'serie': 0, 'anime': 0}}]
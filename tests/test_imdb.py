@@ -0,0 +1,35 @@
+import os
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def pagina(ld):
+    return f'<html><head><script type="application/ld+json">{ld}</script></head><body></body></html>'
+
+
+def test_jsonld_alternate_name_e_o_titulo_e_name_o_original(app_code):
+    # Como no IMDb: 'name' é o título original, 'alternateName' o localizado
+    html = pagina('{"@type": "Movie", "name": "Pulp Fiction", "alternateName": "Pulp Fiction: Tempo de Violência", '
+                  '"image": "capa.jpg", "description": "d", "genre": "Crime", "datePublished": "1994-10-14"}')
+    dados = app_code.extrair_imdb_jsonld(html, 'tt0110912')
+    assert dados['titulo'] == 'Pulp Fiction: Tempo de Violência'
+    assert dados['titulo_original'] == 'Pulp Fiction'
+    assert dados['generos'] == ['Crime']
+
+
+def test_jsonld_sem_alternate_name(app_code):
+    html = pagina('{"@type": "Movie", "name": "Amy&apos;s Story", "image": "capa.jpg", "description": "d", '
+                  '"genre": ["Drama"], "datePublished": "2019-03-08"}')
+    dados = app_code.extrair_imdb_jsonld(html, 'tt7944094')
+    assert dados['titulo'] == "Amy's Story"
+    assert dados['titulo_original'] is None
+
+
+def test_titulos_iguais_aos_do_soup_nas_fixtures(app_code):
+    fixtures = os.path.join(BASE_DIR, 'Benchmarks', 'fixtures', 'imdb')
+    for nome in sorted(os.listdir(fixtures)):
+        with open(os.path.join(fixtures, nome), encoding='utf-8') as f:
+            html = f.read()
+        soup = app_code.extrair_imdb_soup(html, nome[:-5])
+        jsonld = app_code.extrair_imdb_jsonld(html, nome[:-5])
+        assert (jsonld['titulo'], jsonld['titulo_original']) == (soup['titulo'], soup['titulo_original'])
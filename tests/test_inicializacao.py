@@ -0,0 +1,20 @@
+import pytest
+
+
+def test_lock_do_no_concede_a_um_processo_so(api, tmp_path, monkeypatch):
+    pytest.importorskip('fcntl')
+    monkeypatch.setattr(api, 'TEMP_DIR', str(tmp_path))
+    monkeypatch.setattr(api, 'lock_atualizacao_inicial', None)
+    assert api.obter_lock_do_no('teste')
+    # Outra descrição de arquivo (como a de outro worker) não obtém o flock
+    assert not api.obter_lock_do_no('teste')
+    api.lock_atualizacao_inicial.close()
+    assert api.obter_lock_do_no('teste')
+    api.lock_atualizacao_inicial.close()
+
+
+def test_ready_conta_os_codigos(api, cliente):
+    dados = api.carregar_snapshot(api.JSON_PATHS['code_series'])['dados']
+    arquivos = cliente.get('/ready').get_json()['arquivos']
+    assert arquivos['code_series']['itens'] == len(dados.get('codigos', []))
+    assert arquivos['code_series']['itens'] > 1
@@ -0,0 +1,99 @@
+import json
+import threading
+import uuid
+
+
+def test_job_de_outro_worker_sem_redis_fica_desconhecido(api, cliente, cabecalhos, monkeypatch):
+    monkeypatch.setattr(api, 'cache_compartilhado', api.CacheLocal())
+    resposta = cliente.get(f'/jobs/{uuid.uuid4().hex}', headers=cabecalhos)
+    assert resposta.status_code == 202
+    assert resposta.get_json()['status'] == 'desconhecido'
+    assert resposta.headers['Retry-After'] == '2'
+
+
+def test_id_malformado_e_404(api, cliente, cabecalhos, monkeypatch):
+    monkeypatch.setattr(api, 'cache_compartilhado', api.CacheLocal())
+    assert cliente.get('/jobs/nao-existe', headers=cabecalhos).status_code == 404
+
+
+def test_com_cache_distribuido_job_ausente_e_404(cliente, cabecalhos, cache_distribuido):
+    assert cliente.get(f'/jobs/{uuid.uuid4().hex}', headers=cabecalhos).status_code == 404
+
+
+def test_job_publicado_por_outro_no(api, cliente, cabecalhos, cache_distribuido):
+    job_id = uuid.uuid4().hex
+    cache_distribuido.set(api.chave_redis('job', job_id),
+                          json.dumps({'job_id': job_id, 'status': 'executando'}).encode('utf-8'), 60)
+    resposta = cliente.get(f'/jobs/{job_id}', headers=cabecalhos)
+    assert resposta.status_code == 202
+    assert resposta.get_json()['status'] == 'executando'
+
+
+def test_wait_true_responde_202_e_o_job_conclui(api, cliente, cabecalhos, monkeypatch):
+    monkeypatch.setattr(api, 'cache_compartilhado', api.CacheLocal())
+    monkeypatch.setattr(api, 'jobs', {})
+    monkeypatch.setattr(api, 'jobs_em_andamento', {})
+    liberar, chamadas = threading.Event(), []
+
+    async def atualizar_dados(url, cache_path, tipo):
+        chamadas.append(url)
+        liberar.wait(5)
+
+    monkeypatch.setattr(api, 'atualizar_dados', atualizar_dados)
+    aceito = cliente.get('/filmes/novos?wait=true', headers=cabecalhos)
+    assert aceito.status_code == 202
+    job_id = aceito.get_json()['job_id']
+    assert aceito.headers['Location'] == f'/jobs/{job_id}'
+
+    # Outro pedido com a atualização em andamento reaproveita o mesmo job
+    assert cliente.get('/filmes/novos?wait=true', headers=cabecalhos).get_json()['job_id'] == job_id
+    andamento = cliente.get(f'/jobs/{job_id}', headers=cabecalhos)
+    assert andamento.status_code == 202
+    assert andamento.get_json()['status'] in ('pendente', 'executando')
+
+    liberar.set()
+    concluido = cliente.get(f'/jobs/{job_id}?timeout=5', headers=cabecalhos)
+    assert concluido.status_code == 200
+    assert concluido.get_json()['status'] == 'concluido'
+    assert 'dados' in concluido.get_json()
+    assert len(chamadas) == 1
+
+
+def test_lock_com_outro_worker_espera_em_vez_de_concluir(api, cliente, cabecalhos, monkeypatch):
+    cache = api.CacheLocal()
+    monkeypatch.setattr(api, 'cache_compartilhado', cache)
+    monkeypatch.setattr(api, 'jobs', {})
+    monkeypatch.setattr(api, 'jobs_em_andamento', {})
+    monkeypatch.setitem(api.CONFIG, 'LOCK_ATUALIZACAO_ESPERA', 0.01)
+    chamadas = []
+
+    async def atualizar_dados(url, cache_path, tipo):
+        chamadas.append(url)
+
+    monkeypatch.setattr(api, 'atualizar_dados', atualizar_dados)
+    url, caminho = api.urljoin(api.CONFIG['BASE_URL'], '/filmes'), api.JSON_PATHS['filmes_novos']
+    chave = api.hashlib.sha1(f"{url}|{caminho}".encode('utf-8')).hexdigest()
+    nome_lock = api.chave_redis('lock', 'atualizacao', api.ID_DO_NO, chave)
+    token = cache.adquirir_lock(nome_lock, 60)  # Outro worker do nó está atualizando
+
+    job_id = cliente.get('/filmes/novos?wait=true', headers=cabecalhos).get_json()['job_id']
+    andamento = cliente.get(f'/jobs/{job_id}?timeout=0.1', headers=cabecalhos)
+    assert andamento.status_code == 202
+    assert andamento.get_json()['status'] == 'em_andamento_externo'
+
+    cache.liberar_lock(nome_lock, token)
+    concluido = cliente.get(f'/jobs/{job_id}?timeout=5', headers=cabecalhos)
+    assert concluido.get_json()['status'] == 'concluido'
+    assert chamadas == []  # Quem tinha o lock já atualizou os arquivos do nó
+
+
+def test_job_concluido_em_outro_no_nao_leva_os_dados_daqui(api, cliente, cabecalhos, cache_distribuido):
+    def publicar(no):
+        job_id = uuid.uuid4().hex
+        cache_distribuido.set(api.chave_redis('job', job_id), json.dumps({
+            'job_id': job_id, 'status': 'concluido', 'cache_path': api.JSON_PATHS['series_nomes'], 'no': no,
+        }).encode('utf-8'), 60)
+        return cliente.get(f'/jobs/{job_id}', headers=cabecalhos).get_json()
+
+    assert 'dados' not in publicar('outro-no')
+    assert 'dados' in publicar(api.ID_DO_NO)
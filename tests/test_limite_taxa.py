@@ -0,0 +1,61 @@
+import pytest
+
+
+@pytest.fixture
+def limite(api, monkeypatch):
+    monkeypatch.setitem(api.CONFIG, 'LIMITE_TAXA_ATIVO', True)
+    monkeypatch.setitem(api.CONFIG, 'PROXIES_CONFIAVEIS', 1)
+    monkeypatch.setitem(api.CONFIG, 'LIMITE_TAXA_TOTAL', 5)
+    monkeypatch.setitem(api.CONFIG, 'LIMITE_TAXA_CLASSES', {'busca': 2, 'atualizacao': 1})
+    monkeypatch.setattr(api, 'cache_compartilhado', api.CacheLocal())
+
+
+def pedir(cliente, cabecalhos, caminho, ip):
+    return cliente.get(caminho, headers={**cabecalhos, 'X-Forwarded-For': ip})
+
+
+def test_desligado_por_padrao(api):
+    assert not api.limite_taxa_ligado()
+
+
+def test_ativo_sem_proxies_configurados_nao_limita(api, cliente, cabecalhos, limite, monkeypatch):
+    monkeypatch.setitem(api.CONFIG, 'PROXIES_CONFIAVEIS', None)
+    for _ in range(10):
+        resposta = pedir(cliente, cabecalhos, '/health', '1.1.1.1')
+    assert resposta.status_code == 200
+    assert 'X-RateLimit-Limit' not in resposta.headers
+
+
+def test_orcamento_total_por_cliente(cliente, cabecalhos, limite):
+    respostas = [pedir(cliente, cabecalhos, '/filmes/home', '1.1.1.1') for _ in range(7)]
+    assert [r.status_code for r in respostas] == [200] * 5 + [429] * 2
+    assert respostas[0].headers['X-RateLimit-Limit'] == '5'
+    assert respostas[0].headers['X-RateLimit-Remaining'] == '4'
+    assert int(respostas[-1].headers['Retry-After']) >= 1
+
+    # Outro IP atrás do mesmo proxy tem o próprio orçamento
+    assert pedir(cliente, cabecalhos, '/filmes/home', '2.2.2.2').status_code == 200
+
+
+def test_orcamento_da_classe_da_rota(cliente, cabecalhos, limite):
+    codigos = [pedir(cliente, cabecalhos, '/buscar?q=matrix', '1.1.1.1').status_code for _ in range(3)]
+    assert codigos == [200, 200, 429]
+    assert pedir(cliente, cabecalhos, '/filmes/home', '1.1.1.1').status_code == 200
+
+
+def test_chave_invalida_nao_consome_orcamento(cliente, cabecalhos, limite):
+    for _ in range(10):
+        assert pedir(cliente, {'X-API-Key': 'errada'}, '/filmes/home', '1.1.1.1').status_code == 401
+    assert pedir(cliente, cabecalhos, '/filmes/home', '1.1.1.1').status_code == 200
+
+
+def test_janela_deslizante_pondera_a_janela_anterior(api, monkeypatch):
+    cache = api.CacheLocal()
+    agora = [600.0]
+    monkeypatch.setattr(api.time, 'time', lambda: agora[0])
+    for _ in range(4):
+        cache.incr_janelas(['c'], 60)
+    agora[0] = 660.0 + 30
+    assert cache.incr_janelas(['c'], 60) == [(1, 4)]
+    agora[0] = 800.0
+    assert cache.incr_janelas(['c'], 60) == [(1, 0)]
@@ -0,0 +1,28 @@
+import ast
+import logging
+import os
+
+METODOS = {'debug', 'info', 'warning', 'error', 'exception', 'critical'}
+
+
+def test_logs_do_app_usam_formatacao_preguicosa(api):
+    """O FiltroLimiteTaxa agrupa pelo template: uma f-string vira um template por mensagem."""
+    with open(api.__file__, encoding='utf-8') as f:
+        arvore = ast.parse(f.read())
+    f_strings = [
+        no.lineno for no in ast.walk(arvore)
+        if isinstance(no, ast.Call) and isinstance(no.func, ast.Attribute) and no.func.attr in METODOS
+        and isinstance(no.func.value, ast.Name) and no.func.value.id.startswith('logger')
+        and no.args and isinstance(no.args[0], ast.JoinedStr)
+    ]
+    assert f_strings == []
+
+
+def test_filtro_limita_por_template(api):
+    filtro = api.FiltroLimiteTaxa(2)
+
+    def registro(valor):
+        return logging.LogRecord('teste', logging.INFO, os.devnull, 1, "Tentando acessar URL: %s", (valor,), None)
+
+    aceitos = [filtro.filter(registro(f'https://exemplo/{i}')) for i in range(5)]
+    assert aceitos == [True, True, False, False, False]
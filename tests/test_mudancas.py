@@ -0,0 +1,76 @@
+import pytest
+
+
+@pytest.fixture
+def cache(api, monkeypatch):
+    cache = api.CacheLocal()
+    monkeypatch.setattr(api, 'cache_compartilhado', cache)
+    return cache
+
+
+def mudanca(api, tipo='filme', **campos):
+    api.anexar_mudanca({'tipo': tipo, 'origem': 'catalogo', 'adicionados': [], 'atualizados': [],
+                        'removidos': [], **campos})
+
+
+def test_mudancas_depois_do_token(api, cache):
+    inicio = api.mudancas_desde(None)
+    assert inicio['ressincronizar']
+
+    mudanca(api, adicionados=['a1'])
+    mudanca(api, tipo='serie', removidos=['s1'])
+    resultado = api.mudancas_desde(inicio['versao'])
+    assert not resultado['ressincronizar']
+    assert [m['tipo'] for m in resultado['mudancas']] == ['filme', 'serie']
+    assert resultado['mudancas'][-1]['versao'] == resultado['versao']
+
+    assert api.mudancas_desde(resultado['versao'])['mudancas'] == []
+    assert [m['tipo'] for m in api.mudancas_desde(inicio['versao'], tipo='serie')['mudancas']] == ['serie']
+
+
+def test_token_de_antes_de_reiniciar_pede_ressincronizacao(api, cache, monkeypatch):
+    for _ in range(2):
+        mudanca(api)
+    antigo = api.mudancas_desde(None)['versao']
+
+    # Reinício sem Redis: contador e log recomeçam e logo passam do token antigo
+    monkeypatch.setattr(api, 'cache_compartilhado', api.CacheLocal())
+    for _ in range(5):
+        mudanca(api)
+    resultado = api.mudancas_desde(antigo)
+    assert resultado['ressincronizar']
+    assert resultado['mudancas'] == []
+    assert api.ler_token_feed(resultado['versao'])[1] == 5
+
+
+def test_log_truncado_pede_ressincronizacao(api, cache, monkeypatch):
+    monkeypatch.setitem(api.CONFIG, 'FEED_MAX_ENTRADAS', 2)
+    inicio = api.mudancas_desde(None)['versao']
+    for _ in range(3):
+        mudanca(api)
+    assert api.mudancas_desde(inicio)['ressincronizar']
+
+
+def test_token_invalido(cliente, cabecalhos, cache):
+    assert cliente.get('/mudancas?desde=12', headers=cabecalhos).status_code == 400
+    assert cliente.get('/mudancas?desde=abc.x', headers=cabecalhos).status_code == 400
+    assert cliente.get('/eventos/novidades?ultimo_id=7', headers=cabecalhos).status_code == 400
+
+
+def test_eventos_retomam_pelo_last_event_id(api, cache):
+    inicio = api.mudancas_desde(None, origem=None)['versao']
+    mudanca(api, adicionados=['a1'], itens=[{'id': 'a1'}])
+    stream = api.transmitir_novidades({'filme'}, inicio)
+    assert next(stream).startswith('retry:')
+    evento = next(stream)
+    assert 'event: filme' in evento
+    assert f"id: {api.mudancas_desde(None)['versao']}" in evento
+
+
+def test_eventos_de_outra_epoca_comecam_ressincronizando(api, cache, monkeypatch):
+    mudanca(api)
+    antigo = api.mudancas_desde(None)['versao']
+    monkeypatch.setattr(api, 'cache_compartilhado', api.CacheLocal())
+    stream = api.transmitir_novidades({'filme'}, antigo)
+    next(stream)
+    assert next(stream).startswith(f"id: {api.mudancas_desde(None)['versao']}\nevent: ressincronizar")
@@ -0,0 +1,42 @@
+def navegar(cliente, cabecalhos, **params):
+    resposta = cliente.get('/navegar', query_string=params, headers=cabecalhos)
+    if resposta.status_code != 200:
+        return resposta.status_code
+    return [item['id'] for item in resposta.get_json()['resultados']]
+
+
+def test_ordens(cliente, cabecalhos, catalogo):
+    recentes = ['70523', '63174', '1429', 'tt0848228', 'tt0133093', 'tt0110912']
+    assert navegar(cliente, cabecalhos) == recentes
+    assert navegar(cliente, cabecalhos, ordem='antigos') == recentes[::-1]
+    assert navegar(cliente, cabecalhos, ordem='titulo') == ['1429', '70523', '63174', 'tt0133093', 'tt0848228',
+                                                            'tt0110912']
+
+
+def test_filtros_combinados(cliente, cabecalhos, catalogo):
+    assert navegar(cliente, cabecalhos, tipo='filme', genero='acao') == ['tt0848228', 'tt0133093']
+    assert navegar(cliente, cabecalhos, genero='Fantasia,Animação') == ['63174', '1429']
+    assert navegar(cliente, cabecalhos, qualidade='cam') == ['tt0110912']
+    assert navegar(cliente, cabecalhos, ano_min=2013, ano_max=2016) == ['63174', '1429']
+    assert navegar(cliente, cabecalhos, tipo='serie', ano_min=2017, ordem='titulo') == ['70523']
+
+
+def test_contagem_e_projecao(cliente, cabecalhos, catalogo):
+    resposta = cliente.get('/navegar?genero=drama&count_only=true', headers=cabecalhos).get_json()
+    assert resposta == {'total': 3, 'total_paginas': 1}
+    resultados = cliente.get('/navegar?tipo=anime&fields=id', headers=cabecalhos).get_json()['resultados']
+    assert resultados == [{'id': '1429', 'tipo': 'anime'}]
+
+
+def test_parametros_invalidos(cliente, cabecalhos, catalogo):
+    assert navegar(cliente, cabecalhos, ordem='popular') == 400
+    assert navegar(cliente, cabecalhos, tipo='documentario') == 400
+    assert navegar(cliente, cabecalhos, ano_min='noventa') == 400
+
+
+def test_itens_sem_data_vao_para_o_fim(api):
+    filmes = [{'id': 'a', 'data_lancamento': '2025'}, {'id': 'b'}, {'id': 'c', 'data_lancamento': '2025-01-10'}]
+    indice = api.construir_indice_navegacao(filmes, [], [])
+    assert indice['ordens']['recentes'] == [2, 0, 1]
+    assert indice['ordens']['antigos'] == [0, 2, 1]
+    assert api.chave_data({'data_estreia': 'em breve'}) is None
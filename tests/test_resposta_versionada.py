@@ -0,0 +1,120 @@
+import json
+import os
+
+
+def gravar(caminho, dados, mtime_ns):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f)
+    os.utime(caminho, ns=(mtime_ns, mtime_ns))
+
+
+def responder(api, caminho, **cabecalhos):
+    with api.app.test_request_context('/', headers=cabecalhos):
+        def gerar():
+            with open(caminho, encoding='utf-8') as f:
+                return json.load(f)
+        return api.resposta_versionada(('teste', caminho), [caminho], gerar, compartilhar=True)
+
+
+def test_corpo_do_redis_nao_sobrevive_a_mudanca_do_arquivo(api, tmp_path, cache_distribuido, limpar_corpos):
+    caminho = str(tmp_path / 'series.json')
+    gravar(caminho, [{'titulo': 'Lucifer'}], 1_000_000_000)
+    primeira = responder(api, caminho)
+    assert primeira.get_json() == [{'titulo': 'Lucifer'}]
+
+    # Outro worker, depois do arquivo mudar, sem ter recebido aviso de invalidação
+    gravar(caminho, [{'titulo': 'Dark'}], 2_000_000_000)
+    limpar_corpos()
+    segunda = responder(api, caminho)
+    assert segunda.get_json() == [{'titulo': 'Dark'}]
+    assert segunda.headers['ETag'] != primeira.headers['ETag']
+
+    revalidada = responder(api, caminho, **{'If-None-Match': segunda.headers['ETag']})
+    assert revalidada.status_code == 304
+
+
+def test_corpo_do_redis_reaproveitado_com_o_mesmo_conteudo(api, tmp_path, cache_distribuido, limpar_corpos):
+    caminho = str(tmp_path / 'series.json')
+    gravar(caminho, [{'titulo': 'Lucifer'}], 1_000_000_000)
+    responder(api, caminho)
+
+    # Mesmo conteúdo com outro mtime (outro nó): vem do Redis sem gerar de novo
+    gravar(caminho, [{'titulo': 'Lucifer'}], 3_000_000_000)
+    limpar_corpos()
+    with api.app.test_request_context('/'):
+        resposta = api.resposta_versionada(('teste', caminho), [caminho], lambda: None, compartilhar=True)
+    assert resposta is not None
+    assert resposta.get_json() == [{'titulo': 'Lucifer'}]
+
+
+def test_corpo_serializado_igual_ao_do_jsonify(api):
+    dados = {'resultados': [{'id': 'tt1', 'titulo': 'Ação', 'generos': ['Drama']}], 'total': 1}
+    with api.app.app_context():
+        esperado = api.jsonify(dados).get_data()
+    assert api.serializar_json(dados) == esperado
+    assert b', ' not in esperado
+
+
+def test_if_none_match_recebe_304_com_os_validadores(api, cliente, cabecalhos):
+    primeira = cliente.get('/filmes/pagina?pagina=1', headers=cabecalhos)
+    assert primeira.status_code == 200
+    assert primeira.headers['Cache-Control'] == api.CONFIG['CACHE_CONTROL']
+    assert {'Accept-Encoding', 'X-API-Key'} <= {v.strip() for v in primeira.headers['Vary'].split(',')}
+
+    revalidada = cliente.get('/filmes/pagina?pagina=1',
+                             headers={**cabecalhos, 'If-None-Match': primeira.headers['ETag']})
+    assert revalidada.status_code == 304
+    assert revalidada.get_data() == b''
+    assert revalidada.headers['ETag'] == primeira.headers['ETag']
+
+
+def test_etag_muda_com_a_codificacao_e_os_parametros(cliente, cabecalhos):
+    def etag(caminho, codificacao):
+        return cliente.get(caminho, headers={**cabecalhos, 'Accept-Encoding': codificacao}).headers['ETag']
+
+    assert etag('/series/pagina?pagina=1', 'gzip') != etag('/series/pagina?pagina=1', 'identity')
+    assert etag('/series/pagina?pagina=1', 'gzip') != etag('/series/pagina?pagina=2', 'gzip')
+
+
+def test_etag_muda_com_a_versao_do_arquivo(api, tmp_path, limpar_corpos):
+    caminho = str(tmp_path / 'series.json')
+    gravar(caminho, [{'titulo': 'Lucifer'}], 1_000_000_000)
+    primeira = responder(api, caminho)
+    gravar(caminho, [{'titulo': 'Dark'}], 2_000_000_000)
+    segunda = responder(api, caminho, **{'If-None-Match': primeira.headers['ETag']})
+    assert segunda.status_code == 200
+    assert segunda.get_json() == [{'titulo': 'Dark'}]
+
+
+def test_invalidacao_descarta_so_os_corpos_do_arquivo(api, tmp_path, monkeypatch, limpar_corpos):
+    monkeypatch.setattr(api, 'cache_compartilhado', api.CacheLocal())
+    series, animes = str(tmp_path / 'series.json'), str(tmp_path / 'animes.json')
+    gravar(series, [{'titulo': 'Dark'}], 1_000_000_000)
+    gravar(animes, [{'titulo': 'Naruto'}], 1_000_000_000)
+    limpar_corpos()
+    responder(api, series)
+    responder(api, animes)
+
+    def aviso(no, origem, caminho):
+        api.ao_receber_invalidacao(json.dumps({'no': no, 'origem': origem, 'caminho': caminho}))
+
+    # Outro nó serve os próprios arquivos; o próprio processo já descartou ao recarregar
+    aviso('outro-no', 'outro-no:1', series)
+    aviso(api.ID_DO_NO, api.origem_invalidacao(), series)
+    assert len(api.corpos_cache) == 2
+
+    aviso(api.ID_DO_NO, f'{api.ID_DO_NO}:-1', series)
+    assert [c[1] for c in api.corpos_cache] == [(animes,)]
+    assert api.corpos_cache_bytes == sum(len(corpo) for v in api.corpos_cache.values() for corpo, _ in v.values())
+
+
+def test_etag_igual_entre_nos_com_o_mesmo_conteudo(api, tmp_path, limpar_corpos):
+    caminho = str(tmp_path / 'series.json')
+    gravar(caminho, [{'titulo': 'Lucifer'}], 1_000_000_000)
+    primeira = responder(api, caminho)
+
+    # Outro nó grava os mesmos bytes em outro instante: o cliente revalida com 304
+    gravar(caminho, [{'titulo': 'Lucifer'}], 5_000_000_000)
+    limpar_corpos()
+    revalidada = responder(api, caminho, **{'If-None-Match': primeira.headers['ETag']})
+    assert revalidada.status_code == 304
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta, timezone
+
+
+def ha_dias(dias):
+    return (datetime.now(timezone.utc) - timedelta(days=dias)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def test_mais_antigos_primeiro_e_sem_carimbo_antes_de_todos(app_code):
+    catalogos = {
+        'CodeFilmesNomes.json': [{'id': 'tt1', 'atualizado_em': ha_dias(40)},
+                                 {'id': 'tt2', 'atualizado_em': ha_dias(1)},
+                                 {'id': 'tt3'}],
+        'CodeSeriesNomes.json': [{'id': '10', 'atualizado_em': ha_dias(90)}],
+    }
+    assert app_code.selecionar_desatualizados(catalogos, 10, 30) == [
+        ('CodeFilmesNomes.json', 2), ('CodeSeriesNomes.json', 0), ('CodeFilmesNomes.json', 0)]
+    assert app_code.selecionar_desatualizados(catalogos, 1, 30) == [('CodeFilmesNomes.json', 2)]
+
+
+def test_falha_recente_conta_como_verificado(app_code):
+    catalogos = {'CodeFilmesNomes.json': [{'id': 'tt1', 'atualizado_em': ha_dias(40), 'falha_em': ha_dias(1)}]}
+    assert app_code.selecionar_desatualizados(catalogos, 10, 30) == []
+
+
+def test_revalidar_atualiza_no_lugar_e_grava_cada_arquivo_uma_vez(app_code, monkeypatch):
+    catalogos = {
+        'CodeFilmesNomes.json': [{'id': 'tt1', 'titulo': 'Velho', 'atualizado_em': ha_dias(40)},
+                                 {'id': 'tt2', 'titulo': 'Quebrado'},
+                                 {'id': 'tt3', 'titulo': 'Recente', 'atualizado_em': ha_dias(1)}],
+        'CodeSeriesNomes.json': [],
+        'CodeAnimesNomes.json': [],
+    }
+    gravados = []
+    monkeypatch.setattr(app_code, 'carregar_animlist', lambda: [])
+    monkeypatch.setattr(app_code, 'carregar_json_existente', lambda nome: catalogos[nome])
+    monkeypatch.setattr(app_code, 'salvar_json_incremental', lambda nome, dados: gravados.append(nome))
+    monkeypatch.setattr(app_code, 'obter_dados_imdb', lambda filme_id: None if filme_id == 'tt2' else
+                        {'titulo': 'Novo', 'fonte': 'imdb', 'atualizado_em': app_code.agora_iso()})
+
+    app_code.revalidar(limite=10, idade_dias=30)
+    filmes = catalogos['CodeFilmesNomes.json']
+    assert filmes[0]['titulo'] == 'Novo' and filmes[0]['fonte'] == 'imdb'
+    assert filmes[1]['titulo'] == 'Quebrado' and 'falha_em' in filmes[1]
+    assert filmes[2]['titulo'] == 'Recente'
+    assert gravados == ['CodeFilmesNomes.json']
@@ -0,0 +1,46 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def com_numpy(api):
+    if api.np is None:
+        pytest.skip('numpy não instalado')
+
+
+def similares(cliente, cabecalhos, **params):
+    resposta = cliente.get('/similares', query_string=params, headers=cabecalhos)
+    return resposta.get_json() if resposta.status_code == 200 else resposta.status_code
+
+
+def test_so_itens_com_generos_em_comum_do_mais_parecido(cliente, cabecalhos, catalogo):
+    resultados = similares(cliente, cabecalhos, tipo='serie', id='70523')['resultados']
+    ids = [r['id'] for r in resultados]
+    assert '70523' not in ids and '1429' not in ids
+    assert set(ids) == {'tt0133093', 'tt0848228', 'tt0110912', '63174'}
+    scores = [r['score'] for r in resultados]
+    assert scores == sorted(scores, reverse=True) and all(0 < s <= 1 for s in scores)
+    assert set(resultados[0]) == {'id', 'titulo', 'capa', 'qualidade', 'tipo', 'score'}
+
+
+def test_tipos_limite_e_projecao(cliente, cabecalhos, catalogo):
+    resultados = similares(cliente, cabecalhos, tipo='serie', id='70523', tipos='filme', limite=1,
+                           fields='id')['resultados']
+    assert len(resultados) == 1
+    assert resultados[0]['tipo'] == 'filme' and set(resultados[0]) == {'id', 'tipo', 'score'}
+
+
+def test_erros(cliente, cabecalhos, catalogo):
+    assert similares(cliente, cabecalhos, tipo='serie', id='99999') == 404
+    assert similares(cliente, cabecalhos, tipo='podcast', id='70523') == 400
+    assert similares(cliente, cabecalhos, tipo='serie', id='70523', tipos='filme,podcast') == 400
+
+
+def test_mesmos_generos_valem_um_e_copias_do_item_saem(api, monkeypatch):
+    filmes = [{'id': 'a', 'generos': ['Drama', 'Crime']}, {'id': 'b', 'generos': ['Crime', 'Drama']},
+              {'id': 'c', 'generos': ['Drama']}, {'id': 'a', 'generos': ['Drama', 'Crime']},
+              {'id': 'd', 'generos': ['Comédia']}]
+    indice = api.construir_indice_similares(filmes, [], [])
+    monkeypatch.setattr(api, 'obter_indice', lambda nome: indice)
+    resultado = api.similares('filme', 'a', ('filme',), 10)
+    assert [posicao for _, posicao, _ in resultado] == [1, 2]
+    assert resultado[0][2] == pytest.approx(1.0, abs=1e-4)